@@ -0,0 +1,209 @@
+"""
+Crossy Road - Greta Thunberg Edition (Allocation Audit)
+Finds out what the game loop allocates while it runs (--alloc-audit N).
+
+Allocations every frame feed the garbage collector, which then pauses the game
+now and again and shows up as frame spikes. With the audit on, tracemalloc
+follows every allocation, and every N frames the audit prints:
+  - the memory allocated and freed again within a frame (the per frame peak,
+    which is what keeps the collector busy), on average and at worst
+  - how much the memory in use grew over the window, and the lines of the game
+    whose live allocations changed the most, each allocation counted at the
+    innermost game file it came from (so one in random.py called by
+    Game_Simulation.py counts for the Game_Simulation.py line)
+tracemalloc slows Python down a lot, so frame times mean nothing while it runs,
+and it only sees Python's own memory (not the pixels of surfaces, which SDL
+allocates).
+
+Run on its own it checks the steady state budget: a bot plays headless runs
+(simulation, lane safety index, rewind buffer, ghost recording and the HUD
+text) and the check fails when a frame allocates more than the budget on
+average once it has warmed up:
+    python Alloc_Audit.py --frames 3000 --budget 4096
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+# --- CONSTANTS ---
+
+# Game files live next to this one
+BASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Frames between two reports in the game
+DEFAULT_INTERVAL = 300
+
+# Call sites listed in a report
+TOP_SITES = 10
+
+# Frames of Python stack kept per allocation, enough to get from the standard library back to the game
+TRACE_DEPTH = 16
+
+# Average bytes a steady state frame may allocate (see main)
+ALLOCATION_BUDGET = 4096
+
+# --- ALLOCATION AUDIT ---
+
+class AllocationAudit:
+    """Follow the allocations of a loop with tracemalloc and report them every interval frames"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, top=TOP_SITES, output=print):
+        self.interval = interval
+        self.top = top
+        self.output = output
+        self.frames = 0
+        self._snapshot = None
+        self._window_start = 0
+        self._frame_start = 0
+        self._peak_total = 0
+        self._peak_worst = 0
+        # (average, worst, growth) of the last report
+        self.last_report = None
+
+    def start(self):
+        """Start following allocations"""
+        tracemalloc.start(TRACE_DEPTH)
+        self._begin_window()
+
+    def stop(self):
+        """Stop following allocations"""
+        tracemalloc.stop()
+
+    def _begin_window(self):
+        """Remember where a window of frames starts"""
+        self._snapshot = self._take_snapshot()
+        self._window_start, _ = tracemalloc.get_traced_memory()
+        self._frame_start = self._window_start
+        self._peak_total = 0
+        self._peak_worst = 0
+        tracemalloc.reset_peak()
+
+    def _take_snapshot(self):
+        """Snapshot of the allocations made from the game files"""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(True, os.path.join(BASE_DIRECTORY, "*"), all_frames=True),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+
+    def frame(self):
+        """Call once at the end of every frame"""
+        current, peak = tracemalloc.get_traced_memory()
+        allocated = peak - self._frame_start
+        self._peak_total += allocated
+        self._peak_worst = max(self._peak_worst, allocated)
+        self.frames += 1
+        self._frame_start = current
+        tracemalloc.reset_peak()
+        if self.frames % self.interval == 0:
+            self.report()
+
+    def sites(self, snapshot, previous):
+        """Game call sites as (file:line, bytes, allocations) that grew the most between two snapshots"""
+        sites = {}
+        for stat in snapshot.compare_to(previous, "traceback"):
+            if stat.size_diff == 0 and stat.count_diff == 0:
+                continue
+            # The innermost frame in a game file is where the game asked for the memory
+            site = None
+            for frame in reversed(stat.traceback):
+                if frame.filename.startswith(BASE_DIRECTORY):
+                    site = frame
+                    break
+            # Skip the audit's own snapshots
+            if site is None or site.filename == __file__:
+                continue
+            site = f"{os.path.basename(site.filename)}:{site.lineno}"
+            size, count = sites.get(site, (0, 0))
+            sites[site] = (size + stat.size_diff, count + stat.count_diff)
+        ranked = sorted(sites.items(), key=lambda item: -abs(item[1][0]))
+        return [(site, size, count) for site, (size, count) in ranked[:self.top]]
+
+    def report(self):
+        """Print what the last window of frames allocated, returning (average, worst, growth) in bytes per frame"""
+        frames = self.interval
+        current, _ = tracemalloc.get_traced_memory()
+        average = self._peak_total / frames
+        worst = self._peak_worst
+        growth = (current - self._window_start) / frames
+
+        snapshot = self._take_snapshot()
+        self.output(f"Allocations over {frames} frames: {average:.0f} B a frame on average, "
+                    f"{worst} B at worst, memory in use grew {growth:.0f} B a frame")
+        for site, size, count in self.sites(snapshot, self._snapshot):
+            self.output(f"  {site:<28} {size:+9d} B {count:+6d} blocks")
+
+        self._begin_window()
+        self.last_report = (average, worst, growth)
+        return self.last_report
+
+# --- STEADY STATE CHECK ---
+
+def play(frames, warmup, audit, mode, seed):
+    """Let a bot play headless runs, following allocations with audit after the warmup frames"""
+    import pygame
+
+    from Bot import create_policy, observe, MOVE
+    from Game_Simulation import GameSimulation
+    from Ghost import GhostRecorder
+    from Lane_Safety import LaneSafetyIndex
+    from Rewind import RewindBuffer
+    from Sprites import TextCache
+
+    pygame.font.init()
+    font = pygame.font.Font(None, 36)
+    texts = TextCache()
+
+    sim = GameSimulation(mode, seed=seed)
+    lane_safety = LaneSafetyIndex(sim)
+    bot = create_policy("lane_gap")
+    rewind = RewindBuffer(sim)
+    ghost_recorder = GhostRecorder()
+    ghost_recorder.start(sim)
+
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            audit.start()
+        result = sim.step(bot(observe(sim, lane_safety)) == MOVE)
+        rewind.record()
+        ghost_recorder.record(sim)
+        texts.render(font, f"Score: {sim.score}/{sim.win_score}", (0, 0, 0))
+        texts.render(font, f"Near miss bonus: {sim.bonus}", (0, 0, 0))
+        if result is not None:
+            # Straight into the next run, like pressing "Play Again"
+            seed += 1
+            sim.reset(seed)
+            rewind.clear()
+            rewind.record()
+            ghost_recorder.start(sim)
+        if frame >= warmup:
+            audit.frame()
+    audit.stop()
+
+def main(argv=None):
+    """Command line entry point, exits with 1 when the budget is broken"""
+    parser = argparse.ArgumentParser(description="Check what a steady state frame allocates")
+    parser.add_argument("--frames", type=int, default=3000, help="Frames measured after warming up")
+    parser.add_argument("--warmup", type=int, default=300, help="Frames played before measuring")
+    parser.add_argument("--budget", type=int, default=ALLOCATION_BUDGET, help="Average bytes a frame may allocate")
+    parser.add_argument("--mode", choices=("regular", "hard"), default="regular")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first run")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    # One report over all the measured frames
+    audit = AllocationAudit(interval=args.frames)
+    play(args.frames, args.warmup, audit, args.mode, args.seed)
+
+    average, worst, growth = audit.last_report
+    if average > args.budget:
+        print(f"Over budget: {average:.0f} B a frame on average, the budget is {args.budget} B")
+        return 1
+    print(f"Within budget: {average:.0f} B a frame on average, the budget is {args.budget} B")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
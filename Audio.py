@@ -0,0 +1,249 @@
+"""
+Crossy Road - Greta Thunberg Edition (Audio)
+Sound effects and background music for both game modes.
+
+Every effect is decoded once at startup into a pygame.mixer.Sound buffer, either
+from a file in the sounds folder (e.g. sounds/crash.wav for a real "How dare you!")
+or, when there is none, from a short tone synthesized in memory. Effects share a
+fixed pool of mixer channels: each sound has a priority and a voice limit, and
+when every channel is busy the oldest voice of the lowest priority is stolen, so
+a crash always cuts through footsteps. Music is streamed from disk by
+pygame.mixer.music instead of being decoded up front.
+
+Nothing here waits for audio, playing a sound only hands a buffer to SDL's mixer
+thread. The mixer buffer size trades latency for CPU (--audio-buffer).
+"""
+
+import array
+import math
+import os
+import random
+import wave
+
+import pygame
+
+from Game_Simulation import RESULT_WIN
+from Sprites import WALK_STRIDE
+
+# --- CONSTANTS ---
+
+# Where sound files are looked for
+SOUND_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
+SOUND_EXTENSIONS = (".ogg", ".wav")
+
+# Mixer format: mono 16 bit at 44.1 kHz
+SAMPLE_RATE = 44100
+PEAK = 32767
+
+# Samples per mixer buffer: smaller is more responsive, larger uses less CPU
+DEFAULT_BUFFER_SIZE = 512
+
+# Channels shared by all effects
+NUM_CHANNELS = 8
+
+# Sound name: (priority, most voices at once, volume)
+SOUNDS = {
+    "step": (0, 2, 0.25),
+    "near_miss": (1, 2, 0.5),
+    "afk_warning": (2, 1, 0.6),
+    "crash": (3, 1, 1.0),
+    "win": (3, 1, 0.9),
+}
+
+# Background music (streamed), and its volume under the effects
+MUSIC_NAME = "music"
+GENERATED_MUSIC_PATH = os.path.join(SOUND_DIRECTORY, "generated-music.wav")
+MUSIC_VOLUME = 0.35
+
+# Seconds before the AFK limit at which the warning sounds (matches the on-screen warning)
+AFK_WARNING_SECONDS = 3
+
+# --- SYNTHESIS ---
+
+def synthesize(notes, noise=0.0):
+    """Samples of notes given as (frequency, seconds, volume), each with a quick attack and decay"""
+    samples = array.array("h")
+    rng = random.Random(0)
+    for frequency, seconds, volume in notes:
+        count = int(SAMPLE_RATE * seconds)
+        step = 2 * math.pi * frequency / SAMPLE_RATE
+        for i in range(count):
+            envelope = min(1.0, i / 200) * (1 - i / count) ** 2
+            value = math.sin(i * step) if frequency else 0.0
+            if noise:
+                value = value * (1 - noise) + rng.uniform(-1, 1) * noise
+            samples.append(int(value * envelope * volume * PEAK))
+    return samples
+
+# Stand-ins for every effect when the sounds folder has no file for it
+SYNTHESIZED = {
+    "step": lambda: synthesize([(140, 0.05, 0.8)], noise=0.6),
+    "near_miss": lambda: synthesize([(660, 0.06, 0.6), (990, 0.09, 0.6)]),
+    "afk_warning": lambda: synthesize([(880, 0.12, 0.7), (0, 0.06, 0), (880, 0.12, 0.7)]),
+    "crash": lambda: synthesize([(70, 0.5, 1.0)], noise=0.7),
+    "win": lambda: synthesize([(523, 0.12, 0.7), (659, 0.12, 0.7), (784, 0.12, 0.7), (1047, 0.4, 0.7)]),
+}
+
+# Chords of the synthesized music loop, one bar each
+MUSIC_CHORDS = ((262, 330, 392), (220, 262, 330), (175, 220, 262), (196, 247, 294))
+MUSIC_BAR_SECONDS = 2.0
+
+def write_music(path):
+    """Write a short synthesized music loop to a WAV file so it can be streamed"""
+    samples = array.array("h")
+    beat = int(SAMPLE_RATE * MUSIC_BAR_SECONDS / 8)
+    for chord in MUSIC_CHORDS:
+        for note in range(8):
+            step = 2 * math.pi * chord[note % len(chord)] / SAMPLE_RATE
+            for i in range(beat):
+                envelope = min(1.0, i / 300) * (1 - i / beat)
+                samples.append(int(math.sin(i * step) * envelope * 0.3 * PEAK))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+def find_sound_file(name):
+    """Path of a sound file in the sounds folder, or None"""
+    for extension in SOUND_EXTENSIONS:
+        path = os.path.join(SOUND_DIRECTORY, name + extension)
+        if os.path.isfile(path):
+            return path
+    return None
+
+# --- AUDIO ENGINE ---
+
+class AudioEngine:
+    """Play preloaded effects on a pool of channels with voice stealing, and stream the music"""
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        # pygame.init() opened the mixer with its defaults, reopen it with the chosen buffer
+        pygame.mixer.quit()
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1, buffer=buffer_size)
+        pygame.mixer.set_num_channels(NUM_CHANNELS)
+        self.channels = [pygame.mixer.Channel(index) for index in range(NUM_CHANNELS)]
+
+        # What each channel last started playing: (priority, play count, name)
+        self.voices = [None] * NUM_CHANNELS
+        self._plays = 0
+        self.stolen = 0
+
+        # Decode every effect once
+        self.sounds = {}
+        for name, (_, _, volume) in SOUNDS.items():
+            self.sounds[name] = self._load(name)
+            self.sounds[name].set_volume(volume)
+
+        # Game state the sounds follow
+        self._strides = []
+        self._afk_warned = False
+
+    def _load(self, name):
+        """Load an effect from the sounds folder, or synthesize it"""
+        path = find_sound_file(name)
+        if path is not None:
+            try:
+                return pygame.mixer.Sound(path)
+            except Exception as e:
+                print(f"Error loading sound {path}: {e}")
+        return pygame.mixer.Sound(buffer=SYNTHESIZED[name]().tobytes())
+
+    def play(self, name):
+        """Start an effect on a free channel, stealing one if needed (returns whether it plays)"""
+        priority, max_voices, _ = SOUNDS[name]
+
+        free = None
+        same = []
+        victim = None
+        for index, channel in enumerate(self.channels):
+            voice = self.voices[index]
+            if voice is None or not channel.get_busy():
+                if free is None:
+                    free = index
+                continue
+            if voice[2] == name:
+                same.append(index)
+            # The lowest priority, then the oldest voice, is the first to go
+            if voice[0] <= priority and (victim is None or voice[:2] < self.voices[victim][:2]):
+                victim = index
+
+        if len(same) >= max_voices:
+            # Too many of this sound at once, restart its oldest voice
+            index = min(same, key=lambda index: self.voices[index][1])
+        elif free is not None:
+            index = free
+        elif victim is not None:
+            index = victim
+            self.stolen += 1
+        else:
+            return False
+
+        self._plays += 1
+        self.voices[index] = (priority, self._plays, name)
+        self.channels[index].play(self.sounds[name])
+        return True
+
+    def start_music(self):
+        """Stream the background music on a loop"""
+        path = find_sound_file(MUSIC_NAME)
+        try:
+            if path is None:
+                # No music in the sounds folder, synthesize a loop the first time
+                path = GENERATED_MUSIC_PATH
+                if not os.path.isfile(path):
+                    write_music(path)
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            pygame.mixer.music.play(-1)
+        except Exception as e:
+            print(f"Error playing music: {e}")
+
+    def after_step(self, sim, result):
+        """Play the sounds for what happened in the tick the simulation just played"""
+        # A footstep every other walk frame, for every player still in the game
+        if len(self._strides) != sim.num_players:
+            self._strides = [None] * sim.num_players
+        for index, player in enumerate(sim.players):
+            stride = (player["x"] - sim.background_offset) // (WALK_STRIDE * 2)
+            if stride != self._strides[index]:
+                if self._strides[index] is not None and player["out"] is None:
+                    self.play("step")
+                self._strides[index] = stride
+
+        if sim.near_misses:
+            self.play("near_miss")
+        if any(player["out_tick"] == sim.tick and player["hit_by"] is not None for player in sim.players):
+            self.play("crash")
+        if result == RESULT_WIN:
+            self.play("win")
+
+        # Sound the AFK warning once each time it comes up
+        warning = not sim.game_over and not sim.win_state and \
+            sim.idle_seconds() > sim.afk_limit - AFK_WARNING_SECONDS
+        if warning and not self._afk_warned:
+            self.play("afk_warning")
+        self._afk_warned = warning
+
+    def reset(self):
+        """Forget the last run (its footsteps and warnings)"""
+        self._strides = []
+        self._afk_warned = False
+
+    def close(self):
+        """Stop the music and every effect"""
+        pygame.mixer.music.stop()
+        pygame.mixer.stop()
+
+def create_audio(options):
+    """Audio engine for a game mode, or None if sound is off or no audio device is available"""
+    if not options.sound:
+        return None
+    try:
+        audio = AudioEngine(options.audio_buffer)
+    except Exception as e:
+        print(f"Error starting audio: {e}")
+        return None
+    audio.start_music()
+    return audio
@@ -0,0 +1,97 @@
+"""
+Crossy Road - Greta Thunberg Edition (Autoplay)
+Runs bots headless over many seeded games and reports how they did.
+Useful both for balancing the game modes (win rate, how runs end) and as a
+throughput benchmark for the simulation (games and ticks per second).
+
+Example:
+    python Autoplay.py --games 2000 --mode both --policy lane_gap always_move
+"""
+
+import argparse
+import time
+
+from Bot import POLICIES, create_policy, observe, MOVE
+from Game_Simulation import GameSimulation, MODES, FPS, RESULT_WIN, RESULT_COLLISION, RESULT_AFK
+from Lane_Safety import LaneSafetyIndex, SpawnValidator
+
+# --- CONSTANTS ---
+
+# Give up on a game after this many ticks (10 minutes of play)
+MAX_TICKS = FPS * 60 * 10
+
+# --- AUTOPLAY ---
+
+def play_game(sim, policy, seed, max_ticks=MAX_TICKS, lane_safety=None):
+    """Play one game with a policy, returning how it ended"""
+    sim.reset(seed)
+    for _ in range(max_ticks):
+        result = sim.step(policy(observe(sim, lane_safety)) == MOVE)
+        if result is not None:
+            return result
+    return "timeout"
+
+def run_batch(mode, policy_name, games, first_seed, max_ticks=MAX_TICKS):
+    """Play a batch of seeded games and collect the results"""
+    sim = GameSimulation(mode, seed=first_seed)
+    policy = create_policy(policy_name)
+    lane_safety = LaneSafetyIndex(sim) if getattr(policy, "needs_lane_safety", False) else None
+    # Hard mode plays with the same spawn validation as the game window
+    validator = SpawnValidator(sim, lane_safety) if sim.hard_mode else None
+
+    results = {RESULT_WIN: 0, RESULT_COLLISION: 0, RESULT_AFK: 0, "timeout": 0}
+    total_score = 0
+    total_ticks = 0
+
+    start_time = time.perf_counter()
+    for seed in range(first_seed, first_seed + games):
+        result = play_game(sim, policy, seed, max_ticks, lane_safety)
+        results[result] += 1
+        total_score += sim.score
+        total_ticks += sim.tick
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "mode": mode,
+        "policy": policy_name,
+        "games": games,
+        "results": results,
+        "win_rate": results[RESULT_WIN] / games,
+        "average_score": total_score / games,
+        "average_ticks": total_ticks / games,
+        "games_per_second": games / elapsed,
+        "ticks_per_second": total_ticks / elapsed,
+        "clusters": (validator.accepted, validator.reshaped, validator.rejected) if validator else None,
+    }
+
+def print_report(report):
+    """Print the summary of one batch"""
+    results = report["results"]
+    print(f"{report['mode']:>7} {report['policy']:>12}: "
+          f"win rate {report['win_rate']:6.1%}  "
+          f"avg score {report['average_score']:5.1f}  "
+          f"(wins {results[RESULT_WIN]}, collisions {results[RESULT_COLLISION]}, "
+          f"afk {results[RESULT_AFK]}, timeouts {results['timeout']})  "
+          f"{report['games_per_second']:8.1f} games/s  "
+          f"{report['ticks_per_second']:10.0f} ticks/s")
+    if report["clusters"] is not None:
+        accepted, reshaped, rejected = report["clusters"]
+        print(f"{'':>20}  clusters accepted {accepted}, reshaped {reshaped}, rejected {rejected}")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run bots headless over many seeded games")
+    parser.add_argument("--games", type=int, default=1000, help="Games per mode and policy")
+    parser.add_argument("--mode", choices=sorted(MODES) + ["both"], default="both")
+    parser.add_argument("--policy", nargs="+", choices=sorted(POLICIES), default=["lane_gap"])
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="Ticks before a game times out")
+    args = parser.parse_args(argv)
+
+    modes = sorted(MODES) if args.mode == "both" else [args.mode]
+    for mode in modes:
+        for policy_name in args.policy:
+            print_report(run_batch(mode, policy_name, args.games, args.seed, args.max_ticks))
+
+if __name__ == "__main__":
+    main()
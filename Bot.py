@@ -0,0 +1,179 @@
+"""
+Crossy Road - Greta Thunberg Edition (Bots)
+Scripted players for the game simulation.
+A policy is any callable that takes an Observation and returns MOVE or WAIT.
+Bots can play in the game window (--bot) or headless through Autoplay.py.
+"""
+
+import random
+
+from Game_Simulation import (LANE_WIDTH, NUM_LANES, PLAYER_WIDTH, PLAYER_HEIGHT,
+                             CAR_WIDTH, CAR_HEIGHT, lane_of)
+
+# --- CONSTANTS ---
+
+# Decisions a policy can make each tick
+MOVE = "move"
+WAIT = "wait"
+
+# --- OBSERVATIONS ---
+
+class Observation:
+    """What a bot gets to see of the game each tick"""
+
+    __slots__ = ("tick", "score", "player_x", "player_y", "player_lane",
+                 "move_speed", "idle_seconds", "afk_limit", "lanes", "player_window", "moving_window")
+
+    def __init__(self, tick, score, player_x, player_y, player_lane,
+                 move_speed, idle_seconds, afk_limit, lanes,
+                 player_window=None, moving_window=None):
+        self.tick = tick
+        self.score = score
+        self.player_x = player_x
+        self.player_y = player_y
+        self.player_lane = player_lane
+        self.move_speed = move_speed
+        self.idle_seconds = idle_seconds
+        self.afk_limit = afk_limit
+        # One list of (x, y, speed) per screen lane
+        self.lanes = lanes
+        # Ticks until a car reaches the player if it waits, or if it crosses the next lane
+        # (needs a LaneSafetyIndex)
+        self.player_window = player_window
+        self.moving_window = moving_window
+
+def observe(sim, lane_safety=None):
+    """Build the observation of the current tick of a simulation"""
+    lanes = [[] for _ in range(NUM_LANES)]
+    for car in sim.cars:
+        lane = lane_of(car["x"], CAR_WIDTH)
+        if 0 <= lane < NUM_LANES:
+            lanes[lane].append((car["x"], car["y"], car["speed"]))
+
+    player_window = moving_window = None
+    if lane_safety is not None:
+        player_window = lane_safety.player_window(sim)
+        moving_window = lane_safety.moving_window(sim, crossing_ticks(sim.move_speed))
+
+    return Observation(sim.tick, sim.score, sim.player_x, sim.player_y,
+                       lane_of(sim.player_x, PLAYER_WIDTH), sim.move_speed,
+                       sim.idle_seconds(), sim.afk_limit, lanes,
+                       player_window, moving_window)
+
+def crossing_ticks(move_speed):
+    """Ticks needed to get fully across the next lane"""
+    return (LANE_WIDTH + PLAYER_WIDTH) / move_speed
+
+def overlap_interval(position, velocity, low, high):
+    """Time range in which position + velocity * t lies strictly between low and high"""
+    if velocity == 0:
+        if low < position < high:
+            return float("-inf"), float("inf")
+        return None
+    start = (low - position) / velocity
+    end = (high - position) / velocity
+    return (start, end) if start < end else (end, start)
+
+def time_to_collision(observation, moving, horizon):
+    """First tick within the horizon at which a car hits the player, or None if there is none"""
+    player_x = observation.player_x
+    player_y = observation.player_y
+    # Cars drift towards the player when it moves, whether the player or the world scrolls
+    drift = -observation.move_speed if moving else 0
+
+    first_hit = None
+    for lane in observation.lanes:
+        for car_x, car_y, speed in lane:
+            # Ticks in which the car overlaps the player horizontally and vertically
+            x_range = overlap_interval(car_x - player_x, drift, -CAR_WIDTH, PLAYER_WIDTH)
+            y_range = overlap_interval(car_y - player_y, speed, -CAR_HEIGHT, PLAYER_HEIGHT)
+            if x_range is None or y_range is None:
+                continue
+            start = max(x_range[0], y_range[0], 0)
+            end = min(x_range[1], y_range[1], horizon)
+            if start < end and (first_hit is None or start < first_hit):
+                first_hit = start
+    return first_hit
+
+# --- POLICIES ---
+
+class AlwaysMoveBot:
+    """Hold the move button the whole time (the simplest possible player)"""
+
+    name = "always_move"
+
+    def __call__(self, observation):
+        return MOVE
+
+class RandomBot:
+    """Move with a fixed probability each tick"""
+
+    name = "random"
+
+    def __init__(self, move_chance=0.5, rng=None):
+        self.move_chance = move_chance
+        self.rng = rng or random.Random()
+
+    def __call__(self, observation):
+        return MOVE if self.rng.random() < self.move_chance else WAIT
+
+class LaneGapBot:
+    """Move only when no car will hit the player while it crosses into the next lane"""
+
+    name = "lane_gap"
+
+    def __init__(self, afk_margin=1.0):
+        # Seconds before the AFK limit at which the bot moves no matter what
+        self.afk_margin = afk_margin
+
+    def __call__(self, observation):
+        horizon = crossing_ticks(observation.move_speed)
+
+        hit_moving = time_to_collision(observation, True, horizon)
+        if hit_moving is None:
+            return MOVE
+
+        # Don't get kicked for being AFK
+        if observation.idle_seconds > observation.afk_limit - self.afk_margin:
+            return MOVE
+
+        # Waiting is only better if it keeps us out of the way for longer
+        hit_waiting = time_to_collision(observation, False, horizon)
+        if hit_waiting is not None and hit_waiting <= hit_moving:
+            return MOVE
+        return WAIT
+
+class SafeWindowBot:
+    """LaneGapBot's rules, with the lane safety index answering when a car reaches the player"""
+
+    name = "safe_window"
+    needs_lane_safety = True
+
+    def __init__(self, afk_margin=1.0):
+        self.afk_margin = afk_margin
+
+    def __call__(self, observation):
+        hit_moving = observation.moving_window
+        if hit_moving >= crossing_ticks(observation.move_speed):
+            return MOVE
+
+        # Don't get kicked for being AFK
+        if observation.idle_seconds > observation.afk_limit - self.afk_margin:
+            return MOVE
+
+        # Waiting is only better if it keeps us out of the way for longer
+        if observation.player_window <= hit_moving:
+            return MOVE
+        return WAIT
+
+# Policies by name, used by --bot and Autoplay.py
+POLICIES = {
+    AlwaysMoveBot.name: AlwaysMoveBot,
+    RandomBot.name: RandomBot,
+    LaneGapBot.name: LaneGapBot,
+    SafeWindowBot.name: SafeWindowBot,
+}
+
+def create_policy(name):
+    """Create a policy by name"""
+    return POLICIES[name]()
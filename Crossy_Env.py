@@ -0,0 +1,258 @@
+"""
+Crossy Road - Greta Thunberg Edition (Learning Environment)
+Gym style reset()/step() environment around the game rules, for training agents.
+
+    env = CrossyEnv("regular", observation="pixels")
+    observation, info = env.reset(seed=1)
+    observation, reward, terminated, truncated, info = env.step(MOVE_ACTION)
+
+Actions are WAIT_ACTION (0) and MOVE_ACTION (1). The reward is the score gained
+in a step, plus WIN_REWARD for winning and CRASH_REWARD when the run ends in a
+collision or by standing still too long.
+
+Two kinds of observation:
+  - "vector": float32 array with the distance to the nearest car in every
+    screen lane and that car's speed (both scaled to about -1..1), then the
+    player's x and how close they are to the AFK limit
+  - "pixels": a small RGB frame (PIXEL_SIZE, as width x height x 3 uint8 like
+    pygame.surfarray), drawn off-screen with plain rectangles at that size and
+    handed out as a pixels3d view of the surface, so reading it copies nothing.
+    The view is reused by the next step, copy it to keep a frame.
+
+VectorEnv steps several environments as one batch and starts a new run in any
+that finished. No window is needed (SDL's dummy video driver is enough):
+    python Crossy_Env.py --envs 8 --steps 20000 --observation pixels
+prints the steps per second, which depend a lot on the machine, so measure
+on your own rather than going by someone else's number.
+"""
+
+import argparse
+import os
+import random
+import time
+
+import pygame
+
+from Game_Simulation import (GameSimulation, SCREEN_WIDTH, SCREEN_HEIGHT, NUM_LANES, LANE_WIDTH,
+                             PLAYER_WIDTH, PLAYER_HEIGHT, CAR_WIDTH, CAR_HEIGHT, FPS,
+                             RESULT_WIN, RESULT_COLLISION, RESULT_AFK, lane_of)
+from Lane_Safety import SpawnValidator
+
+# NumPy is needed for the observations
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- CONSTANTS ---
+
+# Actions
+WAIT_ACTION = 0
+MOVE_ACTION = 1
+
+# Rewards on top of the score gained
+WIN_REWARD = 10.0
+CRASH_REWARD = -1.0
+
+# Runs are cut off (truncated) after this many ticks
+MAX_TICKS = FPS * 60 * 5
+
+# Size of the pixel observation (width, height), a tenth of the canvas
+PIXEL_SIZE = (SCREEN_WIDTH // 10, SCREEN_HEIGHT // 10)
+
+# Colors of the pixel observation
+ROAD_COLOR = (60, 60, 60)
+LANE_COLOR = (90, 90, 90)
+CAR_COLOR = (220, 40, 40)
+PLAYER_COLOR = (40, 200, 70)
+
+# Fastest a car can go, to scale speeds (hard mode tops out at 15 and sometimes speeds a car up)
+SPEED_SCALE = 20.0
+
+# --- ENVIRONMENT ---
+
+class CrossyEnv:
+    """One run of the game at a time, stepped by an agent"""
+
+    def __init__(self, mode="regular", observation="vector", pixel_size=PIXEL_SIZE, max_ticks=MAX_TICKS, seed=None):
+        if np is None:
+            raise ImportError("Crossy_Env needs NumPy (pip install numpy)")
+        if observation not in ("vector", "pixels"):
+            raise ValueError(f"Unknown observation type: {observation}")
+        self.observation_type = observation
+        self.max_ticks = max_ticks
+        self.sim = GameSimulation(mode, seed=seed)
+        # Hard mode plays with the same spawn validation as the game window
+        if self.sim.hard_mode:
+            SpawnValidator(self.sim)
+        # Seeds of the runs after the first, so a seeded environment replays the same runs
+        self.rng = random.Random(seed)
+
+        if observation == "vector":
+            self.observation_shape = (NUM_LANES * 2 + 2,)
+            self._vector = np.zeros(self.observation_shape, dtype=np.float32)
+        else:
+            width, height = pixel_size
+            self.observation_shape = (width, height, 3)
+            self.scale_x = width / SCREEN_WIDTH
+            self.scale_y = height / SCREEN_HEIGHT
+            self.frame = pygame.Surface(pixel_size)
+            # A live view of the surface's pixels, kept for as long as the environment
+            self._pixels = pygame.surfarray.pixels3d(self.frame)
+            # The road and lane markings never change, so they are drawn once and copied in each step
+            background = pygame.Surface(pixel_size)
+            background.fill(ROAD_COLOR)
+            for lane in range(1, NUM_LANES):
+                background.fill(LANE_COLOR, (round(lane * LANE_WIDTH * self.scale_x), 0, 1, height))
+            self._background = pygame.surfarray.array3d(background)
+            self._player_size = (max(1, round(PLAYER_WIDTH * self.scale_x)), max(1, round(PLAYER_HEIGHT * self.scale_y)))
+            self._car_size = (max(1, round(CAR_WIDTH * self.scale_x)), max(1, round(CAR_HEIGHT * self.scale_y)))
+
+    def reset(self, seed=None):
+        """Start a new run, returning (observation, info)"""
+        if seed is None:
+            seed = self.rng.randrange(2 ** 32)
+        self.sim.reset(seed)
+        return self.observe(), {"seed": self.sim.seed}
+
+    def step(self, action):
+        """Play one tick, returning (observation, reward, terminated, truncated, info)"""
+        sim = self.sim
+        score = sim.score
+        result = sim.step(action == MOVE_ACTION)
+        reward = float(sim.score - score)
+        if result == RESULT_WIN:
+            reward += WIN_REWARD
+        elif result in (RESULT_COLLISION, RESULT_AFK):
+            reward += CRASH_REWARD
+        terminated = result is not None
+        truncated = not terminated and sim.tick >= self.max_ticks
+        info = {"result": result, "score": sim.score, "tick": sim.tick}
+        return self.observe(), reward, terminated, truncated, info
+
+    def observe(self):
+        """Observation of the current tick"""
+        if self.observation_type == "vector":
+            return self.observe_vector()
+        return self.observe_pixels()
+
+    def observe_vector(self):
+        """Nearest car of every screen lane (distance, speed), player x and AFK closeness"""
+        sim = self.sim
+        vector = self._vector
+        player_center = sim.player_y + PLAYER_HEIGHT / 2
+        # No car in a lane reads as a car a full screen away, standing still
+        vector[:NUM_LANES] = 1.0
+        vector[NUM_LANES:NUM_LANES * 2] = 0.0
+        for car in sim.cars:
+            lane = lane_of(car["x"], CAR_WIDTH)
+            if 0 <= lane < NUM_LANES:
+                distance = (car["y"] + CAR_HEIGHT / 2 - player_center) / SCREEN_HEIGHT
+                if abs(distance) < abs(vector[lane]):
+                    vector[lane] = distance
+                    vector[NUM_LANES + lane] = car["speed"] / SPEED_SCALE
+        vector[-2] = sim.player_x / SCREEN_WIDTH
+        vector[-1] = sim.idle_seconds() / sim.afk_limit
+        return vector
+
+    def observe_pixels(self):
+        """Draw the tick into the small frame and return the view of its pixels"""
+        sim = self.sim
+        frame = self.frame
+        scale_x = self.scale_x
+        scale_y = self.scale_y
+
+        # Filling works while the pixels are viewed, blitting would need the surface unlocked
+        self._pixels[...] = self._background
+        width, height = self._car_size
+        for car in sim.cars:
+            frame.fill(CAR_COLOR, (round(car["x"] * scale_x), round(car["y"] * scale_y), width, height))
+        width, height = self._player_size
+        frame.fill(PLAYER_COLOR, (round(sim.player_x * scale_x), round(sim.player_y * scale_y), width, height))
+        return self._pixels
+
+    def close(self):
+        """Let go of the pixel view"""
+        self._pixels = None
+
+class VectorEnv:
+    """Several environments stepped together, each starting a new run as soon as its last one ended"""
+
+    def __init__(self, count, mode="regular", observation="vector", seed=None, **options):
+        first_seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.envs = [CrossyEnv(mode, observation, seed=first_seed + index, **options) for index in range(count)]
+        self.observation_shape = (count,) + self.envs[0].observation_shape
+        dtype = np.float32 if observation == "vector" else np.uint8
+        self.observations = np.zeros(self.observation_shape, dtype=dtype)
+        self.rewards = np.zeros(count, dtype=np.float32)
+        self.terminated = np.zeros(count, dtype=bool)
+        self.truncated = np.zeros(count, dtype=bool)
+
+    def reset(self):
+        """Start a new run in every environment, returning (observations, infos)"""
+        infos = []
+        for index, env in enumerate(self.envs):
+            observation, info = env.reset()
+            self.observations[index] = observation
+            infos.append(info)
+        return self.observations, infos
+
+    def step(self, actions):
+        """Play one tick in every environment, returning batched (observations, rewards, terminated, truncated, infos).
+
+        An environment whose run ended is reset right away; its observation is
+        the first of the new run and the last one of the old run is in
+        infos[index]["final_observation"].
+        """
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, reward, terminated, truncated, info = env.step(action)
+            if terminated or truncated:
+                info["final_observation"] = observation.copy()
+                observation, _ = env.reset()
+            self.observations[index] = observation
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            infos.append(info)
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        """Close every environment"""
+        for env in self.envs:
+            env.close()
+
+# --- BENCHMARK ---
+
+def main(argv=None):
+    """Command line entry point: step random agents and report the steps per second"""
+    parser = argparse.ArgumentParser(description="Benchmark the learning environment with random actions")
+    parser.add_argument("--envs", type=int, default=8, help="Environments stepped together")
+    parser.add_argument("--steps", type=int, default=20000, help="Steps in total over all environments")
+    parser.add_argument("--mode", choices=("regular", "hard"), default="regular")
+    parser.add_argument("--observation", choices=("vector", "pixels"), default="pixels")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    vector_env = VectorEnv(args.envs, args.mode, args.observation, seed=args.seed)
+    vector_env.reset()
+    rng = np.random.default_rng(args.seed)
+    batches = max(1, args.steps // args.envs)
+    episodes = 0
+
+    start_time = time.perf_counter()
+    for _ in range(batches):
+        actions = rng.integers(0, 2, size=args.envs)
+        _, _, terminated, truncated, _ = vector_env.step(actions)
+        episodes += int(np.count_nonzero(terminated | truncated))
+    elapsed = time.perf_counter() - start_time
+    vector_env.close()
+
+    steps = batches * args.envs
+    print(f"{args.mode} {args.observation}: {steps} steps in {elapsed:.2f} s, "
+          f"{steps / elapsed:.0f} steps/s over {args.envs} envs ({episodes} runs finished), "
+          f"observations {vector_env.observation_shape}")
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    main()
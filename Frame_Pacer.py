@@ -0,0 +1,59 @@
+"""
+Crossy Road - Greta Thunberg Edition (Frame Pacer)
+Paces the main loops of the launcher and both game modes.
+
+While the game is running every frame is paced to the full FPS like before.
+On a still screen (the launcher, the pause and game over menus) nothing changes
+until the player does something, so the pacer sleeps in pygame.event.wait until
+an event arrives instead of redrawing the same frame FPS times a second. After
+each event it keeps the full rate for a moment, so button hover effects and
+other UI animations finish smoothly, then goes back to sleep.
+"""
+
+import pygame
+
+# --- CONSTANTS ---
+
+# Seconds of full rate frames after the last event on a still screen
+UI_ANIMATION_SECONDS = 0.5
+
+# Longest sleep on a still screen (milliseconds) before the loop gets a turn anyway
+IDLE_TIMEOUT_MS = 1000
+
+# --- FRAME PACER ---
+
+class FramePacer:
+    """Full frame rate while something moves, sleep until input while the screen is still"""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.redraw = True
+        self._active = True
+        self._animating_until = 0
+
+    def next_frame(self, active):
+        """Wait for the next frame and return its events and the seconds since the last frame.
+
+        active means the scene changes on its own (the game is running) and is
+        always drawn at the full rate. Otherwise redraw tells whether anything
+        may have changed since the last frame.
+        """
+        now = pygame.time.get_ticks()
+        if active != self._active:
+            # The screen just started or stopped moving (e.g. a menu opened), so draw it fresh
+            self._active = active
+            self._animating_until = now + int(UI_ANIMATION_SECONDS * 1000)
+        if active or now < self._animating_until:
+            time_delta = self.clock.tick(self.fps) / 1000.0
+            events = pygame.event.get()
+        else:
+            # Sleep until something happens; SDL wakes us for the first event
+            event = pygame.event.wait(IDLE_TIMEOUT_MS)
+            events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+            time_delta = self.clock.tick() / 1000.0
+
+        if events:
+            self._animating_until = pygame.time.get_ticks() + int(UI_ANIMATION_SECONDS * 1000)
+        self.redraw = active or bool(events) or now < self._animating_until
+        return events, time_delta
@@ -0,0 +1,84 @@
+"""
+Crossy Road - Greta Thunberg Edition (GC Policy)
+Keeps Python's cyclic garbage collector from pausing the game in the middle of a frame.
+
+  - Everything loaded at startup (images, sprites, fonts, the UI) lives for the
+    whole game, so it is frozen with gc.freeze() and never scanned again.
+  - While a run is being played automatic collection is off. Between two
+    frames, the youngest generation is collected once enough objects have
+    piled up, which is quick because the game rarely keeps what it allocates.
+  - When play stops (a menu opens, the run is won or lost) everything is
+    collected at once, where a pause can't be seen.
+Every collection, automatic or not, is timed for the profiler overlay.
+"""
+
+import collections
+import gc
+import time
+
+# --- CONSTANTS ---
+
+# Objects allocated (and not freed) during play before the youngest generation is collected between frames
+PLAY_YOUNG_LIMIT = 5000
+
+# Collections kept for the pause statistics
+PAUSE_HISTORY = 60
+
+# --- GC POLICY ---
+
+class GCPolicy:
+    """Freeze the startup heap, and only collect at the safe points of the frame loop"""
+
+    def __init__(self, young_limit=PLAY_YOUNG_LIMIT):
+        self.young_limit = young_limit
+        self.playing = False
+        # Seconds each of the last collections took
+        self.pauses = collections.deque(maxlen=PAUSE_HISTORY)
+        self.collections = 0
+        self.play_collections = 0
+        self._started = None
+        gc.callbacks.append(self._timed)
+
+    def _timed(self, phase, info):
+        """gc callback timing every collection"""
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.pauses.append(time.perf_counter() - self._started)
+            self.collections += 1
+            if self.playing:
+                self.play_collections += 1
+            self._started = None
+
+    def freeze(self):
+        """Move everything alive now (the loaded game) out of the collector's way for good"""
+        gc.collect()
+        gc.freeze()
+
+    def set_playing(self, playing):
+        """Switch between play (no automatic collection) and a still screen (collect everything now)"""
+        if playing == self.playing:
+            return
+        self.playing = playing
+        if playing:
+            gc.disable()
+        else:
+            gc.enable()
+            gc.collect()
+
+    def frame_end(self):
+        """Safe point between two frames of play, collecting the youngest objects if enough piled up"""
+        if self.playing and gc.get_count()[0] > self.young_limit:
+            gc.collect(0)
+
+    def close(self):
+        """Give the collector back its usual behaviour"""
+        gc.callbacks.remove(self._timed)
+        gc.enable()
+
+    def lines(self):
+        """Pause statistics for the profiler overlay"""
+        if not self.pauses:
+            return [f"gc no pauses yet ({gc.get_freeze_count()} objects frozen)"]
+        return [f"gc last {self.pauses[-1] * 1000:.2f} ms, worst {max(self.pauses) * 1000:.2f} ms "
+                f"({self.collections} runs, {self.play_collections} in play)"]
@@ -0,0 +1,95 @@
+"""
+Crossy Road - Greta Thunberg Edition (Game Options)
+Command line options shared by the launcher and both game modes.
+The launcher forwards its own arguments to the selected game mode,
+so e.g. `python Launcher.py --renderer gpu` applies to every game started from it.
+"""
+
+import argparse
+import sys
+
+from Alloc_Audit import DEFAULT_INTERVAL
+from Audio import DEFAULT_BUFFER_SIZE
+from Bot import POLICIES
+from Game_Simulation import MAX_PLAYERS
+from Rewind import REWIND_SECONDS
+
+# --- CONSTANTS ---
+
+# Available render backends (see Render_Backend.py)
+RENDERER_CHOICES = ("software", "gpu")
+
+# Seeds are saved as unsigned 32-bit numbers (ghosts, saved runs, the network protocol)
+MAX_SEED = 2 ** 32 - 1
+
+# --- OPTION PARSING ---
+
+def parse_size(text):
+    """Parse a WIDTHxHEIGHT window size"""
+    try:
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r}, expected WIDTHxHEIGHT")
+
+def parse_seed(text):
+    """Parse a seed, which has to fit the 32 bits it is saved in"""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed {text!r}, expected a whole number")
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed {seed} out of range, expected 0 to {MAX_SEED}")
+    return seed
+
+def build_parser():
+    """Build the argument parser shared by all game scripts"""
+    parser = argparse.ArgumentParser(description="Crossy Road - Greta Thunberg Edition")
+    parser.add_argument("--renderer", choices=RENDERER_CHOICES, default=None,
+                        help="Render backend to use (falls back to software if unavailable)")
+    parser.add_argument("--fullscreen", action="store_true", default=None,
+                        help="Run fullscreen at the desktop resolution (or --window-size)")
+    parser.add_argument("--window-size", type=parse_size, default=None, metavar="WIDTHxHEIGHT",
+                        help="Size of the game window, the game canvas is scaled to fit it")
+    parser.add_argument("--pixel-scale", type=int, default=None, metavar="N",
+                        help="Render at 1/N of the window resolution and upscale by N")
+    parser.add_argument("--seed", type=parse_seed, default=None,
+                        help="Seed for the car spawns, so the same run can be played again")
+    parser.add_argument("--bot", choices=sorted(POLICIES), default=None,
+                        help="Let a bot play instead of the keyboard (see Bot.py)")
+    parser.add_argument("--hints", action="store_true",
+                        help="Show whether the lane ahead is safe to cross")
+    parser.add_argument("--players", type=int, choices=range(1, MAX_PLAYERS + 1), default=1,
+                        help="Number of local players sharing the road")
+    parser.add_argument("--no-telemetry", dest="telemetry", action="store_false",
+                        help="Don't log gameplay events to the telemetry folder")
+    parser.add_argument("--profile", action="store_true",
+                        help="Show the profiling overlay (toggle with F3)")
+    parser.add_argument("--practice", action="store_true",
+                        help="Practice mode: rewind a few seconds after a crash, or any time with Backspace")
+    parser.add_argument("--rewind-seconds", type=float, default=REWIND_SECONDS, metavar="SECONDS",
+                        help="Seconds of the run kept for rewinding (bounds the memory it uses)")
+    parser.add_argument("--alloc-audit", type=int, nargs="?", const=DEFAULT_INTERVAL, default=None, metavar="FRAMES",
+                        help="Report what the game loop allocates every FRAMES frames (slow, see Alloc_Audit.py)")
+    parser.add_argument("--new-run", dest="resume", action="store_false",
+                        help="Start a new run instead of resuming the one left in progress last time")
+    parser.add_argument("--capture", nargs="?", const="", default=None, metavar="PATH",
+                        help="Record the game to PATH (default: the captures folder, see Video_Capture.py)")
+    parser.add_argument("--capture-scale", type=int, default=1, metavar="N",
+                        help="Record every Nth pixel of each row and column, for smaller captures")
+    parser.add_argument("--sim-thread", action="store_true",
+                        help="Run the simulation on its own thread, drawing from its snapshots (see Sim_Thread.py)")
+    parser.add_argument("--no-sound", dest="sound", action="store_false",
+                        help="Play without sound effects and music")
+    parser.add_argument("--audio-buffer", type=int, default=DEFAULT_BUFFER_SIZE, metavar="SAMPLES",
+                        help="Mixer buffer size, smaller for less latency, larger for less CPU")
+    return parser
+
+def parse_options(argv=None):
+    """Parse the known game options, warning about (but not failing on) anything we don't recognise"""
+    if argv is None:
+        argv = sys.argv[1:]
+    options, unknown = build_parser().parse_known_args(argv)
+    if unknown:
+        print(f"Ignoring unrecognised options: {' '.join(unknown)}")
+    return options
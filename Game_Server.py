@@ -0,0 +1,530 @@
+"""
+Crossy Road - Greta Thunberg Edition (Game Server)
+Authoritative multiplayer server: one simulation of the car field, shared by
+every connected player over TCP.
+
+Cars move in straight lines, so the server never streams car positions. It
+only sends what changes: car spawns, despawns and speed changes (as a
+simulation listener), plus a small per-tick record with the player positions.
+Clients dead-reckon every car from its last event. Each client predicts its
+own player from the inputs the server has not acknowledged yet, and replays
+them on top of every authoritative update (reconciliation). Predictions are
+checked in world coordinates, because another player scrolling the road moves
+everyone's screen x without it being a misprediction.
+
+Run a server:
+    python Game_Server.py --serve --players 2 --port 5555
+Measure server cost and bandwidth with N bot clients in one process:
+    python Game_Server.py --loopback 1 2 4 --ticks 900
+"""
+
+import argparse
+import asyncio
+import collections
+import socket
+import struct
+import time
+
+from Bot import create_policy, observe, MOVE, POLICIES
+from Game_Simulation import (GameSimulation, MODES, MAX_PLAYERS, FPS, RESULT_WIN, RESULT_COLLISION,
+                             RESULT_AFK, player_rows, player_step)
+from Lane_Safety import LaneSafetyIndex, SpawnValidator
+
+# --- CONSTANTS ---
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5555
+
+# Messages, each a fixed size record starting with its type byte (little endian)
+MSG_WELCOME = 1  # player index, players, mode, seed
+MSG_RESET = 2    # tick of a new run, followed by a MSG_SPAWN for every car
+MSG_SPAWN = 3    # car id, world x, y at tick, speed, tick, lane
+MSG_DESPAWN = 4  # car id
+MSG_SPEED = 5    # car id, y at tick, new speed, tick
+MSG_TICK = 6     # tick, background offset, players, then a PLAYER_STATE per player
+MSG_ACK = 7      # last input the server applied for this client
+MSG_RESULT = 8   # how the run ended, winner (-1 if none)
+MSG_INPUT = 9    # client to server: input sequence number, move flag
+
+MESSAGES = {
+    MSG_WELCOME: struct.Struct("<BBBBI"),
+    MSG_RESET: struct.Struct("<BI"),
+    MSG_SPAWN: struct.Struct("<BIiddIB"),
+    MSG_DESPAWN: struct.Struct("<BI"),
+    MSG_SPEED: struct.Struct("<BIddI"),
+    MSG_TICK: struct.Struct("<BIiB"),
+    MSG_ACK: struct.Struct("<BI"),
+    MSG_RESULT: struct.Struct("<Bbb"),
+    MSG_INPUT: struct.Struct("<BIB"),
+}
+
+# x, score and whether the player is out, appended to MSG_TICK for every player
+PLAYER_STATE = struct.Struct("<iHB")
+
+MODE_CODES = {name: code for code, name in enumerate(sorted(MODES))}
+RESULT_CODES = {RESULT_WIN: 0, RESULT_COLLISION: 1, RESULT_AFK: 2}
+
+# --- MESSAGE HELPERS ---
+
+def pack(message_type, *fields):
+    """Encode one message"""
+    return MESSAGES[message_type].pack(message_type, *fields)
+
+def parse_messages(buffer):
+    """Split complete messages off the front of a bytearray, yielding (type, fields)
+
+    Raises ValueError on a type byte that isn't a message, since nothing after it can be trusted.
+    """
+    offset = 0
+    while offset < len(buffer):
+        message_type = buffer[offset]
+        record = MESSAGES.get(message_type)
+        if record is None:
+            del buffer[:offset]
+            raise ValueError(f"unknown message type {message_type}")
+        size = record.size
+        if message_type == MSG_TICK:
+            if offset + size > len(buffer):
+                break
+            size += buffer[offset + size - 1] * PLAYER_STATE.size
+        if offset + size > len(buffer):
+            break
+
+        fields = record.unpack_from(buffer, offset)[1:]
+        if message_type == MSG_TICK:
+            start = offset + record.size
+            players = [PLAYER_STATE.unpack_from(buffer, start + i * PLAYER_STATE.size) for i in range(fields[2])]
+            fields = fields + (players,)
+        offset += size
+        yield message_type, fields
+    del buffer[:offset]
+
+# --- SERVER ---
+
+class GameServer:
+    """Run one simulation and stream its changes to every connected client"""
+
+    def __init__(self, mode="regular", players=2, seed=None):
+        self.sim = GameSimulation(mode, seed=seed, players=players)
+        self.mode = mode
+        # Hard mode plays with the same spawn validation as the game window
+        if self.sim.hard_mode:
+            SpawnValidator(self.sim)
+
+        # Writer and queued inputs of each player slot (None while the slot is free)
+        self.clients = [None] * players
+        # Events of the current tick, encoded once and sent to every client
+        self._events = bytearray()
+
+        self.sim.add_listener(self)
+
+        # Cost of each tick in seconds and the bytes sent to each client
+        self.tick_times = []
+        self.bytes_sent = 0
+        self.messages_sent = 0
+
+    # --- Simulation listener ---
+
+    def cars_reset(self, sim):
+        """Start a new run on every client"""
+        self._events.clear()
+        self._events += self.snapshot()
+
+    def state_restored(self, sim):
+        """Send every client the restored car field"""
+        self.cars_reset(sim)
+
+    def car_spawned(self, sim, car):
+        """Tell clients about a new car"""
+        self._events += self._spawn(car, sim.tick)
+
+    def car_despawned(self, sim, car):
+        """Tell clients a car left the road"""
+        self._events += pack(MSG_DESPAWN, car["id"])
+
+    def car_speed_changed(self, sim, car, tick):
+        """Tell clients a car sped up or slowed down"""
+        self._events += pack(MSG_SPEED, car["id"], car["y"], car["speed"], tick)
+
+    def _spawn(self, car, tick):
+        """Encode a car with its position in world coordinates"""
+        return pack(MSG_SPAWN, car["id"], car["x"] - self.sim.background_offset,
+                    car["y"], car["speed"], tick, car["lane"])
+
+    def snapshot(self):
+        """Encode the whole car field, for new runs and clients joining mid-run"""
+        data = bytearray(pack(MSG_RESET, self.sim.tick))
+        for car in self.sim.cars:
+            data += self._spawn(car, self.sim.tick)
+        return data
+
+    # --- Connections ---
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start accepting clients"""
+        self.server = await asyncio.start_server(self._handle_client, host, port)
+        return self.server
+
+    async def _handle_client(self, reader, writer):
+        """Give a new client a free player slot and read its inputs"""
+        if None not in self.clients:
+            writer.close()
+            return
+        index = self.clients.index(None)
+        client = {"writer": writer, "inputs": collections.deque(), "ack": 0}
+        self.clients[index] = client
+
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # Small messages every tick, don't wait to batch them
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        writer.write(pack(MSG_WELCOME, index, len(self.clients), MODE_CODES[self.mode], self.sim.seed))
+        writer.write(self.snapshot())
+
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                buffer += data
+                for message_type, fields in parse_messages(buffer):
+                    if message_type == MSG_INPUT:
+                        client["inputs"].append(fields)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            print(f"Dropping player {index + 1}: {e}")
+        finally:
+            self.clients[index] = None
+            writer.close()
+
+    # --- Tick ---
+
+    def tick(self):
+        """Step the simulation with one queued input per client and send the changes"""
+        start_time = time.perf_counter()
+        sim = self.sim
+
+        moves = [False] * len(self.clients)
+        for index, client in enumerate(self.clients):
+            if client is not None and client["inputs"]:
+                sequence, move = client["inputs"].popleft()
+                moves[index] = bool(move)
+                client["ack"] = sequence
+
+        result = sim.step(moves)
+
+        # Shared part of the update, then the acknowledgement of each client
+        data = self._events
+        data += pack(MSG_TICK, sim.tick, sim.background_offset, len(sim.players))
+        for player in sim.players:
+            data += PLAYER_STATE.pack(player["x"], player["score"], player["out"] is not None)
+        if result is not None:
+            winner = sim.winner if sim.winner is not None else -1
+            data += pack(MSG_RESULT, RESULT_CODES[result], winner)
+
+        for client in self.clients:
+            if client is not None:
+                message = data + pack(MSG_ACK, client["ack"])
+                client["writer"].write(message)
+                self.bytes_sent += len(message)
+                self.messages_sent += 1
+        self._events = bytearray()
+
+        # Runs end on the server, which starts the next one right away
+        if result is not None:
+            sim.reset()
+
+        self.tick_times.append(time.perf_counter() - start_time)
+        return result
+
+    async def run(self, ticks=None, interval=1 / FPS):
+        """Tick at a fixed rate, for a number of ticks or forever"""
+        count = 0
+        next_tick = time.perf_counter()
+        while ticks is None or count < ticks:
+            self.tick()
+            count += 1
+            next_tick += interval
+            await asyncio.sleep(max(0, next_tick - time.perf_counter()))
+
+# --- CLIENT ---
+
+class ClientWorld:
+    """A client's copy of the game, rebuilt from server messages and the player's own predictions
+
+    Exposes the same attributes as GameSimulation that Bot.observe reads, so bots can play over the network.
+    Given a LaneSafetyIndex, keeps it up to date from the car events the server sends.
+    """
+
+    def __init__(self, lane_safety=None):
+        self.index = 0
+        self.mode = "regular"
+        self.move_speed = MODES[self.mode]["move_speed"]
+        self.afk_limit = MODES[self.mode]["afk_limit"]
+        self.seed = 0
+
+        # Last authoritative state
+        self.tick = 0
+        self.server_offset = 0
+        self.players = []
+        self.score = 0
+        self.results = []
+
+        # Car id -> [world x, y, speed, tick at which the car was at y]
+        self.car_tracks = {}
+        self.cars = []
+
+        # Inputs sent but not applied by the server yet, as (sequence, move, predicted world x)
+        self.pending = collections.deque()
+        self.next_sequence = 1
+        self.last_move_tick = 0
+        self.player_x = 0
+        self.player_y = 0
+        self.background_offset = 0
+
+        # Acknowledged inputs whose prediction matched the server, and those that did not
+        self.predictions = 0
+        self.mispredictions = 0
+
+        self.lane_safety = lane_safety
+
+    def apply(self, message_type, fields):
+        """Update the world from one server message"""
+        if message_type == MSG_SPAWN:
+            car_id, world_x, y, speed, tick, lane = fields
+            self.car_tracks[car_id] = [world_x, y, speed, tick]
+            self._index_car(car_id)
+        elif message_type == MSG_SPEED:
+            car_id, y, speed, tick = fields
+            track = self.car_tracks.get(car_id)
+            if track is not None:
+                track[1:] = [y, speed, tick]
+                self._index_car(car_id)
+        elif message_type == MSG_DESPAWN:
+            self.car_tracks.pop(fields[0], None)
+            if self.lane_safety is not None:
+                self.lane_safety.car_despawned(self, {"id": fields[0]})
+        elif message_type == MSG_TICK:
+            self.tick, self.server_offset, _, self.players = fields
+            self.score = self.players[self.index][1]
+        elif message_type == MSG_ACK:
+            self.reconcile(fields[0])
+        elif message_type == MSG_RESET:
+            self.tick = fields[0]
+            self.car_tracks.clear()
+            self.cars = []
+            if self.lane_safety is not None:
+                self.lane_safety.cars_reset(self)
+            self.pending.clear()
+            self.last_move_tick = self.tick
+        elif message_type == MSG_RESULT:
+            self.results.append(fields[0])
+        elif message_type == MSG_WELCOME:
+            self.index, players, mode_code, self.seed = fields
+            self.player_y = player_rows(players)[self.index]
+            self.mode = sorted(MODES)[mode_code]
+            self.move_speed = MODES[self.mode]["move_speed"]
+            self.afk_limit = MODES[self.mode]["afk_limit"]
+
+    def reconcile(self, acknowledged):
+        """Drop the inputs the server applied and replay the rest on top of its state"""
+        server_x = self.players[self.index][0]
+        # Other players scroll everyone's screen x, so predictions are checked in world coordinates
+        server_world_x = server_x - self.server_offset
+        while self.pending and self.pending[0][0] <= acknowledged:
+            sequence, move, predicted_world_x = self.pending.popleft()
+            if sequence == acknowledged:
+                self.predictions += 1
+                if predicted_world_x != server_world_x:
+                    self.mispredictions += 1
+
+        x = server_x
+        offset = self.server_offset
+        out = self.players[self.index][2]
+        for _, move, _ in self.pending:
+            if move and not out:
+                x, scroll = player_step(x, self.move_speed)
+                offset -= scroll
+        self.player_x = x
+        self.background_offset = offset
+        self.player_y = player_rows(len(self.players))[self.index]
+        self.update_cars()
+
+    def _index_car(self, car_id):
+        """(Re)index a car in the lane safety index from where its track says it was"""
+        if self.lane_safety is None:
+            return
+        world_x, y, speed, tick = self.car_tracks[car_id]
+        car = {"id": car_id, "x": world_x + self.background_offset, "y": y, "speed": speed}
+        self.lane_safety.car_speed_changed(self, car, tick)
+
+    def update_cars(self):
+        """Work out where every car is now from its last known track"""
+        offset = self.background_offset
+        tick = self.tick
+        self.cars = [{"x": world_x + offset, "y": y + speed * (tick - at_tick), "speed": speed}
+                     for world_x, y, speed, at_tick in self.car_tracks.values()]
+
+    def predict(self, move):
+        """Apply an input locally and return its sequence number"""
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        # The server ignores the inputs of a player who is out
+        if move and not (self.players and self.players[self.index][2]):
+            self.last_move_tick = self.tick
+            self.player_x, scroll = player_step(self.player_x, self.move_speed)
+            self.background_offset -= scroll
+        self.pending.append((sequence, move, self.player_x - self.background_offset))
+        return sequence
+
+    def idle_seconds(self):
+        """Seconds since this client last moved"""
+        return (self.tick - self.last_move_tick) / FPS
+
+class GameClient:
+    """Connect to a server and play with a policy (or stay idle without one)"""
+
+    def __init__(self, policy=None):
+        self.policy = policy
+        needs_lane_safety = getattr(policy, "needs_lane_safety", False)
+        self.world = ClientWorld(LaneSafetyIndex() if needs_lane_safety else None)
+        self.bytes_received = 0
+
+    async def connect(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Open the connection to the server"""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        sock = self.writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def run(self):
+        """Apply server messages and answer every tick with an input"""
+        buffer = bytearray()
+        world = self.world
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                self.bytes_received += len(data)
+                buffer += data
+                for message_type, fields in parse_messages(buffer):
+                    world.apply(message_type, fields)
+                    # The acknowledgement closes every tick update
+                    if message_type == MSG_ACK:
+                        move = self.policy is not None and self.policy(observe(world, world.lane_safety)) == MOVE
+                        sequence = world.predict(move)
+                        self.writer.write(pack(MSG_INPUT, sequence, move))
+        except ValueError as e:
+            print(f"Disconnecting from the server: {e}")
+            self.close()
+
+    def close(self):
+        """Disconnect from the server"""
+        self.writer.close()
+
+# --- LOOPBACK HARNESS ---
+
+async def run_loopback(clients, ticks, mode="regular", policy_name="lane_gap", seed=0, interval=0.002):
+    """Run a server and bot clients in one process, returning the server and the clients"""
+    server = GameServer(mode, players=clients, seed=seed)
+    listener = await server.start(DEFAULT_HOST, 0)
+    port = listener.sockets[0].getsockname()[1]
+
+    bots = [GameClient(create_policy(policy_name)) for _ in range(clients)]
+    for bot in bots:
+        await bot.connect(DEFAULT_HOST, port)
+    tasks = [asyncio.ensure_future(bot.run()) for bot in bots]
+
+    # Wait until every bot has its player slot
+    while None in server.clients:
+        await asyncio.sleep(0.001)
+
+    await server.run(ticks, interval)
+
+    # Let the clients catch up before comparing their car fields with the server's
+    await asyncio.sleep(0.2)
+    for bot in bots:
+        bot.close()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # A client that failed never played, don't report its run as if it had
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, ConnectionError):
+            raise result
+
+    # Give the server's connection handlers a moment to see the clients go
+    listener.close()
+    await listener.wait_closed()
+    while any(server.clients):
+        await asyncio.sleep(0.001)
+    return server, bots
+
+def car_error(server, client):
+    """Largest distance between a car on the server and the client's copy of it"""
+    world = client.world
+    if world.tick != server.sim.tick:
+        return None
+    offset = server.sim.background_offset
+    error = 0.0
+    for car in server.sim.cars:
+        track = world.car_tracks.get(car["id"])
+        if track is None:
+            return float("inf")
+        world_x, y, speed, at_tick = track
+        error = max(error, abs(world_x + offset - car["x"]), abs(y + speed * (world.tick - at_tick) - car["y"]))
+    return error
+
+def print_loopback_report(server, bots):
+    """Print server cost, bandwidth and prediction accuracy of a loopback run"""
+    times = sorted(server.tick_times)
+    mean_us = sum(times) / len(times) * 1e6
+    p95_us = times[int(len(times) * 0.95)] * 1e6
+    bytes_per_tick = server.bytes_sent / max(1, server.messages_sent)
+    predictions = sum(bot.world.predictions for bot in bots)
+    mispredictions = sum(bot.world.mispredictions for bot in bots)
+    errors = [car_error(server, bot) for bot in bots]
+    error = max((e for e in errors if e is not None), default=None)
+
+    print(f"{len(bots)} players: server tick {mean_us:7.1f} us mean {p95_us:7.1f} us p95  "
+          f"{bytes_per_tick:6.1f} bytes/tick/client ({bytes_per_tick * FPS / 1024:5.2f} KiB/s)  "
+          f"mispredicted {mispredictions}/{predictions}  "
+          f"car error {'n/a' if error is None else f'{error:.3f} px'}")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Authoritative game server and loopback benchmark")
+    parser.add_argument("--serve", action="store_true", help="Run a server until interrupted")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--players", type=int, choices=range(1, MAX_PLAYERS + 1), default=2)
+    parser.add_argument("--mode", choices=sorted(MODES), default="regular")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--loopback", type=int, nargs="+", metavar="N",
+                        help="Benchmark with N bot clients (several counts can be given)")
+    parser.add_argument("--ticks", type=int, default=FPS * 30, help="Ticks per loopback run")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="lane_gap")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        async def serve():
+            server = GameServer(args.mode, args.players, args.seed)
+            await server.start(args.host, args.port)
+            print(f"Serving {args.mode} mode for {args.players} players on {args.host}:{args.port}")
+            await server.run()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    for clients in args.loopback or [1, 2, 4]:
+        clients = min(clients, MAX_PLAYERS)
+        server, bots = asyncio.run(run_loopback(clients, args.ticks, args.mode, args.policy,
+                                                args.seed or 0))
+        print_loopback_report(server, bots)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""
+Crossy Road - Greta Thunberg Edition (Game Simulation)
+The game rules shared by Regular mode and Hard mode, without any drawing or windows.
+Time is counted in ticks (one frame at FPS), so a run plays out the same in the
+game window as it does headless for bots and the autoplay benchmark.
+Seeding the simulation makes the whole run reproducible.
+
+Up to MAX_PLAYERS local players can share one car field, each in their own row.
+The world scrolls with the leader, and a player who drops off the left edge of
+the screen is out, as is one hit by a car. The run ends when every player is out.
+
+Other modules can follow the cars without scanning them every tick by adding a
+listener, which is told whenever a car spawns, despawns or changes speed:
+    cars_reset(sim)
+    car_spawned(sim, car)
+    car_despawned(sim, car)
+    car_speed_changed(sim, car, tick)  # tick at which the car was at car["y"]
+    state_restored(sim)  # the run was put back to an earlier state (rewind, resumed save)
+
+Hard mode car clusters can be checked before they spawn by setting
+spawn_validator to a callable (sim, cluster) -> cars to spawn (see Lane_Safety.py).
+"""
+
+import random
+
+# --- CONSTANTS ---
+
+# Screen dimensions (the logical canvas, see Render_Backend.py)
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 30
+
+# Lane layout
+STEP_SIZE = 40
+SCALE_FACTOR = 2
+SAFE_DISTANCE = STEP_SIZE * 2
+LANE_WIDTH = STEP_SIZE * 3
+NUM_LANES = SCREEN_WIDTH // LANE_WIDTH
+
+# Player settings (sprites are drawn at SCALE_FACTOR times their base size)
+PLAYER_WIDTH = 40 * SCALE_FACTOR
+PLAYER_HEIGHT = 40 * SCALE_FACTOR
+PLAYER_START_X = 10
+PLAYER_START_Y = SCREEN_HEIGHT // 2 - PLAYER_HEIGHT // 2
+
+# Car settings
+CAR_WIDTH = 60 * SCALE_FACTOR
+CAR_HEIGHT = 40 * SCALE_FACTOR
+INITIAL_CARS = 8
+# Cars enter at the top or the bottom of the screen
+SPAWN_ROWS = (-CAR_HEIGHT, SCREEN_HEIGHT)
+
+# Local multiplayer
+MAX_PLAYERS = 4
+
+# A car passing through the player's column this close without touching is a near miss
+NEAR_MISS_DISTANCE = 30
+# Near misses this close together build up a combo
+COMBO_SECONDS = 3
+
+# Settings that differ between the game modes
+MODES = {
+    "regular": {
+        "win_score": 50,      # Score needed to win in regular mode
+        "car_speed_min": 5,
+        "car_speed_max": 10,
+        "move_speed": 10,
+        "afk_limit": 10,      # Seconds without moving before the game ends
+        "lane_step": 2,       # Only even lanes get cars in regular mode
+        "hard_mode": False,
+    },
+    "hard": {
+        "win_score": 30,      # Score needed to win in hard mode
+        "car_speed_min": 7,   # Higher starting speeds for hard mode
+        "car_speed_max": 12,
+        "move_speed": 13,
+        "afk_limit": 10,
+        "lane_step": 1,       # Use all lanes in hard mode, not just even ones
+        "hard_mode": True,    # Accelerating cars, car clusters and speed ramps
+    },
+}
+
+# How a tick can end the run
+RESULT_WIN = "win"
+RESULT_COLLISION = "collision"
+RESULT_AFK = "afk"
+
+# Why a player is out of the run
+OUT_COLLISION = "collision"
+OUT_LEFT_BEHIND = "left_behind"
+
+# --- HELPER FUNCTIONS ---
+
+def check_collision(player_rect, car_rect):
+    """Check if player collides with car (both given as x, y, width, height)"""
+    return (player_rect[0] < car_rect[0] + car_rect[2] and
+            player_rect[0] + player_rect[2] > car_rect[0] and
+            player_rect[1] < car_rect[1] + car_rect[3] and
+            player_rect[1] + player_rect[3] > car_rect[1])
+
+def player_rows(count):
+    """y of each player's row, spread evenly down the screen (a single player is in the middle)"""
+    return [SCREEN_HEIGHT * (i + 1) // (count + 1) - PLAYER_HEIGHT // 2 for i in range(count)]
+
+def player_step(x, move_speed):
+    """Where a moving player ends up after one tick, as (new x, pixels the world scrolls)"""
+    # Past the center of the screen the world scrolls instead of the player moving
+    if x >= SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2:
+        return x, min(move_speed, LANE_WIDTH)
+
+    # Move toward the center of the next lane
+    current_lane = (x + PLAYER_WIDTH // 2) // LANE_WIDTH
+    target_x = ((current_lane + 1) * LANE_WIDTH + LANE_WIDTH // 2) - PLAYER_WIDTH // 2
+    if x < target_x:
+        return x + min(move_speed, target_x - x), 0
+    return x, 0
+
+def lane_of(x, width):
+    """Screen lane containing the center of something drawn at x"""
+    return int((x + width // 2) // LANE_WIDTH)
+
+# --- SIMULATION ---
+
+class GameSimulation:
+    """State and rules of a single run of the game"""
+
+    def __init__(self, mode="regular", seed=None, players=1):
+        self.mode = mode
+        self.num_players = players
+        settings = MODES[mode]
+        self.win_score = settings["win_score"]
+        self.base_speed_min = settings["car_speed_min"]
+        self.base_speed_max = settings["car_speed_max"]
+        self.move_speed = settings["move_speed"]
+        self.afk_limit = settings["afk_limit"]
+        self.lane_step = settings["lane_step"]
+        self.hard_mode = settings["hard_mode"]
+        # Lanes that get cars
+        self.available_lanes = tuple(range(0, NUM_LANES, self.lane_step))
+
+        self.rng = random.Random()
+        self.cars = []
+        self.next_car_id = 0
+        self.listeners = []
+        self.spawn_validator = None
+        self.reset(seed)
+
+    @property
+    def player_x(self):
+        """x of the first player (the only one in single player)"""
+        return self.players[0]["x"]
+
+    @property
+    def player_y(self):
+        """y of the first player (the only one in single player)"""
+        return self.players[0]["y"]
+
+    def add_listener(self, listener):
+        """Follow car spawns, despawns and speed changes (see the module docstring)"""
+        self.listeners.append(listener)
+        listener.cars_reset(self)
+
+    def reset(self, seed=None):
+        """Reset all game variables to starting state"""
+        # Every run gets a seed so it can be replayed
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng.seed(self.seed)
+
+        self.tick = 0
+        self.last_move_tick = 0
+
+        # Player state, one dict per player
+        self.players = [{"x": PLAYER_START_X, "y": row, "score": 0, "out": None, "out_tick": None,
+                         "hit_by": None}
+                        for row in player_rows(self.num_players)]
+        self.winner = None
+
+        # Game progress (the best score of all players)
+        self.score = 0
+        self.background_offset = 0
+
+        # Near miss bonus (does not count towards winning)
+        self.bonus = 0
+        self.combo = 0
+        self.last_near_miss_tick = None
+        self.near_misses = []  # (car, gap) of the near misses in the last tick
+        self.car_speed_min = self.base_speed_min
+        self.car_speed_max = self.base_speed_max
+
+        # Game flow
+        self.game_over = False
+        self.collision_state = False
+        self.win_state = False
+        self.collided_car = None
+
+        # Clear and recreate cars
+        self.cars.clear()
+        for _ in range(INITIAL_CARS):
+            car = self.create_car()
+            car["id"] = self.next_car_id
+            self.next_car_id += 1
+            self.cars.append(car)
+
+        for listener in self.listeners:
+            listener.cars_reset(self)
+
+    # --- CARS ---
+
+    def add_car(self, car):
+        """Put a new car on the road"""
+        car["id"] = self.next_car_id
+        self.next_car_id += 1
+        self.cars.append(car)
+        for listener in self.listeners:
+            listener.car_spawned(self, car)
+
+    def remove_car(self, car):
+        """Take a car off the road"""
+        self.cars.remove(car)
+        for listener in self.listeners:
+            listener.car_despawned(self, car)
+
+    def change_speed(self, car, factor, tick):
+        """Scale the speed of a car, tick being the tick at which it was at its current y"""
+        car["speed"] *= factor
+        for listener in self.listeners:
+            listener.car_speed_changed(self, car, tick)
+
+    def create_car(self):
+        """Create a new car with proper lane positioning and safe distance from other cars"""
+        rng = self.rng
+        attempts = 0
+        max_attempts = 10
+
+        available_lanes = self.available_lanes
+        lane_number = rng.choice(available_lanes)
+        lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2  # Center of lane
+
+        while attempts < max_attempts:
+            # Decide car spawning position and direction
+            car_y = rng.choice(SPAWN_ROWS)
+            car_direction = 1 if car_y == -CAR_HEIGHT else -1
+
+            # Speeds ramp up in fractions in hard mode, randint needs whole numbers
+            min_speed = int(self.car_speed_min)
+            max_speed = int(self.car_speed_max)
+            if max_speed <= min_speed:
+                max_speed = min_speed + 1
+
+            car_speed = rng.randint(min_speed, max_speed) * car_direction
+
+            # Find cars in the same lane
+            cars_in_same_lane = [car for car in self.cars if abs(car["x"] - lane_x) < LANE_WIDTH // 2]
+
+            # If lane is empty, use it
+            if not cars_in_same_lane:
+                return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
+
+            # Check distance to other cars
+            too_close = False
+            for car in cars_in_same_lane:
+                # For cars coming from top or bottom
+                if ((car_y == -CAR_HEIGHT and car["y"] < SCREEN_HEIGHT // 2) or
+                    (car_y == SCREEN_HEIGHT and car["y"] > SCREEN_HEIGHT // 2)):
+                    if abs(car["y"] - car_y) < SAFE_DISTANCE:
+                        too_close = True
+                        break
+
+            # If not too close to any car, use this position
+            if not too_close:
+                return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
+
+            # Try a different lane
+            attempts += 1
+            lane_number = available_lanes[(available_lanes.index(lane_number) + 1) % len(available_lanes)]
+            lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2
+
+        # Fall back to last attempted position
+        return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
+
+    def create_car_cluster(self):
+        """Create a challenging cluster of cars in adjacent lanes (hard mode feature)"""
+        rng = self.rng
+        starting_lane = rng.randint(0, NUM_LANES - 3)  # Leave room for at least 3 cars
+
+        cluster = []
+        for i in range(3):  # Create 3 cars in adjacent lanes
+            lane_number = starting_lane + i
+            lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2
+            car_y = rng.choice(SPAWN_ROWS)
+            car_direction = 1 if car_y == -CAR_HEIGHT else -1
+
+            # Stagger speeds slightly to create gaps that close
+            car_speed = (rng.randint(int(self.car_speed_min), int(self.car_speed_max)) + i) * car_direction
+
+            cluster.append({
+                "x": lane_x - CAR_WIDTH // 2,
+                "y": car_y,
+                "speed": car_speed,
+                "lane": lane_number
+            })
+
+        return cluster
+
+    def update_cars(self):
+        """Move all cars, replace the ones that left the screen and return the car hitting the last player"""
+        # Every car is checked against all players still in the run in this one pass,
+        # and only cars inside the span of the players' columns get a closer look
+        players = [(player["x"], player["x"] + PLAYER_WIDTH, player["y"], player["y"] + PLAYER_HEIGHT, player)
+                   for player in self.players if player["out"] is None]
+        span_left = min(player[0] for player in players)
+        span_right = max(player[1] for player in players)
+
+        # Walk the list in place: a car that leaves is swapped for a new one at the end,
+        # which doesn't move until the next tick, so only the cars there now are visited
+        cars = self.cars
+        index = 0
+        for _ in range(len(cars)):
+            car = cars[index]
+            index += 1
+
+            # Only move cars if the player hasn't won
+            if self.win_state:
+                continue
+
+            # Hard mode feature: Random chance for cars to accelerate
+            if self.hard_mode and self.rng.random() < 0.01:  # 1% chance each tick
+                self.change_speed(car, 1.5, self.tick - 1)  # Accelerate by 50%
+
+            car["y"] += car["speed"]
+
+            # Remove cars that go off screen and add new ones
+            if car["y"] < -CAR_HEIGHT or car["y"] > SCREEN_HEIGHT:
+                self.remove_car(car)
+                self.add_car(self.create_car())
+                index -= 1
+                continue
+
+            # Only cars in a player's column can hit it or narrowly miss it
+            closest = None
+            car_left = car["x"]
+            car_right = car_left + CAR_WIDTH
+            if car_left < span_right and car_right > span_left:
+                for entry in players:
+                    left, right, top, bottom, player = entry
+                    if car_left < right and car_right > left:
+                        # Vertical gap between car and player, negative if they overlap
+                        gap = max(car["y"] - bottom, top - (car["y"] + CAR_HEIGHT))
+                        if gap < 0:
+                            player["out"] = OUT_COLLISION
+                            player["out_tick"] = self.tick
+                            player["hit_by"] = car
+                            players.remove(entry)
+                            if not players:
+                                return car
+                            break
+                        if gap <= NEAR_MISS_DISTANCE and (closest is None or gap < closest):
+                            closest = gap
+
+            if closest is not None:
+                car["closest"] = min(car.get("closest", closest), closest)
+                continue
+
+            # A car that came close and is now moving away was a near miss
+            if "closest" in car:
+                self.near_miss(car, car.pop("closest"))
+
+        return None
+
+    def near_miss(self, car, gap):
+        """Reward a car passing the player by a hair, near misses in a row build a combo"""
+        if self.last_near_miss_tick is not None and self.tick - self.last_near_miss_tick <= COMBO_SECONDS * FPS:
+            self.combo += 1
+        else:
+            self.combo = 1
+        self.last_near_miss_tick = self.tick
+        self.bonus += self.combo
+        self.near_misses.append((car, gap))
+
+    def update_hard_mode(self):
+        """Random car clusters and speed changes (hard mode feature)"""
+        # Occasionally spawn car clusters
+        if self.rng.random() < 0.005 and self.score > 10:  # 0.5% chance each tick after score > 10
+            cluster = self.create_car_cluster()
+            if self.spawn_validator is not None:
+                cluster = self.spawn_validator(self, cluster)
+            for car in cluster:
+                self.add_car(car)
+
+        # Periodically change car speeds
+        if self.rng.random() < 0.02:  # 2% chance each tick
+            for car in self.cars:
+                # 50% chance to speed up, 50% chance to slow down
+                speed_factor = 1.2 if self.rng.random() < 0.5 else 0.8
+                self.change_speed(car, speed_factor, self.tick)
+
+    # --- PLAYER ---
+
+    def move_player(self, index=0):
+        """Move a player (or scroll the world) one tick forward"""
+        self.last_move_tick = self.tick
+
+        # Don't process movement if player has won
+        if self.win_state:
+            return
+
+        player = self.players[index]
+        current_lane = (player["x"] + PLAYER_WIDTH // 2) // LANE_WIDTH
+        new_x, movement = player_step(player["x"], self.move_speed)
+
+        if movement:
+            # Move background and obstacles instead of player
+            self.background_offset -= movement
+            for car in self.cars:
+                car["x"] -= movement
+
+            # The camera follows the leader, anyone pushed off the left edge is out
+            for other in self.players:
+                if other is not player:
+                    other["x"] -= movement
+                    if other["out"] is None and other["x"] + PLAYER_WIDTH <= 0:
+                        other["out"] = OUT_LEFT_BEHIND
+                        other["out_tick"] = self.tick
+
+            # Increase score when we've moved a full lane width
+            if abs(self.background_offset % LANE_WIDTH) < self.move_speed:
+                player["score"] += 1
+        else:
+            # Move player toward the next lane
+            player["x"] = new_x
+
+            # Increase score when we cross into a new lane
+            new_lane = (player["x"] + PLAYER_WIDTH // 2) // LANE_WIDTH
+            if new_lane > current_lane:
+                player["score"] += 1
+
+        if player["score"] > self.score:
+            self.score = player["score"]
+
+        # Hard mode: Increase difficulty as score increases
+        if self.hard_mode and self.score > 0 and self.score % 10 == 0:
+            self.car_speed_min = min(self.car_speed_min + 0.5, 10)
+            self.car_speed_max = min(self.car_speed_max + 0.5, 15)
+
+    def idle_seconds(self):
+        """Seconds since any player last moved"""
+        return (self.tick - self.last_move_tick) / FPS
+
+    # --- TICK ---
+
+    def step(self, move=False):
+        """Advance the game by one tick, returning a RESULT_* constant if the run ended
+
+        move is either a flag for the first player or a list with a flag per player.
+        """
+        if self.game_over:
+            return None
+
+        self.tick += 1
+        result = None
+        self.near_misses.clear()
+
+        moves = move if isinstance(move, (list, tuple)) else (move,)
+        for index, player_move in enumerate(moves):
+            if player_move and self.players[index]["out"] is None:
+                self.move_player(index)
+
+        # Check for win condition (the first player to reach the win score)
+        if self.score >= self.win_score and not self.win_state:
+            self.win_state = True
+            self.winner = next(index for index, player in enumerate(self.players)
+                               if player["score"] == self.score)
+            result = RESULT_WIN
+
+        car = self.update_cars()
+        if car is not None:
+            self.collision_state = True
+            self.collided_car = car
+            self.game_over = True
+            return RESULT_COLLISION
+
+        if self.hard_mode and not self.win_state:
+            self.update_hard_mode()
+
+        # Check AFK status
+        if not self.win_state and self.idle_seconds() > self.afk_limit:
+            self.game_over = True
+            return RESULT_AFK
+
+        return result
@@ -0,0 +1,161 @@
+"""
+Crossy Road - Greta Thunberg Edition (Ghosts)
+Race against your own best runs on a seed.
+
+Every tick of a run the first player's position in the world and score are
+recorded as one signed byte of change each. When the run ends it is saved to
+the ghosts folder next to its mode and seed, keeping the best MAX_GHOSTS runs
+of every seed. Loading a ghost turns the changes back into positions once, so
+playback is a plain lookup by tick and costs nothing per frame.
+"""
+
+import array
+import itertools
+import os
+import struct
+import time
+
+# --- CONSTANTS ---
+
+# Where the ghosts are kept
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ghosts")
+
+# Best runs kept for every mode and seed
+MAX_GHOSTS = 3
+
+# File header: magic, version, seed, ticks, final score, world x at the start
+HEADER = struct.Struct("<4sBIIHi")
+MAGIC = b"GHST"
+VERSION = 1
+
+# --- RECORDING ---
+
+class GhostRecorder:
+    """Record the first player's run as per tick changes"""
+
+    def __init__(self):
+        self.x_deltas = array.array("b")
+        self.score_deltas = array.array("b")
+        self.start_x = 0
+        self._last_x = 0
+        self._last_score = 0
+
+    def start(self, sim):
+        """Start recording a new run"""
+        del self.x_deltas[:]
+        del self.score_deltas[:]
+        self.start_x = self._last_x = sim.player_x - sim.background_offset
+        self._last_score = sim.score
+
+    def record(self, sim):
+        """Record the tick the simulation just played"""
+        if sim.tick == len(self.x_deltas):
+            return  # The simulation did not advance (game over or paused)
+        # Players move at most move_speed pixels a tick, which always fits in a byte
+        world_x = sim.player_x - sim.background_offset
+        self.x_deltas.append(world_x - self._last_x)
+        self.score_deltas.append(sim.players[0]["score"] - self._last_score)
+        self._last_x = world_x
+        self._last_score = sim.players[0]["score"]
+
+    def rewind(self, sim):
+        """Drop the ticks after the one the simulation was rewound to (see Rewind.py)"""
+        del self.x_deltas[sim.tick:]
+        del self.score_deltas[sim.tick:]
+        self._last_x = sim.player_x - sim.background_offset
+        self._last_score = sim.players[0]["score"]
+
+    def save(self, mode, seed, directory=DEFAULT_DIRECTORY):
+        """Save the run if it is one of the best on its seed, returning whether it was kept"""
+        ticks = len(self.x_deltas)
+        if ticks == 0:
+            return False
+        score = self._last_score
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            prefix = f"{mode}-{seed}-"
+            existing = [(read_header(os.path.join(directory, name)), name)
+                        for name in os.listdir(directory) if name.startswith(prefix)]
+            existing = [(header, name) for header, name in existing if header is not None]
+
+            # Best score first, the faster run wins a tie
+            ranked = sorted([((-header[4], header[3]), name) for header, name in existing] +
+                            [((-score, ticks), None)], key=lambda item: item[0])
+            if all(name is not None for _, name in ranked[:MAX_GHOSTS]):
+                return False
+
+            name = f"{prefix}{int(time.time() * 1000)}.ghost"
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, seed, ticks, score, self.start_x))
+                f.write(self.x_deltas.tobytes())
+                f.write(self.score_deltas.tobytes())
+
+            for _, old in ranked[MAX_GHOSTS:]:
+                if old is not None:
+                    os.remove(os.path.join(directory, old))
+        except (OSError, struct.error) as e:
+            print(f"Error saving ghost: {e}")
+            return False
+        return True
+
+# --- PLAYBACK ---
+
+class Ghost:
+    """A recorded run, decoded to one world x and score per tick"""
+
+    def __init__(self, seed, score, world_x, scores):
+        self.seed = seed
+        self.score = score
+        self.world_x = world_x
+        self.scores = scores
+        self.ticks = len(world_x) - 1
+
+    def position(self, tick):
+        """World x of the ghost at a tick, or None once its run is over"""
+        if tick > self.ticks:
+            return None
+        return self.world_x[tick]
+
+    def score_at(self, tick):
+        """Score of the ghost at a tick"""
+        return self.scores[min(tick, self.ticks)]
+
+def read_header(path):
+    """Read the header of a ghost file (None if it is not one)"""
+    try:
+        with open(path, "rb") as f:
+            header = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if header[0] != MAGIC or header[1] != VERSION:
+        return None
+    return header
+
+def load_ghost(path):
+    """Load a ghost file, decoding its changes into positions"""
+    with open(path, "rb") as f:
+        data = f.read()
+    _, version, seed, ticks, score, start_x = HEADER.unpack_from(data)
+    x_deltas = array.array("b", data[HEADER.size:HEADER.size + ticks])
+    score_deltas = array.array("b", data[HEADER.size + ticks:HEADER.size + 2 * ticks])
+
+    # Index 0 is the start of the run, index n the position after tick n
+    world_x = array.array("i", itertools.accumulate(x_deltas, initial=start_x))
+    scores = array.array("H", itertools.accumulate(score_deltas, initial=0))
+    return Ghost(seed, score, world_x, scores)
+
+def load_ghosts(mode, seed, directory=DEFAULT_DIRECTORY):
+    """Load every saved ghost of a mode and seed, best first"""
+    if not os.path.isdir(directory):
+        return []
+    ghosts = []
+    prefix = f"{mode}-{seed}-"
+    for name in sorted(os.listdir(directory)):
+        if name.startswith(prefix) and read_header(os.path.join(directory, name)) is not None:
+            try:
+                ghosts.append(load_ghost(os.path.join(directory, name)))
+            except Exception as e:
+                print(f"Error loading ghost {name}: {e}")
+    ghosts.sort(key=lambda ghost: (-ghost.score, ghost.ticks))
+    return ghosts
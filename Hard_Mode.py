@@ -6,11 +6,37 @@ Hard mode features dynamic difficulty that increases as the player progresses.
 """
 
 import pygame
-import random
 import sys
 import os
 import pygame_gui
 import subprocess
+import threading
+import time
+
+from Alloc_Audit import AllocationAudit
+from Audio import create_audio
+from Bot import create_policy, observe, MOVE
+from Frame_Pacer import FramePacer
+from GC_Policy import GCPolicy
+from Game_Options import parse_options
+from Game_Simulation import (GameSimulation, RESULT_WIN, RESULT_COLLISION, RESULT_AFK,
+                             SCREEN_WIDTH, SCREEN_HEIGHT, FPS, LANE_WIDTH, NUM_LANES,
+                             PLAYER_WIDTH, PLAYER_HEIGHT, CAR_WIDTH, CAR_HEIGHT, lane_of)
+from Ghost import GhostRecorder, load_ghosts
+from Input_Handler import InputHandler, ACTION_MENU, ACTION_PROFILER, ACTION_REWIND, player_move_action
+from Lane_Safety import LaneSafetyIndex, SpawnValidator
+from Particles import create_particles, EXHAUST_INTERVAL
+from Profiler import Profiler
+from Quality_Governor import QualityGovernor
+from Render_Backend import create_renderer
+from Rewind import RewindBuffer, PRACTICE_REWIND_SECONDS, SCRUB_SECONDS
+from Save_Game import load_run, save_run, delete_save
+from Sim_Thread import SimThread
+from Sprites import (bake_walk_cycle, bake_car_variants, bake_crossfade, walk_frame, car_sprite,
+                     fade_frame, TextCache, COLLISION_FADE_FRAMES)
+from Stats_Store import StatsStore, FrameTimes, CAUSE_QUIT
+from Telemetry import Telemetry
+from Video_Capture import VideoCapture, default_path
 
 # --- INITIALIZATION ---
 
@@ -22,11 +48,6 @@ pygame.init()
 
 # --- CONSTANTS ---
 
-# Screen dimensions and setup
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FPS = 30
-
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -35,61 +56,108 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
 # Game configuration
+GAME_MODE = "hard"  # Rules are in Game_Simulation.MODES
 DEBUG_MODE = False  # Set to False to disable debugging features
-WIN_SCORE = 30      # Score needed to win in hard mode
-STEP_SIZE = 40
-SCALE_FACTOR = 2
-SAFE_DISTANCE = STEP_SIZE * 2
-LANE_WIDTH = STEP_SIZE * 3
-
-# Player settings
-PLAYER_WIDTH = 40
-PLAYER_HEIGHT = 40
-
-# Car settings
-CAR_WIDTH = 60
-CAR_HEIGHT = 40
-car_speed_min = 7   # Higher starting speeds for hard mode
-car_speed_max = 12
+SHOW_HINTS = False  # Tint the lane ahead green/red depending on whether it is safe to cross
+RENDER_BACKEND = "software"  # Set to "gpu" to draw through pygame._sdl2 (see Render_Backend.py)
+FULLSCREEN = False          # The logical canvas is scaled to the window, so any resolution works
+PIXEL_SCALE = 1             # Render at 1/N of the window resolution and upscale by N
+END_SCREEN_FRAMES = 2 * FPS  # Frames the win and collision screens play before the menu opens
 
 # --- SETUP ---
 
-# Create the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Crossy Road - Hard Mode")
+# Parse command line options (the launcher forwards its own)
+options = parse_options()
+
+# Create the game window with the selected render backend
+screen = create_renderer(SCREEN_WIDTH, SCREEN_HEIGHT, "Crossy Road - Hard Mode",
+                         backend=options.renderer or RENDER_BACKEND,
+                         window_size=options.window_size,
+                         fullscreen=options.fullscreen or FULLSCREEN,
+                         pixel_scale=options.pixel_scale or PIXEL_SCALE)
 
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
+# Paces the loop, full rate while playing and sleeping while a menu waits for input
+pacer = FramePacer(FPS)
 
 # Initialize pygame_gui manager
 manager = pygame_gui.UIManager((SCREEN_WIDTH, SCREEN_HEIGHT))
 
+# Keyboard and gamepad input, buffered as actions for each tick
+input_handler = InputHandler(players=options.players)
+
+# Move action of each local player
+player_actions = [player_move_action(index) for index in range(options.players)]
+
+# Optional bot playing instead of the keyboard (see Bot.py)
+bot = create_policy(options.bot) if options.bot else None
+
 # Font initialization
 font = pygame.font.Font(None, 36)
 instruction_font = pygame.font.Font(None, 24)
 
+# HUD text that is drawn every frame is only rendered when it changes
+texts = TextCache()
+
 # --- GAME STATE VARIABLES ---
 
-# Player state
-player_x = 10
-player_y = SCREEN_HEIGHT // 2 - PLAYER_HEIGHT // 2
-last_move_time = pygame.time.get_ticks() / 1000
-move_speed = 13
-afk_limit = 10
+# Cars, player position and score all live in the simulation
+sim = GameSimulation(GAME_MODE, seed=options.seed, players=options.players)
+
+# Pick up the run left in progress when the game was last closed (see Save_Game.py)
+run_resumed = options.resume and bot is None and load_run(sim, GAME_MODE)
+
+# Predicted safe windows of each lane, for the hint overlay and bots
+lane_safety = LaneSafetyIndex(sim)
 
-# Game progress
-score = 0 
-background_offset = 0
+# The last seconds of the run, for rewinding in practice mode and while debugging (see Rewind.py)
+rewind_buffer = None
+if options.practice or DEBUG_MODE:
+    rewind_buffer = RewindBuffer(sim, options.rewind_seconds)
+    rewind_buffer.record()
+
+# With --sim-thread the simulation ticks on its own thread (see Sim_Thread.py),
+# anything else touching sim holds sim_lock and the screen is drawn from its snapshots
+sim_lock = threading.Lock()
+sim_thread = None
+
+# What is drawn: the simulation itself, or the latest snapshot of the simulation thread
+world = sim
+
+# Car clusters must leave the player a way through
+SpawnValidator(sim, lane_safety)
 
 # Game flow control
 menu_open = False
 menu_elements = None
-game_over = False
-collision_state = False
-win_state = False
 
-# Object containers
-cars = []
+# Finished runs are saved for the leaderboard on the launcher
+stats = StatsStore()
+frame_times = FrameTimes()
+run_recorded = False
+
+# Gameplay events, logged off the main loop (see Telemetry.py)
+telemetry = None
+if options.telemetry:
+    telemetry = Telemetry()
+    sim.add_listener(telemetry)
+
+# Race the best runs on the same seed (only when a seed is given, see Ghost.py)
+ghost_recorder = GhostRecorder()
+ghost_recorder.start(sim)
+ghosts = load_ghosts(GAME_MODE, sim.seed) if options.seed is not None else []
+
+# Crash debris, victory confetti and car exhaust (None without NumPy), and the last tick they followed
+particles = create_particles()
+particles_tick = 0
+
+# Optional work is turned down automatically when frames run over budget
+quality = QualityGovernor(FPS)
+
+# Frame timings and the quality tier on screen (F3 or --profile)
+profiler = Profiler(visible=options.profile)
+
+# Sound effects and music (None with --no-sound or without an audio device)
+audio = create_audio(options)
 
 # --- HELPER FUNCTIONS ---
 
@@ -97,7 +165,10 @@ def load_and_scale_image(filename, width, height):
     """Helper function to load and scale an image"""
     try:
         image = pygame.image.load(os.path.join(base_path, filename))
-        return pygame.transform.scale(image, (width, height))
+        scaled_image = pygame.transform.scale(image, (width, height))
+        # Keep the original so the renderer can scale sprites up from full resolution
+        screen.register_source(scaled_image, image)
+        return scaled_image
     except pygame.error as e:
         print(f"Error loading image {filename}: {e}")
         pygame.quit()
@@ -108,17 +179,17 @@ def load_and_scale_image(filename, width, height):
 try:
     # Load all game images
     player_image = load_and_scale_image("Greta_Thunberg.png", 
-                                       PLAYER_WIDTH * SCALE_FACTOR, 
-                                       PLAYER_HEIGHT * SCALE_FACTOR)
+                                       PLAYER_WIDTH, 
+                                       PLAYER_HEIGHT)
     player_collision_image = load_and_scale_image("How_dare_you.png", 
-                                                 PLAYER_WIDTH * SCALE_FACTOR, 
-                                                 PLAYER_HEIGHT * SCALE_FACTOR)
+                                                 PLAYER_WIDTH, 
+                                                 PLAYER_HEIGHT)
     player_win_image = load_and_scale_image("Sitting.png", 
-                                          PLAYER_WIDTH * SCALE_FACTOR, 
-                                          PLAYER_HEIGHT * SCALE_FACTOR)
+                                          PLAYER_WIDTH, 
+                                          PLAYER_HEIGHT)
     car_image = load_and_scale_image("car.png", 
-                                    CAR_WIDTH * SCALE_FACTOR, 
-                                    CAR_HEIGHT * SCALE_FACTOR)
+                                    CAR_WIDTH, 
+                                    CAR_HEIGHT)
     background_image = load_and_scale_image("background.png", 
                                            SCREEN_WIDTH, 
                                            SCREEN_HEIGHT)
@@ -127,199 +198,141 @@ except Exception as e:
     pygame.quit()
     sys.exit()
 
-# Update dimensions to match scaled images
-PLAYER_WIDTH *= SCALE_FACTOR
-PLAYER_HEIGHT *= SCALE_FACTOR
-CAR_WIDTH *= SCALE_FACTOR
-CAR_HEIGHT *= SCALE_FACTOR
-
-# Initialize the current player image
-current_player_image = player_image
+# Tint the other players so everyone can tell their Greta apart
+PLAYER_TINTS = [None, (255, 160, 160), (160, 190, 255), (255, 230, 120)]
+player_images = [player_image]
+for tint in PLAYER_TINTS[1:options.players]:
+    tinted_image = player_image.copy()
+    tinted_image.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+    player_images.append(tinted_image)
+
+# Translucent Greta for the ghosts
+GHOST_ALPHA = 100
+ghost_image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+ghost_image.blit(player_image, (0, 0))
+ghost_image.fill((255, 255, 255, GHOST_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+
+# Bake every animation frame now so drawing never transforms a sprite
+walk_frames = [bake_walk_cycle(image) for image in player_images]
+collision_fades = [bake_crossfade(image, player_collision_image, COLLISION_FADE_FRAMES) for image in player_images]
+car_variants = bake_car_variants(car_image)
 
 # --- GAME FUNCTIONS ---
 
-def create_car():
-    """Create a new car with proper lane positioning and safe distance from other cars"""
-    num_lanes = SCREEN_WIDTH // LANE_WIDTH
-    attempts = 0
-    max_attempts = 10
-    
-    # Use all lanes in hard mode, not just even ones
-    available_lanes = list(range(0, num_lanes))
-    lane_number = random.choice(available_lanes)
-    lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2  # Center of lane
-    
-    while attempts < max_attempts:
-        # Decide car spawning position and direction
-        car_y = random.choice([-CAR_HEIGHT, SCREEN_HEIGHT])
-        car_direction = 1 if car_y == -CAR_HEIGHT else -1
-        
-        # Convert to integers for randint
-        min_speed = int(car_speed_min)
-        max_speed = int(car_speed_max)
-        # Make sure max is at least min+1
-        if max_speed <= min_speed:
-            max_speed = min_speed + 1
-            
-        car_speed = random.randint(min_speed, max_speed) * car_direction
-        
-        # Find cars in the same lane
-        cars_in_same_lane = [car for car in cars if abs(car["x"] - lane_x) < LANE_WIDTH // 2]
-        
-        # If lane is empty, use it
-        if not cars_in_same_lane:
-            return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
-        
-        # Check distance to other cars
-        too_close = False
-        for car in cars_in_same_lane:
-            # For cars coming from top or bottom
-            if ((car_y == -CAR_HEIGHT and car["y"] < SCREEN_HEIGHT // 2) or
-                (car_y == SCREEN_HEIGHT and car["y"] > SCREEN_HEIGHT // 2)):
-                if abs(car["y"] - car_y) < SAFE_DISTANCE:
-                    too_close = True
-                    break
-        
-        # If not too close to any car, use this position
-        if not too_close:
-            return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
-            
-        # Try a different lane
-        attempts += 1
-        lane_number = available_lanes[(available_lanes.index(lane_number) + 1) % len(available_lanes)]
-        lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2
-    
-    # Fall back to last attempted position
-    return {"x": lane_x - CAR_WIDTH // 2, "y": car_y, "speed": car_speed, "lane": lane_number}
-
-def create_car_cluster():
-    """Create a challenging cluster of cars in adjacent lanes (hard mode feature)"""
-    num_lanes = SCREEN_WIDTH // LANE_WIDTH
-    starting_lane = random.randint(0, num_lanes - 3)  # Leave room for at least 3 cars
-    
-    cluster = []
-    for i in range(3):  # Create 3 cars in adjacent lanes
-        lane_number = starting_lane + i
-        lane_x = lane_number * LANE_WIDTH + LANE_WIDTH // 2
-        car_y = random.choice([-CAR_HEIGHT, SCREEN_HEIGHT])
-        car_direction = 1 if car_y == -CAR_HEIGHT else -1
-        
-        # Stagger speeds slightly to create gaps that close
-        car_speed = (random.randint(car_speed_min, car_speed_max) + i) * car_direction
-        
-        cluster.append({
-            "x": lane_x - CAR_WIDTH // 2, 
-            "y": car_y, 
-            "speed": car_speed, 
-            "lane": lane_number
-        })
-    
-    return cluster
-
-def detect_afk(last_move_time, afk_limit=10):
-    """Detect if the player is AFK and notify them"""
-    global menu_open, game_over, menu_elements
-
-    current_time = pygame.time.get_ticks() / 1000
-    time_since_last_move = current_time - last_move_time
+def draw_afk_warning():
+    """Warn the player when they are about to be kicked for being AFK"""
+    time_since_last_move = world.idle_seconds()
     
     # Show warning when we're 3 seconds away from timeout
-    if time_since_last_move > afk_limit - 3:
-        # Create semi-transparent surface for warning backdrop
-        warning_bg = pygame.Surface((400, 80), pygame.SRCALPHA)
-        warning_bg.fill((255, 200, 200, 180))  # Semi-transparent red
-        screen.blit(warning_bg, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 40))
+    if time_since_last_move > world.afk_limit - 3:
+        # Draw semi-transparent warning backdrop
+        if quality.settings["overlays"]:
+            screen.fill_rect((255, 200, 200, 180),  # Semi-transparent red
+                             (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 40, 400, 80))
         
         # Calculate remaining time
-        time_left = afk_limit - time_since_last_move
+        time_left = world.afk_limit - time_since_last_move
         time_left_str = f"{time_left:.1f}" if time_left < 3 else f"{int(time_left)}"
         
         # Display warning and timer
-        afk_warning = font.render("Move or the game will end!", True, RED)
-        timer_text = font.render(f"Time left: {time_left_str} s", True, BLACK)
+        afk_warning = texts.render(font, "Move or the game will end!", RED)
+        timer_text = texts.render(font, f"Time left: {time_left_str} s", BLACK)
         
         screen.blit(afk_warning, (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 20))
         screen.blit(timer_text, (SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 + 10))
 
-    if time_since_last_move > afk_limit:
-        menu_open = True
-        game_over = True
-        menu_elements = create_menu(game_over=True)
-        return True
-    return False
-
 def draw_lane_markers():
     """Draw lane markers for debugging"""
-    if not DEBUG_MODE:
+    if not (DEBUG_MODE and quality.settings["debug"]):
         return
 
-    num_lanes = SCREEN_WIDTH // LANE_WIDTH
-    for i in range(num_lanes + 1):
+    for i in range(NUM_LANES + 1):
         x_pos = i * LANE_WIDTH
         # Draw dashed lines
         for y in range(0, SCREEN_HEIGHT, 20):
-            pygame.draw.line(screen, BLUE, (x_pos, y), (x_pos, y + 10), 2)
+            screen.draw_line(BLUE, (x_pos, y), (x_pos, y + 10), 2)
         
         # Draw lane numbers
-        if i < num_lanes:
+        if i < NUM_LANES:
             lane_center = i * LANE_WIDTH + LANE_WIDTH // 2
-            lane_text = font.render(str(i), True, BLUE)
+            lane_text = texts.render(font, str(i), BLUE)
             screen.blit(lane_text, (lane_center - 5, 50))
 
-def check_collision(player_rect, car_rect):
-    """Check if player collides with car"""
-    return (player_rect.x < car_rect.x + car_rect.width and
-            player_rect.x + player_rect.width > car_rect.x and
-            player_rect.y < car_rect.y + car_rect.height and
-            player_rect.y + player_rect.height > car_rect.y)
+def draw_lane_hint():
+    """Tint the lane ahead green if it stays clear long enough to cross it, red otherwise"""
+    if not (SHOW_HINTS or options.hints):
+        return
+
+    next_lane = lane_of(world.player_x, PLAYER_WIDTH) + 1
+    if next_lane >= NUM_LANES:
+        return
+
+    crossing_ticks = (LANE_WIDTH + PLAYER_WIDTH) / world.move_speed
+    with sim_lock:
+        window = lane_safety.screen_lane_window(sim, next_lane)
+    if window >= crossing_ticks:
+        hint_color = (0, 255, 0, 60)  # Semi-transparent green
+    else:
+        hint_color = (255, 0, 0, 60)  # Semi-transparent red
+    if quality.settings["overlays"]:
+        screen.fill_rect(hint_color, (next_lane * LANE_WIDTH, 0, LANE_WIDTH, SCREEN_HEIGHT))
+    else:
+        # An outline is much cheaper than blending a whole lane
+        screen.draw_rect(hint_color[:3], (next_lane * LANE_WIDTH, 0, LANE_WIDTH, SCREEN_HEIGHT), 3)
 
 def handle_win():
     """Handle the win state when player reaches the goal score"""
-    global win_state, menu_open, menu_elements, current_player_image
+    global menu_open, menu_elements
     
-    win_state = True
-    # Change player image to sitting image
-    current_player_image = player_win_image
+    record_run(RESULT_WIN)
     
-    # Clear and redraw the game screen
-    screen.fill(WHITE)
-    draw_background()
-    
-    # Draw all game elements
-    for car in cars:
-        screen.blit(car_image, (car["x"], car["y"]))
-    
-    # Draw player with victory pose image
-    screen.blit(current_player_image, (player_x, player_y))
-    
-    # Create semi-transparent overlay for win message
-    overlay = pygame.Surface((400, 200), pygame.SRCALPHA)
-    overlay.fill((200, 255, 200, 200))  # Semi-transparent green
-    screen.blit(overlay, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 100))
+    # Throw confetti over the whole screen
+    if particles is not None:
+        particles.confetti(-world.background_offset, SCREEN_WIDTH)
     
     # Display victory message
     win_text = font.render("Victory!", True, GREEN)
-    score_text = font.render(f"Final Score: {score}", True, BLACK)
-    message_text = font.render("You've mastered Hard Mode!", True, BLACK)
-    
-    screen.blit(win_text, (SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 - 70))
-    screen.blit(score_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 30))
-    screen.blit(message_text, (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 10))
-    
-    # Update the screen
-    pygame.display.flip()
-    
-    # Delay to show win message
-    pygame.time.delay(2000)
+    score_text = font.render(f"Final Score: {world.score}", True, BLACK)
+    message = "You've mastered Hard Mode!" if world.num_players == 1 else f"Player {world.winner + 1} wins!"
+    message_text = font.render(message, True, BLACK)
+    
+    # Show the win message while the confetti falls
+    for frame in range(END_SCREEN_FRAMES):
+        # Clear and redraw the game screen
+        screen.fill(WHITE)
+        draw_background()
+        
+        # Draw all game elements
+        for car in world.cars:
+            screen.blit(car_sprite(car_variants, car), (car["x"], car["y"]))
+        
+        # Draw the winner with victory pose image
+        draw_players()
+        
+        # Draw semi-transparent overlay for win message
+        screen.fill_rect((200, 255, 200, 200),  # Semi-transparent green
+                         (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 100, 400, 200))
+        
+        screen.blit(win_text, (SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 - 70))
+        screen.blit(score_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 30))
+        screen.blit(message_text, (SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 10))
+        draw_particles(update=True)
+        
+        # Update the screen
+        present_frame()
+        pygame.time.delay(1000 // FPS)
     
-    # Open menu with win options
+    # Open menu with win options, the run is over so the garbage can be collected now
+    gc_policy.set_playing(False)
     menu_open = True
     menu_elements = create_menu(game_over=False, win=True)
 
 def create_menu(game_over=False, win=False):
     """Create either regular menu, win menu, or game over menu"""
+    # Practice mode can rewind a run that ended, which takes one more button
+    can_rewind = game_over and rewind_buffer is not None and rewind_buffer.seconds() > 0
     panel = pygame_gui.elements.UIPanel(
-        relative_rect=pygame.Rect((SCREEN_WIDTH//2-150, SCREEN_HEIGHT//2-120), (300, 240)),
+        relative_rect=pygame.Rect((SCREEN_WIDTH//2-150, SCREEN_HEIGHT//2-120), (300, 280 if can_rewind else 240)),
         manager=manager
     )
     
@@ -334,7 +347,7 @@ def create_menu(game_over=False, win=False):
         
         score_label = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((30, 50), (240, 30)),
-            text=f"Final Score: {score}",
+            text=f"Final Score: {world.score}",
             manager=manager,
             container=panel
         )
@@ -379,7 +392,7 @@ def create_menu(game_over=False, win=False):
         
         score_label = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((30, 50), (240, 30)),
-            text=f"Final Score: {score}",
+            text=f"Final Score: {world.score}",
             manager=manager,
             container=panel
         )
@@ -412,6 +425,15 @@ def create_menu(game_over=False, win=False):
             container=panel
         )
         
+        if can_rewind:
+            rewind_button = pygame_gui.elements.UIButton(
+                relative_rect=pygame.Rect((50, 230), (200, 40)),
+                text=f"Rewind {PRACTICE_REWIND_SECONDS}s",
+                manager=manager,
+                container=panel
+            )
+            return panel, restart_button, change_mode_button, quit_button, rewind_button
+        
         return panel, restart_button, change_mode_button, quit_button
     else:
         # Regular menu
@@ -445,238 +467,319 @@ def create_menu(game_over=False, win=False):
         
         return panel, continue_button, restart_button, change_mode_button, quit_button
 
-def reset_game():
-    """Reset all game variables to starting state"""
-    global player_x, player_y, score, background_offset, cars
-    global game_over, last_move_time, collision_state, current_player_image, win_state
-    global car_speed_min, car_speed_max
-    
-    last_move_time = pygame.time.get_ticks() / 1000
-    collision_state = False
-    win_state = False
-    current_player_image = player_image  # Reset to normal player image
-    
-    # Reset player position
-    player_x = 10
-    player_y = SCREEN_HEIGHT // 2 - PLAYER_HEIGHT // 2
-    
-    # Reset score and background
-    score = 0
-    background_offset = 0
-    game_over = False
-    
-    # Reset car speeds to initial values
-    car_speed_min = 7  # Higher starting speeds for hard mode
-    car_speed_max = 12
-    
-    # Clear and recreate cars
-    cars.clear()
-    for _ in range(8):  # More cars in hard mode
-        cars.append(create_car())
-
-def handle_player_movement():
-    """Handle continuous player movement while space is held"""
-    global player_x, background_offset, score, last_move_time, car_speed_min, car_speed_max, win_state
-    
-    last_move_time = pygame.time.get_ticks() / 1000
-    
-    # Don't process movement if player has won
-    if win_state:
-        return
+def record_run(cause):
+    """Save the current run to the stats store (once per run)"""
+    global run_recorded
     
-    # Calculate current lane and target
-    current_lane = (player_x + PLAYER_WIDTH//2) // LANE_WIDTH
-    target_lane = current_lane + 1
-    target_x = (target_lane * LANE_WIDTH + LANE_WIDTH // 2) - PLAYER_WIDTH // 2
-    
-    # Check if player is in the center of the screen
-    if player_x >= SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2:
-        # Move background and obstacles instead of player
-        movement = min(move_speed, LANE_WIDTH)
-        background_offset -= movement
-        for car in cars:
-            car["x"] -= movement
-        
-        # Increase score when we've moved a full lane width
-        if abs(background_offset % LANE_WIDTH) < move_speed:
-            score += 1
-    else:
-        # Move player toward target position
-        if player_x < target_x:
-            movement = min(move_speed, target_x - player_x)
-            player_x += movement
-            
-            # Track lane change for scoring
-            previous_lane = current_lane
-            new_lane = (player_x + PLAYER_WIDTH//2) // LANE_WIDTH
-            
-            # Increase score when we cross into a new lane
-            if new_lane > previous_lane:
-                score += 1
-    
-    # Hard mode: Increase difficulty as score increases
-    if score > 0 and score % 10 == 0:
-        car_speed_min = min(car_speed_min + 0.5, 10)
-        car_speed_max = min(car_speed_max + 0.5, 15)
+    with sim_lock:
+        if run_recorded or sim.tick == 0:
+            return
+        run_recorded = True
+        stats.record_run(GAME_MODE, sim.seed, sim.score, sim.tick / FPS, cause, frame_times)
+        # The ghost of a resumed run would be missing its start
+        if options.seed is not None and not run_resumed:
+            ghost_recorder.save(GAME_MODE, sim.seed)
 
-    # Check for win condition
-    if score >= WIN_SCORE and not win_state:
-        handle_win()
+def reset_game():
+    """Reset all game variables to starting state"""
+    global run_recorded, run_resumed, ghosts, particles_tick
+    
+    # Restarting in the middle of a run counts as quitting it
+    record_run(CAUSE_QUIT)
+    
+    # Replay the same seed if one was given, otherwise start a new random run
+    with sim_lock:
+        sim.reset(options.seed)
+        ghost_recorder.start(sim)
+        if rewind_buffer is not None:
+            rewind_buffer.clear()
+            rewind_buffer.record()
+        if sim_thread is not None:
+            sim_thread.restart()
+    run_recorded = False
+    run_resumed = False
+    frame_times.clear()
+    if particles is not None:
+        particles.clear()
+    particles_tick = 0
+    if audio is not None:
+        audio.reset()
+    
+    # Race the best runs so far
+    if options.seed is not None:
+        ghosts = load_ghosts(GAME_MODE, sim.seed)
+
+def rewind_run(seconds):
+    """Go back a few seconds in the run (practice mode and debugging), returning False if there is nothing to go back to"""
+    global particles_tick
+    
+    # The run was already saved when it ended, what happens after a rewind is practice
+    with sim_lock:
+        if not rewind_buffer.rewind(int(seconds * FPS)):
+            return False
+        ghost_recorder.rewind(sim)
+        if sim_thread is not None:
+            sim_thread.restart()
+        particles_tick = sim.tick
+    if particles is not None:
+        particles.clear()
+    if audio is not None:
+        audio.reset()
+    return True
+
+def keep_run():
+    """Save a run in progress for the next launch, returning whether it was saved"""
+    # Bot runs never replace the player's save
+    if bot is not None:
+        return False
+    with sim_lock:
+        if sim.tick > 0 and not sim.game_over and not sim.win_state:
+            save_run(sim, GAME_MODE)
+            return True
+    delete_save(GAME_MODE)
+    return False
 
 def handle_collision(car):
     """Handle collision between player and car"""
-    global collision_state, current_player_image, menu_open, game_over, menu_elements
+    global menu_open, menu_elements
     
-    collision_state = True
-    current_player_image = player_collision_image
+    record_run(RESULT_COLLISION)
     
-    # Clear and redraw the game screen
-    screen.fill(WHITE)
-    
-    # Draw background
-    for i in range(2):
-        screen.blit(background_image, ((background_offset % SCREEN_WIDTH) - SCREEN_WIDTH * i, 0))
-    
-    # Draw all cars except the one that caused the collision
-    for other_car in cars:
-        if other_car != car:
-            screen.blit(car_image, (other_car["x"], other_car["y"]))
-    
-    # Display the "How dare you!" quote
     quote_text = font.render("How dare you!", True, RED)
-    screen.blit(quote_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 20))
     
-    # Draw collision image
-    screen.blit(current_player_image, (player_x, player_y))
-    
-    # Update the screen
-    pygame.display.flip()
+    # Fade into the collision image, one baked frame per tick, while the debris flies
+    for frame in range(END_SCREEN_FRAMES):
+        # Clear and redraw the game screen
+        screen.fill(WHITE)
+        
+        # Draw background
+        draw_background()
+        
+        # Draw all cars except the one that caused the collision
+        for other_car in world.cars:
+            if other_car["id"] != car["id"]:
+                screen.blit(car_sprite(car_variants, other_car), (other_car["x"], other_car["y"]))
+        draw_particles(update=True)
+        
+        # Display the "How dare you!" quote
+        screen.blit(quote_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 20))
+        
+        # Draw collision image
+        draw_players(extra_ticks=frame)
+        
+        # Update the screen
+        present_frame()
+        pygame.time.delay(1000 // FPS)
     
-    # Delay to show collision effect
-    pygame.time.delay(2000)
+    # Transition to game over state, the run is over so the garbage can be collected now
+    gc_policy.set_playing(False)
+    menu_open = True
+    menu_elements = create_menu(game_over=True)
+
+def handle_afk():
+    """End the game when the player has been AFK for too long"""
+    global menu_open, menu_elements
     
-    # Transition to game over state
+    record_run(RESULT_AFK)
     menu_open = True
-    game_over = True
     menu_elements = create_menu(game_over=True)
 
 def draw_background():
     """Draw the game background"""
     for i in range(2):
-        screen.blit(background_image, ((background_offset % SCREEN_WIDTH) - SCREEN_WIDTH * i, 0))
-
-def draw_game_elements():
-    """Draw all game elements (player, cars, score, instructions)"""
-    # Draw background
+        screen.blit(background_image, ((world.background_offset % SCREEN_WIDTH) - SCREEN_WIDTH * i, 0))
+
+def draw_ghosts():
+    """Draw the ghosts of the best runs on this seed where they were at this tick"""
+    for ghost in ghosts:
+        world_x = ghost.position(world.tick)
+        if world_x is not None:
+            screen.blit(ghost_image, (world_x + world.background_offset, world.player_y))
+
+def draw_players(extra_ticks=0):
+    """Draw every player walking, in the victory pose or fading into the collision image once their run is over"""
+    for index, player in enumerate(world.players):
+        if world.win_state and index == world.winner:
+            image = player_win_image
+        elif player["out"] is not None:
+            image = fade_frame(collision_fades[index], world.tick - player["out_tick"] + extra_ticks)
+        else:
+            image = walk_frame(walk_frames[index], player["x"] - world.background_offset)
+        screen.blit(image, (player["x"], player["y"]))
+        if DEBUG_MODE and quality.settings["debug"]:
+            screen.draw_rect(BLACK, (player["x"], player["y"], PLAYER_WIDTH, PLAYER_HEIGHT), 2)  # Player hitbox
+
+def bot_moves(moves):
+    """Let the bot play the first player (on the simulation thread with --sim-thread)"""
+    if bot is not None and not sim.game_over:
+        moves[0] = moves[0] or bot(observe(sim, lane_safety)) == MOVE
+    return moves
+
+def after_tick(result):
+    """Log, sound and record what happened in a tick (on the simulation thread with --sim-thread)"""
+    if telemetry is not None:
+        telemetry.after_step(sim, result)
+    if audio is not None:
+        audio.after_step(sim, result)
+    ghost_recorder.record(sim)
+    if rewind_buffer is not None:
+        rewind_buffer.record()
+
+def apply_quality():
+    """Apply the settings of the active quality tier"""
+    settings = quality.settings
+    screen.set_pixel_scale(max(options.pixel_scale or PIXEL_SCALE, settings["pixel_scale"]))
+    if particles is not None:
+        particles.set_limit(settings["particles"])
+
+def update_particles():
+    """Throw debris where players were hit, puff exhaust from the cars and move every particle, once per new tick"""
+    global particles_tick
+    if world.tick == particles_tick:
+        return
+    for player in world.players:
+        out_tick = player["out_tick"]
+        if out_tick is not None and particles_tick < out_tick <= world.tick and player["hit_by"] is not None:
+            particles.debris(player["x"] - world.background_offset + PLAYER_WIDTH // 2, player["y"] + PLAYER_HEIGHT // 2)
+    if quality.settings["exhaust"] and world.tick % EXHAUST_INTERVAL == 0:
+        particles.exhaust(world.cars, world.background_offset, CAR_WIDTH, CAR_HEIGHT)
+    particles.update(1 / FPS)
+    particles_tick = world.tick
+
+def draw_particles(update=False):
+    """Draw the particles, moving them on first when the simulation is not doing it"""
+    if particles is not None:
+        if update:
+            particles.update(1 / FPS)
+        particles.draw(screen, world.background_offset)
+
+def draw_world():
+    """Draw the background, player and cars"""
     draw_background()
     
     # Draw lane markers if debugging
     draw_lane_markers()
     
-    # Draw player
-    screen.blit(current_player_image, (player_x, player_y))
-    player_rect = pygame.Rect(player_x, player_y, PLAYER_WIDTH, PLAYER_HEIGHT)
+    # Draw ghosts under the players
+    draw_ghosts()
+    draw_players()
     
-    if DEBUG_MODE:
-        pygame.draw.rect(screen, BLACK, player_rect, 2)  # Player hitbox
+    # Draw cars
+    for car in world.cars:
+        screen.blit(car_sprite(car_variants, car), (car["x"], car["y"]))
+        if DEBUG_MODE and quality.settings["debug"]:
+            screen.draw_rect(RED, (car["x"], car["y"], CAR_WIDTH, CAR_HEIGHT), 2)  # Car hitbox
     
-    # Process and draw cars
-    for car in cars[:]:  # Use a copy to safely modify the list
-        # Only move cars if player hasn't won
-        if not win_state:
-            # Hard mode feature: Random chance for cars to accelerate
-            if random.random() < 0.01:  # 1% chance each frame
-                car["speed"] *= 1.5  # Accelerate by 50%
-            
-            car["y"] += car["speed"]
-            
-            # Remove cars that go off screen and add new ones
-            if car["y"] < -CAR_HEIGHT or car["y"] > SCREEN_HEIGHT:
-                cars.remove(car)
-                cars.append(create_car())
-                continue
-        
-        # Draw car
-        screen.blit(car_image, (car["x"], car["y"]))
-        car_rect = pygame.Rect(car["x"], car["y"], CAR_WIDTH, CAR_HEIGHT)
-        
-        if DEBUG_MODE:
-            pygame.draw.rect(screen, RED, car_rect, 2)  # Car hitbox
-        
-        # Check for collision
-        if not win_state and check_collision(player_rect, car_rect):
-            handle_collision(car)
-            return False  # Signal to break out of the rendering loop
-    
-    # Hard mode features - only enable when not in win state
-    if not win_state:
-        # Occasionally spawn car clusters
-        if random.random() < 0.005 and score > 10:  # 0.5% chance each frame after score > 10
-            car_cluster = create_car_cluster()
-            cars.extend(car_cluster)
-        
-        # Periodically change car speeds
-        if random.random() < 0.02:  # 2% chance each frame
-            for car in cars:
-                # 50% chance to speed up, 50% chance to slow down
-                speed_factor = 1.2 if random.random() < 0.5 else 0.8
-                car["speed"] *= speed_factor
-    
-    # Display score and instructions
-    score_text = font.render(f"Score: {score}/{WIN_SCORE}", True, BLACK)
-    instruction_text = instruction_font.render("Press ESC for menu", True, BLACK)
-    hold_text = instruction_font.render("Hold SPACE to move", True, BLACK)
+    # Draw particles over the cars
+    draw_particles()
+
+def draw_game_elements():
+    """Draw all game elements (player, cars, score, instructions)"""
+    draw_world()
+    draw_lane_hint()
+    
+    # Display win progress
+    score_text = texts.render(font, f"Score: {world.score}/{world.win_score}", BLACK)
+    instruction_text = texts.render(instruction_font, "Press ESC for menu", BLACK)
+    hold_text = texts.render(instruction_font, "Hold SPACE to move", BLACK)
     
     screen.blit(score_text, (10, 10))
     screen.blit(instruction_text, (SCREEN_WIDTH - 160, 10))
     screen.blit(hold_text, (SCREEN_WIDTH - 160, 30))
     
-    return True  # Signal to continue rendering
+    # Score of every player in local multiplayer
+    if world.num_players > 1:
+        for index, player in enumerate(world.players):
+            status = " (out)" if player["out"] is not None else ""
+            player_text = texts.render(instruction_font, f"P{index + 1}: {player['score']}{status}", BLACK)
+            screen.blit(player_text, (10 + index * 100, SCREEN_HEIGHT - 30))
+    
+    # Near miss bonus, and the combo for a second after each near miss
+    bonus_text = texts.render(instruction_font, f"Near miss bonus: {world.bonus}", BLACK)
+    screen.blit(bonus_text, (10, 40))
+    if world.last_near_miss_tick is not None and world.tick - world.last_near_miss_tick < FPS:
+        combo_text = texts.render(font, f"Near miss! x{world.combo}", BLUE)
+        screen.blit(combo_text, (SCREEN_WIDTH // 2 - combo_text.get_width() // 2, 50))
+
+def present_frame():
+    """Show the finished frame, and hand it to the recording when capturing"""
+    screen.present()
+    if capture is not None:
+        capture.grab(screen.frame_surface())
+        profiler.add_section("capture", capture.last_seconds)
 
 def return_to_launcher():
     """Exit the current game and return to the launcher"""
     python_executable = sys.executable
     launcher_file = os.path.join(base_path, "Launcher.py")
     
+    # Keep the run for next time, or save it before the launcher reads the leaderboard
+    if sim_thread is not None:
+        sim_thread.stop()
+    if not keep_run():
+        record_run(CAUSE_QUIT)
+    stats.close()
+    if telemetry is not None:
+        telemetry.close()
+    if audio is not None:
+        audio.close()
+    if capture is not None:
+        capture.close()
+    
     try:
         pygame.quit()
-        subprocess.run([python_executable, launcher_file])
+        subprocess.run([python_executable, launcher_file] + sys.argv[1:])
         sys.exit()
     except Exception as e:
         print(f"Error returning to launcher: {e}")
 
-# --- GAME INITIALIZATION ---
+# --- MAIN GAME LOOP ---
+
+# Everything is loaded, keep the garbage collector out of the frames from here on (see GC_Policy.py)
+gc_policy = GCPolicy()
+gc_policy.freeze()
 
-# Initialize game by creating cars
-for _ in range(8):  # More cars in hard mode
-    cars.append(create_car())
+# Start the simulation thread if asked to
+if options.sim_thread:
+    sim_thread = SimThread(sim, FPS, sim_lock, before_step=bot_moves, after_step=after_tick)
+    sim_thread.start()
 
-# --- MAIN GAME LOOP ---
+# Follow what every frame allocates if asked to (see Alloc_Audit.py)
+alloc_audit = None
+if options.alloc_audit:
+    alloc_audit = AllocationAudit(options.alloc_audit)
+    alloc_audit.start()
+
+# Record the game if asked to (see Video_Capture.py)
+capture = None
+if options.capture is not None:
+    try:
+        capture = VideoCapture(options.capture or default_path(GAME_MODE), screen.frame_surface(),
+                               FPS, scale=options.capture_scale)
+    except Exception as e:
+        print(f"Error starting capture: {e}")
 
 running = True
 while running:
-    time_delta = clock.tick(FPS)/1000.0
+    events, time_delta = pacer.next_frame(active=not menu_open)
     
     # Process events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
+    for event in events:
+        # Map window coordinates onto the logical canvas
+        event = screen.handle_event(event)
+
+        # WINDOWCLOSE is needed for the GPU renderer, whose hidden display keeps QUIT from firing
+        if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
             running = False
             
-        # Handle escape key to open/close menu
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                menu_open = not menu_open
-                if menu_open:
-                    menu_elements = create_menu(game_over=False)
-                else:
-                    manager.clear_and_reset()
-                    menu_elements = None
+        # Turn key and gamepad events into buffered actions
+        input_handler.process_event(event)
         
         # Process UI events
         if menu_open:
             if event.type == pygame.USEREVENT:
                 if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
-                    if game_over or win_state:  # Handle both game over and win menus the same way
+                    if world.game_over or world.win_state:  # Handle both game over and win menus the same way
                         if event.ui_element == menu_elements[1]:  # Restart button
                             reset_game()
                             menu_open = False
@@ -686,6 +789,11 @@ while running:
                             return_to_launcher()
                         elif event.ui_element == menu_elements[3]:  # Quit button
                             running = False
+                        elif len(menu_elements) > 4 and event.ui_element == menu_elements[4]:  # Rewind button
+                            rewind_run(PRACTICE_REWIND_SECONDS)
+                            menu_open = False
+                            manager.clear_and_reset()
+                            menu_elements = None
                     else:
                         # Regular menu handling
                         if event.ui_element == menu_elements[1]:  # Continue button
@@ -705,58 +813,122 @@ while running:
             # Process all UI events
             manager.process_events(event)
     
+    # Apply the actions buffered since the last tick
+    moves_pressed = [False] * sim.num_players
+    for action_time, action, pressed in input_handler.drain():
+        if not pressed:
+            continue
+        if action == ACTION_MENU:
+            # Open/close menu
+            menu_open = not menu_open
+            if menu_open:
+                menu_elements = create_menu(game_over=False)
+            else:
+                manager.clear_and_reset()
+                menu_elements = None
+        elif action == ACTION_PROFILER:
+            profiler.toggle()
+        elif action == ACTION_REWIND and rewind_buffer is not None and not menu_open:
+            # Scrub back through the run
+            rewind_run(SCRUB_SECONDS)
+        elif action in player_actions and not menu_open:
+            # A tap shorter than a frame still moves the player
+            moves_pressed[player_actions.index(action)] = True
+    
+    # The simulation thread stops while a menu is open
+    if sim_thread is not None:
+        sim_thread.paused = menu_open
+    
+    # Collect garbage when a menu opens, and only between frames while playing
+    gc_policy.set_playing(not menu_open)
+    
+    # A menu that nobody touched still shows the last frame
+    if menu_open and not pacer.redraw:
+        continue
+    
     # Clear the screen
     screen.fill(WHITE)
     
     # Handle game state
     if not menu_open:
-        # Handle player movement with space key
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_SPACE]:
-            handle_player_movement()
-        
-        # Check for win condition
-        if score >= WIN_SCORE and not win_state:
+        # Each player moves while their move action is held (the bot plays the first player)
+        held = [input_handler.is_held(action) for action in player_actions]
+        
+        # Time spent on the previous frame, for the stats of this run and the quality governor
+        frame_ms = pacer.clock.get_rawtime()
+        frame_times.add(frame_ms)
+        profiler.add_frame(frame_ms)
+        if quality.add_frame(frame_ms):
+            apply_quality()
+        
+        if sim_thread is None:
+            # Advance the simulation by one tick
+            moves = bot_moves([pressed or hold for pressed, hold in zip(moves_pressed, held)])
+            sim_start = time.perf_counter()
+            result = sim.step(moves)
+            profiler.add_section("sim", time.perf_counter() - sim_start)
+            after_tick(result)
+        else:
+            # The simulation ticks by itself, pass it the moves and draw its latest state
+            sim_thread.set_moves(held, moves_pressed)
+            result = None if sim_thread.results.empty() else sim_thread.results.get()
+            world = sim_thread.view()
+        if particles is not None:
+            update_particles()
+        if result == RESULT_WIN:
             handle_win()
             continue
+        elif result == RESULT_COLLISION:
+            handle_collision(world.collided_car)
+            continue  # Skip the rest of this loop iteration if collision occurred
+        elif result == RESULT_AFK:
+            handle_afk()
         
         # Draw all game elements
-        if not draw_game_elements():
-            continue  # Skip the rest of this loop iteration if collision occurred
+        draw_start = time.perf_counter()
+        draw_game_elements()
         
-        # Check AFK status
-        if not game_over and not win_state:
-            detect_afk(last_move_time, afk_limit)
+        # Warn about AFK status
+        if not world.game_over and not world.win_state:
+            draw_afk_warning()
+        profiler.add_section("draw", time.perf_counter() - draw_start)
     else:
         # If menu is open, render the game in background
-        draw_background()
-        draw_lane_markers()
-        
-        # Draw player and cars
-        screen.blit(current_player_image, (player_x, player_y))
-        if DEBUG_MODE:
-            pygame.draw.rect(screen, BLACK, pygame.Rect(player_x, player_y, PLAYER_WIDTH, PLAYER_HEIGHT), 2)
-        
-        for car in cars:
-            screen.blit(car_image, (car["x"], car["y"]))
-            if DEBUG_MODE:
-                pygame.draw.rect(screen, RED, pygame.Rect(car["x"], car["y"], CAR_WIDTH, CAR_HEIGHT), 2)
+        if sim_thread is not None:
+            world = sim_thread.view()
+        draw_world()
         
         # Display score
-        score_text = font.render(f"Score: {score}", True, BLACK)
+        score_text = texts.render(font, f"Score: {world.score}", BLACK)
         screen.blit(score_text, (10, 10))
         
         # Dim the game screen under the menu
-        dim_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        dim_surface.fill((0, 0, 0, 128))  # Semi-transparent black
-        screen.blit(dim_surface, (0, 0))
+        screen.fill_rect((0, 0, 0, 128), (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))  # Semi-transparent black
         
         # Update and draw UI
         manager.update(time_delta)
-        manager.draw_ui(screen)
+        screen.draw_ui(manager)
+    
+    # Profiling overlay on top of everything
+    profiler.draw(screen, pacer.clock.get_fps(), quality, particles, gc_policy)
     
     # Update display
-    pygame.display.flip()
+    present_frame()
+    
+    if alloc_audit is not None:
+        alloc_audit.frame()
+    gc_policy.frame_end()
 
 # Clean up and exit
-pygame.quit()
\ No newline at end of file
+if sim_thread is not None:
+    sim_thread.stop()
+if not keep_run():
+    record_run(CAUSE_QUIT)
+stats.close()
+if telemetry is not None:
+    telemetry.close()
+if audio is not None:
+    audio.close()
+if capture is not None:
+    capture.close()
+pygame.quit()
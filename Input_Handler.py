@@ -0,0 +1,196 @@
+"""
+Crossy Road - Greta Thunberg Edition (Input Handler)
+Event driven input for both game modes.
+Keyboard and gamepad events are turned into timestamped actions and stored in a
+fixed size ring buffer, which the game loop drains once per simulation tick.
+Anything else that wants to drive the game (replays, bots) can push actions
+into the same buffer instead of faking key presses.
+
+In local multiplayer every player has their own move action and key, and each
+connected gamepad moves the next player in the order they were plugged in.
+"""
+
+import pygame
+
+# --- CONSTANTS ---
+
+# Actions the game understands
+ACTION_MOVE = "move"
+ACTION_MENU = "menu"
+ACTION_PROFILER = "profiler"
+ACTION_REWIND = "rewind"
+
+# Default bindings, any of these can be changed with InputHandler.bind
+DEFAULT_KEY_BINDINGS = {
+    pygame.K_SPACE: ACTION_MOVE,
+    pygame.K_ESCAPE: ACTION_MENU,
+    pygame.K_F3: ACTION_PROFILER,
+    pygame.K_BACKSPACE: ACTION_REWIND,
+}
+DEFAULT_BUTTON_BINDINGS = {
+    0: ACTION_MOVE,  # A / Cross
+    7: ACTION_MENU,  # Start (Xbox layout)
+}
+
+# Holding the d-pad right or up also moves forward
+HAT_ACTION = ACTION_MOVE
+
+# Move keys of players 1 to 4 in local multiplayer
+PLAYER_MOVE_KEYS = [pygame.K_SPACE, pygame.K_RIGHT, pygame.K_l, pygame.K_KP6]
+
+# Number of actions kept between two ticks before the oldest are overwritten
+BUFFER_SIZE = 256
+
+# --- HELPER FUNCTIONS ---
+
+def player_move_action(index):
+    """Move action of a player (0 based), the first player uses ACTION_MOVE"""
+    return ACTION_MOVE if index == 0 else f"{ACTION_MOVE}{index + 1}"
+
+# --- INPUT HANDLER ---
+
+class InputHandler:
+    """Turn keyboard and gamepad events into buffered, timestamped actions"""
+
+    def __init__(self, key_bindings=None, button_bindings=None, buffer_size=BUFFER_SIZE, players=1):
+        self.key_bindings = dict(DEFAULT_KEY_BINDINGS if key_bindings is None else key_bindings)
+        self.button_bindings = dict(DEFAULT_BUTTON_BINDINGS if button_bindings is None else button_bindings)
+
+        # Every extra player gets a move key of their own
+        self.players = players
+        for index in range(1, players):
+            self.bind(player_move_action(index), key=PLAYER_MOVE_KEYS[index])
+
+        # Ring buffer of (timestamp in ms, action, pressed), preallocated so pushing never allocates a list
+        self.buffer_size = buffer_size
+        self._buffer = [None] * buffer_size
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+
+        # Which sources (keys, buttons, hats) are currently holding each action down
+        self._held = {}
+        # Action each held gamepad button or hat pressed, so its release goes to the same player
+        self._gamepad_actions = {}
+
+        # Connected gamepads, kept so pygame keeps sending their events
+        self.joysticks = {}
+        # Instance ids of the gamepads in the order they were connected
+        self.gamepad_order = []
+
+    def bind(self, action, key=None, button=None):
+        """Bind a key and/or gamepad button to an action"""
+        if key is not None:
+            self.key_bindings[key] = action
+        if button is not None:
+            self.button_bindings[button] = action
+
+    def push(self, action, pressed=True, timestamp=None):
+        """Add an action to the buffer (used by events, replays and bots)"""
+        if timestamp is None:
+            timestamp = pygame.time.get_ticks()
+
+        if self._count == self.buffer_size:
+            # Buffer full, overwrite the oldest action
+            self._head = (self._head + 1) % self.buffer_size
+            self._count -= 1
+            self.dropped += 1
+        self._buffer[(self._head + self._count) % self.buffer_size] = (timestamp, action, pressed)
+        self._count += 1
+
+    def gamepad_action(self, action, instance_id):
+        """Turn a gamepad's move into the move of the player holding that gamepad"""
+        if action != ACTION_MOVE or self.players == 1 or instance_id not in self.gamepad_order:
+            return action
+        return player_move_action(self.gamepad_order.index(instance_id) % self.players)
+
+    def _set_gamepad_held(self, action, source, pressed):
+        """Like _set_held, but a release always ends the action its press started"""
+        # The player a gamepad moves can change while a button is held (gamepads plugged in or out)
+        if pressed:
+            action = self._gamepad_actions.setdefault(source, self.gamepad_action(action, source[1]))
+        else:
+            action = self._gamepad_actions.pop(source, None)
+            if action is None:
+                return
+        self._set_held(action, source, pressed)
+
+    def _set_held(self, action, source, pressed):
+        """Track a source pressing or releasing an action and buffer the change"""
+        sources = self._held.setdefault(action, set())
+        if pressed:
+            if source in sources:
+                return  # Key repeat, not a new press
+            sources.add(source)
+        else:
+            if source not in sources:
+                return
+            sources.discard(source)
+        self.push(action, pressed)
+
+    def process_event(self, event):
+        """Handle a pygame event, returning True if it was turned into an action"""
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            action = self.key_bindings.get(event.key)
+            if action is None:
+                return False
+            self._set_held(action, ("key", event.key), event.type == pygame.KEYDOWN)
+            return True
+
+        if event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            action = self.button_bindings.get(event.button)
+            if action is None:
+                return False
+            self._set_gamepad_held(action, ("button", event.instance_id, event.button),
+                                   event.type == pygame.JOYBUTTONDOWN)
+            return True
+
+        if event.type == pygame.JOYHATMOTION:
+            x, y = event.value
+            self._set_gamepad_held(HAT_ACTION, ("hat", event.instance_id, event.hat), x > 0 or y > 0)
+            return True
+
+        if event.type == pygame.WINDOWFOCUSLOST:
+            # Key releases are not delivered to unfocused windows
+            self.release_all()
+            return False
+
+        if event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+            self.gamepad_order.append(joystick.get_instance_id())
+            return True
+
+        if event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+            if event.instance_id in self.gamepad_order:
+                self.gamepad_order.remove(event.instance_id)
+            # Release anything the removed gamepad was holding
+            for action, sources in self._held.items():
+                for source in [s for s in sources if s[0] != "key" and s[1] == event.instance_id]:
+                    self._gamepad_actions.pop(source, None)
+                    self._set_held(action, source, False)
+            return True
+
+        return False
+
+    def drain(self):
+        """Return the actions buffered since the last tick, oldest first"""
+        actions = []
+        while self._count:
+            actions.append(self._buffer[self._head])
+            self._buffer[self._head] = None
+            self._head = (self._head + 1) % self.buffer_size
+            self._count -= 1
+        return actions
+
+    def is_held(self, action):
+        """Check if any key or button is holding an action down"""
+        return bool(self._held.get(action))
+
+    def release_all(self):
+        """Forget all held keys and buttons, e.g. when the window loses focus"""
+        for action, sources in self._held.items():
+            for source in list(sources):
+                self._set_held(action, source, False)
+        self._gamepad_actions.clear()
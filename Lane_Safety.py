@@ -0,0 +1,291 @@
+"""
+Crossy Road - Greta Thunberg Edition (Lane Safety)
+Predicts when each lane will be blocked, so "is it safe to step into lane k
+for the next T ms" can be answered without looking at every car.
+
+Cars move in a straight line (y + speed * t), so each car blocks the player's
+row for one interval of ticks, which is worked out once when the car spawns,
+despawns or changes speed. The intervals are kept per lane in world coordinates
+(screen x minus background_offset), which do not change when the world scrolls.
+Used by the bots, the hint overlay and the spawn validation in hard mode.
+"""
+
+import bisect
+
+from Game_Simulation import (FPS, LANE_WIDTH, PLAYER_WIDTH, PLAYER_HEIGHT,
+                             CAR_WIDTH, CAR_HEIGHT, PLAYER_START_Y, SAFE_DISTANCE)
+
+# --- CONSTANTS ---
+
+# A lane with nothing coming stays safe forever
+FOREVER = float("inf")
+
+# How far ahead a new car cluster is checked for a way through
+SPAWN_CHECK_SECONDS = 4
+
+# --- HELPER FUNCTIONS ---
+
+def blocked_interval(y, speed, tick, player_y=PLAYER_START_Y):
+    """Ticks (start, end) during which a car at y at the given tick overlaps the player's row"""
+    # The car overlaps the row while its y is strictly between these two
+    low = player_y - CAR_HEIGHT
+    high = player_y + PLAYER_HEIGHT
+
+    if speed == 0:
+        return (-FOREVER, FOREVER) if low < y < high else None
+
+    start = tick + (low - y) / speed
+    end = tick + (high - y) / speed
+    if start > end:
+        start, end = end, start
+    return start, end
+
+def world_lanes(world_x, width):
+    """World lanes covered by something drawn width pixels wide at world_x"""
+    first = int(world_x // LANE_WIDTH)
+    last = int((world_x + width - 1) // LANE_WIDTH)
+    return range(first, last + 1)
+
+def is_clear(intervals, start, end):
+    """Check that none of the (start, end, ...) intervals overlaps the ticks start to end"""
+    for interval in intervals:
+        if interval[0] < end and interval[1] > start:
+            return False
+    return True
+
+# --- LANE SAFETY INDEX ---
+
+class LaneSafetyIndex:
+    """Per lane list of the tick intervals in which cars block the player's row"""
+
+    def __init__(self, sim=None):
+        # World lane -> sorted list of (start, end, car id, car world x)
+        self.lanes = {}
+        # Car id -> (lanes, interval) so a car can be taken out again
+        self.cars = {}
+        if sim is not None:
+            sim.add_listener(self)
+
+    # --- Simulation listener ---
+
+    def cars_reset(self, sim):
+        """Rebuild the index from all cars on the road"""
+        self.lanes.clear()
+        self.cars.clear()
+        for car in sim.cars:
+            self._add(sim, car, sim.tick)
+
+    def state_restored(self, sim):
+        """Rebuild the index from the cars of the restored state"""
+        self.cars_reset(sim)
+
+    def car_spawned(self, sim, car):
+        """Index a new car"""
+        self._add(sim, car, sim.tick)
+
+    def car_despawned(self, sim, car):
+        """Drop a car that left the road"""
+        self._remove(car["id"])
+
+    def car_speed_changed(self, sim, car, tick):
+        """Recompute the interval of a car that sped up or slowed down"""
+        self._remove(car["id"])
+        self._add(sim, car, tick)
+
+    def _add(self, sim, car, tick):
+        """Work out the blocked interval of a car and add it to its lanes"""
+        interval = blocked_interval(car["y"], car["speed"], tick, sim.player_y)
+        if interval is None:
+            return
+        world_x = car["x"] - sim.background_offset
+        lanes = world_lanes(world_x, CAR_WIDTH)
+        entry = (interval[0], interval[1], car["id"], world_x)
+        for lane in lanes:
+            bisect.insort(self.lanes.setdefault(lane, []), entry)
+        self.cars[car["id"]] = (lanes, entry)
+
+    def _remove(self, car_id):
+        """Take a car out of the index"""
+        indexed = self.cars.pop(car_id, None)
+        if indexed is None:
+            return
+        lanes, entry = indexed
+        for lane in lanes:
+            intervals = self.lanes[lane]
+            intervals.remove(entry)
+            if not intervals:
+                del self.lanes[lane]
+
+    # --- Queries ---
+
+    def safe_window(self, lane, tick):
+        """Ticks from now until a world lane is blocked (0 if it is blocked now)"""
+        intervals = self.lanes.get(lane)
+        if not intervals:
+            return FOREVER
+
+        # Intervals are sorted by start and cars in a lane rarely overlap,
+        # so this only ever looks at the first one or two entries
+        window = FOREVER
+        for start, end, *_ in intervals:
+            if start - tick >= window:
+                break
+            if end <= tick:
+                continue  # Already passed the row
+            if start <= tick:
+                return 0
+            window = start - tick
+        return window
+
+    def is_safe(self, lane, tick, ticks):
+        """Check that a world lane stays clear for the given number of ticks"""
+        return self.safe_window(lane, tick) >= ticks
+
+    def is_safe_ms(self, lane, tick, milliseconds):
+        """Check that a world lane stays clear for the given number of milliseconds"""
+        return self.is_safe(lane, tick, milliseconds * FPS / 1000)
+
+    def screen_lane_window(self, sim, screen_lane):
+        """Ticks until a lane on screen is blocked, looking at both world lanes it covers"""
+        world_x = screen_lane * LANE_WIDTH - sim.background_offset
+        return min(self.safe_window(lane, sim.tick) for lane in world_lanes(world_x, LANE_WIDTH))
+
+    def player_window(self, sim):
+        """Ticks until a car reaches the player if the player stays where it is (0 if one is there now)"""
+        return self.time_to_hit(sim, 0, FOREVER)
+
+    def moving_window(self, sim, ticks):
+        """Ticks until a car reaches the player if it keeps moving for the given number of ticks"""
+        return self.time_to_hit(sim, sim.move_speed, ticks)
+
+    def time_to_hit(self, sim, speed, ticks):
+        """Ticks until a car overlaps the player moving speed pixels a tick (FOREVER if none does in time)
+
+        Only the lanes the player sweeps are looked at, and each car in them is
+        checked against the ticks the player actually spends in its column.
+        """
+        tick = sim.tick
+        world_x = sim.player_x - sim.background_offset
+        sweep = PLAYER_WIDTH + speed * ticks if speed else PLAYER_WIDTH
+
+        first_hit = FOREVER
+        for lane in world_lanes(world_x, sweep):
+            for start, end, _, car_x in self.lanes.get(lane, ()):
+                start -= tick
+                if start >= first_hit:
+                    break  # Sorted by start, nothing later in the lane can come first
+                # Ticks in which the car's column overlaps the player's
+                if speed:
+                    column_start = (car_x - world_x - PLAYER_WIDTH) / speed
+                    column_end = (car_x + CAR_WIDTH - world_x) / speed
+                elif car_x < world_x + PLAYER_WIDTH and car_x + CAR_WIDTH > world_x:
+                    column_start, column_end = -FOREVER, FOREVER
+                else:
+                    continue
+                hit = max(start, column_start, 0)
+                if hit < min(end - tick, column_end, ticks):
+                    first_hit = hit
+        return first_hit
+
+# --- SPAWN VALIDATION ---
+
+class SpawnValidator:
+    """Reshape or reject hard mode car clusters that would leave the player no way through"""
+
+    def __init__(self, sim, lane_safety=None, horizon=SPAWN_CHECK_SECONDS * FPS):
+        self.lane_safety = lane_safety if lane_safety is not None else LaneSafetyIndex(sim)
+        # Ticks within which the player has to be able to get past the cluster
+        self.horizon = horizon
+        # How often clusters were spawned as they were, with fewer cars or not at all
+        self.accepted = 0
+        self.reshaped = 0
+        self.rejected = 0
+        sim.spawn_validator = self
+
+    def __call__(self, sim, cluster):
+        """Return the cars of a cluster that can be spawned"""
+        # Never spawn a car on top of one already coming down its lane
+        cars = [car for car in cluster if not self._crowded(sim, car)]
+
+        if self.is_passable(sim, cars):
+            if len(cars) == len(cluster):
+                self.accepted += 1
+            else:
+                self.reshaped += 1
+            return cars
+
+        # Open a gap by dropping one car, trying the middle of the cluster first
+        middle = (len(cars) - 1) / 2
+        for index in sorted(range(len(cars)), key=lambda i: abs(i - middle)):
+            reshaped = cars[:index] + cars[index + 1:]
+            if self.is_passable(sim, reshaped):
+                self.reshaped += 1
+                return reshaped
+
+        self.rejected += 1
+        return []
+
+    def _crowded(self, sim, new_car):
+        """Check if a new car would spawn within SAFE_DISTANCE of a car in the same lane"""
+        for car in sim.cars:
+            if (abs(car["x"] - new_car["x"]) < CAR_WIDTH and
+                    abs(car["y"] - new_car["y"]) < SAFE_DISTANCE):
+                return True
+        return False
+
+    def is_passable(self, sim, new_cars):
+        """Check that the player can still cross every lane up to the new cars within the horizon
+
+        Only the current car speeds are known, so a car that accelerates later
+        can still close a gap; that is part of what makes hard mode hard.
+        """
+        if not new_cars:
+            return True
+
+        tick = sim.tick
+        offset = sim.background_offset
+        player_x = sim.player_x - offset
+        first = int((player_x + PLAYER_WIDTH // 2) // LANE_WIDTH)
+
+        # Blocked intervals the new cars would add, per world lane
+        added = {}
+        last = first
+        for car in new_cars:
+            interval = blocked_interval(car["y"], car["speed"], tick, sim.player_y)
+            for lane in world_lanes(car["x"] - offset, CAR_WIDTH):
+                last = max(last, lane)
+                if interval is not None:
+                    added.setdefault(lane, []).append(interval)
+        if last == first:
+            return True  # The cluster is behind the player or in the lane it is standing in
+
+        # Everything blocking each lane from the player's lane to the last lane of the cluster
+        lanes = self.lane_safety.lanes
+        blocked = [lanes.get(lane, []) + added.get(lane, []) for lane in range(first, last + 1)]
+
+        # Earliest tick the front of the player can reach the next lane
+        earliest = tick + max(0, (first + 1) * LANE_WIDTH - (player_x + PLAYER_WIDTH)) / sim.move_speed
+        return self._find_path(blocked, 0, tick, earliest, earliest + self.horizon, sim.move_speed)
+
+    def _find_path(self, blocked, index, entered, earliest, deadline, move_speed):
+        """Search the ticks at which the player could step out of blocked[index] into the next lane
+
+        The player is in lane index from the tick it entered, and has to stay
+        in it until it is fully inside the next lane.
+        """
+        lane = blocked[index]
+        if index == len(blocked) - 1:
+            # Last lane, cross it completely
+            return is_clear(lane, entered, entered + (LANE_WIDTH + PLAYER_WIDTH) / move_speed)
+
+        # Step in as early as possible or right after a car in the next lane has passed
+        following = blocked[index + 1]
+        candidates = [earliest] + [interval[1] for interval in following if interval[1] > earliest]
+        for enter in sorted(candidates):
+            if enter > deadline:
+                break
+            if not is_clear(lane, entered, enter + PLAYER_WIDTH / move_speed):
+                break  # Waiting in this lane any longer only makes it worse
+            if self._find_path(blocked, index + 1, enter, enter + LANE_WIDTH / move_speed, deadline, move_speed):
+                return True
+        return False
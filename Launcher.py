@@ -10,8 +10,15 @@ import sys
 import os
 import subprocess
 
+from Frame_Pacer import FramePacer
+from Game_Options import parse_options
+from Stats_Store import StatsStore
+
 # --- INITIALIZATION ---
 
+# The options are only used by the game modes, but --help and typos are answered before the window opens
+parse_options()
+
 # Initialize pygame
 pygame.init()
 
@@ -22,7 +29,7 @@ base_path = os.path.dirname(os.path.abspath(__file__))
 
 # Screen dimensions and setup
 SCREEN_WIDTH = 500
-SCREEN_HEIGHT = 400
+SCREEN_HEIGHT = 480
 FPS = 30
 
 # Colors
@@ -36,8 +43,8 @@ GREEN = (0, 255, 0)
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Crossy Road - Mode Selection")
 
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
+# Paces the loop, sleeping while nobody touches the menu
+pacer = FramePacer(FPS)
 
 # Initialize pygame_gui manager
 manager = pygame_gui.UIManager((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -59,6 +66,37 @@ title_text = title_font.render("Crossy Road", True, BLACK)
 subtitle_font = pygame.font.Font(None, 28)
 subtitle_text = subtitle_font.render("Greta Thunberg Edition", True, BLACK)
 
+# Best runs of each mode, read once from the stats database (an indexed query)
+stats = StatsStore()
+leaderboard_font = pygame.font.Font(None, 24)
+leaderboard_texts = []
+for mode, mode_name in (("regular", "Regular"), ("hard", "Hard")):
+    best = stats.leaderboard(mode, limit=3)
+    scores = ", ".join(f"{score} ({duration:.0f}s)" for score, duration, _, _ in best) or "no runs yet"
+    leaderboard_texts.append(leaderboard_font.render(f"{mode_name} best: {scores}", True, BLACK))
+stats.close()
+
+# Everything under the menu is static, so it is drawn once
+backdrop = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+backdrop.fill(WHITE)
+
+# Draw background image if available
+if background_image:
+    backdrop.blit(background_image, (0, 0))
+    
+    # Add semi-transparent overlay for better text readability
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((255, 255, 255, 128))  # Semi-transparent white
+    backdrop.blit(overlay, (0, 0))
+
+# Draw title
+backdrop.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 30))
+backdrop.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 70))
+
+# Draw leaderboard below the menu
+for i, text in enumerate(leaderboard_texts):
+    backdrop.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 365 + i * 28))
+
 # --- UI ELEMENTS ---
 
 # Create a panel for the menu
@@ -115,8 +153,8 @@ def launch_game_mode(mode):
     try:
         # Close the launcher
         pygame.quit()
-        # Launch the selected game file
-        subprocess.run([python_executable, game_file])
+        # Launch the selected game file, forwarding our command line options
+        subprocess.run([python_executable, game_file] + sys.argv[1:])
         # Exit the launcher after the game exits
         sys.exit()
     except Exception as e:
@@ -127,10 +165,11 @@ def launch_game_mode(mode):
 
 running = True
 while running:
-    time_delta = clock.tick(FPS)/1000.0
+    # Wait for input, nothing on this screen moves by itself
+    events, time_delta = pacer.next_frame(active=False)
     
     # Process events
-    for event in pygame.event.get():
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
         
@@ -147,24 +186,17 @@ while running:
         # Process all UI events
         manager.process_events(event)
     
-    # Clear the screen
-    screen.fill(WHITE)
+    # Update UI
+    manager.update(time_delta)
     
-    # Draw background image if available
-    if background_image:
-        screen.blit(background_image, (0, 0))
-        
-        # Add semi-transparent overlay for better text readability
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((255, 255, 255, 128))  # Semi-transparent white
-        screen.blit(overlay, (0, 0))
+    # Nothing changed, the last frame is still on screen
+    if not pacer.redraw:
+        continue
     
-    # Draw title
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 30))
-    screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 70))
+    # Draw the static backdrop
+    screen.blit(backdrop, (0, 0))
     
-    # Update and draw UI
-    manager.update(time_delta)
+    # Draw UI
     manager.draw_ui(screen)
     
     # Update display
@@ -0,0 +1,170 @@
+"""
+Crossy Road - Greta Thunberg Edition (Particles)
+Crash debris, victory confetti and car exhaust for both game modes.
+
+Every particle lives in a slot of preallocated NumPy arrays (position, velocity,
+acceleration, life and style), so a whole burst is spawned with a few slice
+assignments and every particle is moved by the same handful of vectorized
+operations each tick. The pool never grows: once it is full the oldest slots
+are reused. Particles are pre-rendered small squares in a few fade levels per
+style, and all of them are drawn with a single batched blits call.
+
+Positions are kept in world coordinates, so particles stay where they were
+emitted when the road scrolls.
+
+NumPy is optional, create_particles() returns None without it and the game
+simply plays without particles.
+"""
+
+import pygame
+
+# NumPy is optional, the game works without particles
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- CONSTANTS ---
+
+# Most particles alive at once (the oldest are replaced beyond this)
+PARTICLE_CAPACITY = 4096
+
+# Each style is a square (size in pixels, color); sprites fade out over FADE_LEVELS steps
+STYLES = (
+    (6, (90, 90, 90)),      # Debris: dark metal
+    (5, (39, 97, 226)),     # Debris: car paint
+    (4, (230, 230, 230)),   # Debris: glass
+    (6, (220, 40, 40)),     # Confetti
+    (6, (40, 180, 70)),     # Confetti
+    (6, (250, 200, 30)),    # Confetti
+    (6, (60, 120, 240)),    # Confetti
+    (8, (150, 150, 150)),   # Exhaust
+)
+DEBRIS_STYLES = (0, 1, 2)
+CONFETTI_STYLES = (3, 4, 5, 6)
+EXHAUST_STYLES = (7,)
+FADE_LEVELS = 4
+
+# Downward pull in pixels per second squared
+GRAVITY = 600.0
+
+# Particles per effect
+DEBRIS_COUNT = 160
+CONFETTI_COUNT = 1200
+
+# Ticks between two puffs of exhaust from each car
+EXHAUST_INTERVAL = 4
+
+# --- PARTICLE SYSTEM ---
+
+class ParticleSystem:
+    """Fixed size pool of particles updated with vectorized math and drawn in one batch"""
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)
+        self.acceleration = np.zeros((capacity, 2), np.float32)
+        # Seconds left to live (a slot is free when it reaches 0) and seconds the particle started with
+        self.life = np.zeros(capacity, np.float32)
+        self.lifetime = np.ones(capacity, np.float32)
+        self.style = np.zeros(capacity, np.intp)
+
+        # Slots in use (lowered by the quality governor) and the next one to fill,
+        # wrapping around so the oldest particles are replaced first
+        self.limit = capacity
+        self._next = 0
+        self.rng = np.random.default_rng(seed)
+
+        # One pre-rendered square per style and fade level, indexed style * FADE_LEVELS + level
+        self.sprites = []
+        for size, color in STYLES:
+            for level in range(FADE_LEVELS):
+                sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+                sprite.fill((*color, 255 * (level + 1) // FADE_LEVELS))
+                self.sprites.append(sprite)
+
+    def emit(self, x, y, count, speed, angle, spread, life, styles, gravity=GRAVITY):
+        """Spawn count particles at (x, y) flying at angle +- spread radians (x, y and angle may be arrays)"""
+        count = min(count, self.limit)
+        if count == 0:
+            return
+        slots = (self._next + np.arange(count)) % self.limit
+        self._next = (self._next + count) % self.limit
+
+        rng = self.rng
+        angles = angle + rng.uniform(-spread, spread, count)
+        speeds = rng.uniform(speed * 0.3, speed, count)
+        self.position[slots, 0] = x
+        self.position[slots, 1] = y
+        self.velocity[slots, 0] = np.cos(angles) * speeds
+        self.velocity[slots, 1] = np.sin(angles) * speeds
+        self.acceleration[slots, 0] = 0
+        self.acceleration[slots, 1] = gravity
+        lifetimes = rng.uniform(life * 0.5, life, count)
+        self.life[slots] = lifetimes
+        self.lifetime[slots] = lifetimes
+        self.style[slots] = rng.choice(styles, count)
+
+    def debris(self, x, y):
+        """Burst of car and metal pieces where a player was hit"""
+        self.emit(x, y, DEBRIS_COUNT, 420, -np.pi / 2, np.pi, 1.2, DEBRIS_STYLES)
+
+    def confetti(self, x, width):
+        """Confetti falling from the top of the screen across width pixels of the world from x"""
+        xs = x + self.rng.uniform(0, width, CONFETTI_COUNT)
+        self.emit(xs, 0, CONFETTI_COUNT, 300, np.pi / 2, 0.6, 2.5, CONFETTI_STYLES, gravity=60)
+
+    def exhaust(self, cars, background_offset, car_width, car_height):
+        """One puff of smoke behind every car, drifting against the way it drives"""
+        if not cars:
+            return
+        count = len(cars)
+        xs = np.fromiter((car["x"] for car in cars), np.float32, count) - background_offset + car_width / 2
+        ys = np.fromiter((car["y"] for car in cars), np.float32, count)
+        down = np.fromiter((car["speed"] >= 0 for car in cars), bool, count)
+        # Cars driving down puff upwards from their top edge, cars driving up downwards from their bottom edge
+        ys = np.where(down, ys, ys + car_height)
+        angles = np.where(down, -np.pi / 2, np.pi / 2)
+        self.emit(xs, ys, count, 40, angles, 0.5, 0.8, EXHAUST_STYLES, gravity=0)
+
+    def update(self, dt):
+        """Move every particle forward by dt seconds"""
+        # Free slots are moved too, which is cheaper than picking out the live ones
+        self.velocity += self.acceleration * dt
+        self.position += self.velocity * dt
+        self.life -= dt
+        np.maximum(self.life, 0, out=self.life)
+
+    def set_limit(self, limit):
+        """Use at most limit slots, removing the particles beyond them"""
+        self.limit = max(0, min(limit, self.capacity))
+        self.life[self.limit:] = 0
+        self._next = 0
+
+    def clear(self):
+        """Remove every particle"""
+        self.life[:] = 0
+
+    def count(self):
+        """Number of live particles"""
+        return int(np.count_nonzero(self.life > 0))
+
+    def draw(self, screen, background_offset):
+        """Draw every live particle with one batched blit"""
+        alive = np.flatnonzero(self.life > 0)
+        if not len(alive):
+            return
+        levels = np.minimum((self.life[alive] / self.lifetime[alive] * FADE_LEVELS).astype(np.intp), FADE_LEVELS - 1)
+        sprite_indices = self.style[alive] * FADE_LEVELS + levels
+        positions = self.position[alive].astype(np.intp)
+        positions[:, 0] += int(background_offset)
+        sprites = self.sprites
+        screen.blits([sprites[index] for index in sprite_indices.tolist()], positions.tolist())
+
+def create_particles():
+    """Particle system for a game mode, or None when NumPy is not installed"""
+    if np is None:
+        print("NumPy is not installed, playing without particles")
+        return None
+    return ParticleSystem()
@@ -0,0 +1,94 @@
+"""
+Crossy Road - Greta Thunberg Edition (Profiler)
+On-screen profiling overlay for both game modes (F3 or --profile).
+
+Shows the frame rate, the median and 95th percentile frame time over the last
+second or so, how long the simulation and the drawing took, the number of live
+particles, the active quality tier (see Quality_Governor.py) and the garbage
+collector pauses (see GC_Policy.py).
+The text is only rendered again a few times a second, so showing the overlay
+costs a handful of blits per frame.
+"""
+
+import collections
+import time
+
+import pygame
+
+# --- CONSTANTS ---
+
+# Frames the statistics are taken over
+WINDOW_FRAMES = 60
+
+# Seconds between two updates of the overlay text
+REFRESH_SECONDS = 0.25
+
+# Width of the overlay, fixed so its backdrop is cached once
+OVERLAY_WIDTH = 340
+
+# Colors
+TEXT_COLOR = (255, 255, 255)
+BACKDROP_COLOR = (0, 0, 0, 160)
+
+# --- PROFILER ---
+
+class Profiler:
+    """Collect frame and section timings and draw them as an overlay"""
+
+    def __init__(self, visible=False):
+        self.visible = visible
+        self.frame_times = collections.deque(maxlen=WINDOW_FRAMES)
+        # Exponential moving average of each section, in milliseconds
+        self.sections = {}
+        self.font = pygame.font.Font(None, 22)
+        self._lines = []
+        self._next_refresh = 0
+
+    def add_frame(self, milliseconds):
+        """Record the time one frame took"""
+        self.frame_times.append(milliseconds)
+
+    def add_section(self, name, seconds):
+        """Record the time a section of the frame took (e.g. "sim" or "draw")"""
+        milliseconds = seconds * 1000
+        average = self.sections.get(name)
+        self.sections[name] = milliseconds if average is None else average * 0.9 + milliseconds * 0.1
+
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+
+    def lines(self, fps, quality=None, particles=None, gc_policy=None):
+        """Text lines of the overlay"""
+        ordered = sorted(self.frame_times)
+        last = len(ordered) - 1
+        p50 = ordered[last // 2] if ordered else 0
+        p95 = ordered[last * 95 // 100] if ordered else 0
+        lines = [f"FPS {fps:.0f}   frame {p50:.1f} / {p95:.1f} ms (p50 / p95)"]
+        if self.sections:
+            lines.append("   ".join(f"{name} {ms:.1f} ms" for name, ms in self.sections.items()))
+        if particles is not None:
+            lines.append(f"particles {particles.count()} / {particles.limit}")
+        if quality is not None:
+            lines.append(f"quality {quality.tier_name()} ({quality.tier + 1}/{len(quality.tiers)})")
+        if gc_policy is not None:
+            lines.extend(gc_policy.lines())
+        return lines
+
+    def draw(self, screen, fps, quality=None, particles=None, gc_policy=None):
+        """Draw the overlay in the bottom right corner"""
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if now >= self._next_refresh:
+            self._next_refresh = now + REFRESH_SECONDS
+            self._lines = [self.font.render(line, True, TEXT_COLOR)
+                           for line in self.lines(fps, quality, particles, gc_policy)]
+
+        width = OVERLAY_WIDTH
+        height = len(self._lines) * 20 + 8
+        x = screen.width - width - 5
+        y = screen.height - height - 40
+        screen.fill_rect(BACKDROP_COLOR, (x, y, width, height))
+        for index, line in enumerate(self._lines):
+            screen.blit(line, (x + 6, y + 5 + index * 20))
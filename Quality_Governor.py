@@ -0,0 +1,79 @@
+"""
+Crossy Road - Greta Thunberg Edition (Quality Governor)
+Keeps the game at its target frame rate on slow machines by turning optional
+work down when frames run over budget and back up when there is room again.
+
+The governor watches how long the last WINDOW_FRAMES frames took to produce
+(without the time spent waiting for the next frame) and steps through TIERS,
+from everything on to the cheapest settings. It only steps down when the 90th
+percentile frame takes more than DOWNGRADE_RATIO of the budget, only steps up
+when it takes less than UPGRADE_RATIO, and waits a full window after every step
+before judging again. The gap between the two ratios is the hysteresis that
+keeps it from flipping back and forth between two tiers.
+"""
+
+import collections
+
+# --- CONSTANTS ---
+
+# Quality tiers from best to cheapest:
+#   debug      - hitboxes and lane markers (only when DEBUG_MODE is on)
+#   overlays   - translucent overlays while playing (lane hints, AFK warning backdrop)
+#   particles  - most particles alive at once
+#   exhaust    - exhaust puffs from every car
+#   pixel_scale - render at 1/N of the window resolution (software renderer)
+TIERS = (
+    {"name": "high", "debug": True, "overlays": True, "particles": 4096, "exhaust": True, "pixel_scale": 1},
+    {"name": "medium", "debug": False, "overlays": True, "particles": 1024, "exhaust": True, "pixel_scale": 1},
+    {"name": "low", "debug": False, "overlays": False, "particles": 256, "exhaust": False, "pixel_scale": 1},
+    {"name": "lowest", "debug": False, "overlays": False, "particles": 64, "exhaust": False, "pixel_scale": 2},
+)
+
+# Frames judged at once (about two seconds)
+WINDOW_FRAMES = 60
+
+# Share of the frame budget the 90th percentile frame may use before stepping down,
+# and has to stay under before stepping back up
+DOWNGRADE_RATIO = 0.9
+UPGRADE_RATIO = 0.5
+
+# --- QUALITY GOVERNOR ---
+
+class QualityGovernor:
+    """Pick a quality tier from a rolling window of frame times"""
+
+    def __init__(self, fps, tiers=TIERS, window=WINDOW_FRAMES):
+        self.budget_ms = 1000 / fps
+        self.tiers = tiers
+        self.tier = 0
+        self.frame_times = collections.deque(maxlen=window)
+        self.changes = 0
+
+    @property
+    def settings(self):
+        """Settings of the active tier"""
+        return self.tiers[self.tier]
+
+    def tier_name(self):
+        """Name of the active tier"""
+        return self.tiers[self.tier]["name"]
+
+    def add_frame(self, milliseconds):
+        """Record the time a frame took to produce, returning True when the tier changed"""
+        self.frame_times.append(milliseconds)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+
+        ordered = sorted(self.frame_times)
+        slow = ordered[len(ordered) * 9 // 10]
+        if slow > self.budget_ms * DOWNGRADE_RATIO and self.tier < len(self.tiers) - 1:
+            self.tier += 1
+        elif slow < self.budget_ms * UPGRADE_RATIO and self.tier > 0:
+            self.tier -= 1
+        else:
+            return False
+
+        # Judge the new tier on its own frames only
+        self.frame_times.clear()
+        self.changes += 1
+        return True
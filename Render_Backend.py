@@ -0,0 +1,374 @@
+"""
+Crossy Road - Greta Thunberg Edition (Render Backend)
+Drawing backends used by the game modes.
+The software backend blits onto the pygame display surface like the game always has,
+the GPU backend draws through pygame._sdl2 Renderer/Texture so fills, overlays and
+dimming are done by SDL's renderer instead of the CPU.
+Both backends expose the same scene API, so the game code only ever calls
+fill, blit, blits, fill_rect, draw_rect, draw_line, draw_ui and present.
+
+The game always draws on a fixed logical canvas (SCREEN_WIDTH x SCREEN_HEIGHT).
+The backends scale that canvas to the real window size, letterboxing it if the
+aspect ratio differs, so lane math and UI rects never need to know the window size.
+"""
+
+import math
+import weakref
+import pygame
+
+# pygame._sdl2 is optional, the software backend works without it
+try:
+    from pygame._sdl2 import video as sdl2_video
+except ImportError:
+    sdl2_video = None
+
+# --- CONSTANTS ---
+
+# SDL_BLENDMODE_BLEND, used so translucent fills blend like SRCALPHA surfaces
+BLENDMODE_BLEND = 1
+
+# Color of the bars around the canvas when the window has a different aspect ratio
+LETTERBOX_COLOR = (0, 0, 0)
+
+# Mouse events whose position has to be mapped back to the logical canvas
+MOUSE_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+# --- BACKENDS ---
+
+class SoftwareRenderer:
+    """Draw with software blits onto the pygame display surface"""
+
+    name = "software"
+
+    def __init__(self, width, height, caption, window_size=None, fullscreen=False, pixel_scale=1):
+        self.width = width
+        self.height = height
+        self.pixel_scale = max(1, int(pixel_scale))
+
+        if fullscreen:
+            # (0, 0) asks SDL for the desktop resolution
+            self.window = pygame.display.set_mode(window_size or (0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(window_size or (width, height), pygame.RESIZABLE)
+        pygame.display.set_caption(caption)
+
+        # Translucent overlays are reused instead of being recreated every frame
+        self._overlays = {}
+
+        # Original images, so scaled sprites are made from the full resolution source
+        self._sources = weakref.WeakKeyDictionary()
+
+        self._layout()
+
+    def _layout(self):
+        """Work out where the logical canvas goes in the window and at what scale"""
+        window_width, window_height = self.window.get_size()
+
+        if self.pixel_scale > 1:
+            # Render at a fraction of the window size and upscale by a whole number
+            target_size = (max(1, window_width // self.pixel_scale), max(1, window_height // self.pixel_scale))
+            self.target = pygame.Surface(target_size)
+            self._upscale_area = self.window.subsurface(
+                (0, 0, target_size[0] * self.pixel_scale, target_size[1] * self.pixel_scale))
+        else:
+            self.target = self.window
+            self._upscale_area = None
+
+        # Fit the canvas inside the target, keeping its aspect ratio
+        target_width, target_height = self.target.get_size()
+        self.scale = min(target_width / self.width, target_height / self.height)
+        canvas_size = (round(self.width * self.scale), round(self.height * self.scale))
+        self.canvas_rect = pygame.Rect((0, 0), canvas_size)
+        self.canvas_rect.center = (target_width // 2, target_height // 2)
+        self.target.set_clip(self.canvas_rect)
+
+        # Drawing straight onto the window needs no coordinate mapping at all
+        self.scaled = self.target is not self.window or self.canvas_rect != self.window.get_rect()
+
+        # Sprites are cached at the current output scale, so they are only rescaled on resize
+        self._scaled_images = weakref.WeakKeyDictionary()
+        self._ui_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA) if self.scaled else None
+
+    def set_pixel_scale(self, pixel_scale):
+        """Change the internal render resolution to 1/pixel_scale of the window"""
+        pixel_scale = max(1, int(pixel_scale))
+        if pixel_scale != self.pixel_scale:
+            self.pixel_scale = pixel_scale
+            self._layout()
+
+    def register_source(self, image, source):
+        """Remember the full resolution source of an image for scaling it up later"""
+        self._sources[image] = source
+
+    def _scaled_image(self, image):
+        """Get an image scaled to the output, scaling it the first time it is drawn"""
+        scaled = self._scaled_images.get(image)
+        if scaled is None:
+            size = (max(1, round(image.get_width() * self.scale)), max(1, round(image.get_height() * self.scale)))
+            source = self._sources.get(image, image)
+            try:
+                scaled = pygame.transform.smoothscale(source, size)
+            except ValueError:
+                # smoothscale only handles 24 and 32 bit surfaces
+                scaled = pygame.transform.scale(source, size)
+            self._scaled_images[image] = scaled
+        return scaled
+
+    def _point(self, position):
+        """Map a logical canvas position to the render target"""
+        return (self.canvas_rect.x + round(position[0] * self.scale),
+                self.canvas_rect.y + round(position[1] * self.scale))
+
+    def _rect(self, rect):
+        """Map a logical canvas rectangle to the render target"""
+        rect = pygame.Rect(rect)
+        x, y = self._point(rect.topleft)
+        return pygame.Rect(x, y, round(rect.width * self.scale), round(rect.height * self.scale))
+
+    def handle_event(self, event):
+        """Follow window resizes and return the event with mouse positions on the logical canvas"""
+        if event.type == pygame.VIDEORESIZE:
+            self.window = pygame.display.get_surface()
+            self._layout()
+        elif self.scaled and event.type in MOUSE_EVENTS:
+            event = pygame.event.Event(event.type, dict(event.dict, pos=self.to_logical(event.pos)))
+        return event
+
+    def to_logical(self, position):
+        """Map a window position (e.g. the mouse) back to the logical canvas"""
+        x = (position[0] // self.pixel_scale - self.canvas_rect.x) / self.scale
+        y = (position[1] // self.pixel_scale - self.canvas_rect.y) / self.scale
+        return (int(x), int(y))
+
+    def fill(self, color):
+        """Fill the whole screen with a color"""
+        if self.scaled:
+            self.target.set_clip(None)
+            self.target.fill(LETTERBOX_COLOR)
+            self.target.set_clip(self.canvas_rect)
+            self.target.fill(color, self.canvas_rect)
+        else:
+            self.target.fill(color)
+
+    def blit(self, image, position):
+        """Draw an image at a screen position"""
+        if self.scaled:
+            self.target.blit(self._scaled_image(image), self._point(position))
+        else:
+            self.target.blit(image, position)
+
+    def blits(self, images, positions):
+        """Draw many images in one call (used for particles)"""
+        if self.scaled:
+            pairs = [(self._scaled_image(image), self._point(position)) for image, position in zip(images, positions)]
+        else:
+            pairs = zip(images, positions)
+        self.target.blits(pairs, doreturn=False)
+
+    def fill_rect(self, color, rect):
+        """Fill a rectangle, blending it when the color has an alpha component"""
+        if self.scaled:
+            rect = self._rect(rect)
+        if len(color) == 4 and color[3] < 255:
+            rect = pygame.Rect(rect)
+            key = (rect.size, tuple(color))
+            overlay = self._overlays.get(key)
+            if overlay is None:
+                overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+                overlay.fill(color)
+                self._overlays[key] = overlay
+            self.target.blit(overlay, rect.topleft)
+        else:
+            self.target.fill(color, rect)
+
+    def draw_rect(self, color, rect, width=1):
+        """Draw a rectangle outline"""
+        if self.scaled:
+            rect = self._rect(rect)
+            width = max(1, round(width * self.scale))
+        pygame.draw.rect(self.target, color, rect, width)
+
+    def draw_line(self, color, start, end, width=1):
+        """Draw a line"""
+        if self.scaled:
+            start = self._point(start)
+            end = self._point(end)
+            width = max(1, round(width * self.scale))
+        pygame.draw.line(self.target, color, start, end, width)
+
+    def draw_ui(self, manager):
+        """Draw the pygame_gui interface on top of the scene"""
+        if self.scaled:
+            # The UI lays itself out on the logical canvas, so draw it there and scale the result
+            self._ui_surface.fill((0, 0, 0, 0))
+            manager.draw_ui(self._ui_surface)
+            self.target.blit(pygame.transform.smoothscale(self._ui_surface, self.canvas_rect.size),
+                             self.canvas_rect.topleft)
+        else:
+            manager.draw_ui(self.target)
+
+    def present(self):
+        """Show the finished frame"""
+        if self._upscale_area is not None:
+            # Integer nearest-neighbour upscale of the low resolution frame
+            pygame.transform.scale(self.target, self._upscale_area.get_size(), self._upscale_area)
+        pygame.display.flip()
+
+    def frame_surface(self):
+        """Surface holding the frame last shown (the window itself)"""
+        return self.window
+
+class GPURenderer:
+    """Draw through an SDL renderer, uploading each image to a texture once"""
+
+    name = "gpu"
+
+    def __init__(self, width, height, caption, window_size=None, fullscreen=False, accelerated=True):
+        self.width = width
+        self.height = height
+        self.window = sdl2_video.Window(caption, size=window_size or (width, height),
+                                        resizable=not fullscreen)
+        if fullscreen:
+            self.window.set_fullscreen(desktop=window_size is None)
+        try:
+            if accelerated:
+                self.renderer = sdl2_video.Renderer(self.window, accelerated=1)
+            else:
+                # SDL's software renderer works on headless machines too
+                self.renderer = sdl2_video.Renderer(self.window, index=software_driver_index())
+        except Exception:
+            self.window.destroy()
+            raise
+        self.renderer.draw_blend_mode = BLENDMODE_BLEND
+
+        # SDL scales and letterboxes the logical canvas to the window, mouse events included
+        self.renderer.logical_size = (width, height)
+
+        # pygame_gui converts its surfaces, which needs a display format,
+        # so a hidden 1x1 display is opened next to the render window
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.accelerated = accelerated
+
+        # Textures are keyed by their source surface and dropped together with it
+        self._textures = weakref.WeakKeyDictionary()
+        self._sources = weakref.WeakKeyDictionary()
+
+        # pygame_gui can only draw onto a surface, so the menu is drawn here first
+        # and copied into one streaming texture that is reused every frame
+        self._ui_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self._ui_texture = None
+
+        # SDL only draws 1px lines, thicker ones are this white pixel tinted, stretched and rotated
+        pixel = pygame.Surface((1, 1), pygame.SRCALPHA)
+        pixel.fill((255, 255, 255, 255))
+        self._pixel = sdl2_video.Texture.from_surface(self.renderer, pixel)
+        self._pixel.blend_mode = BLENDMODE_BLEND
+
+    def set_pixel_scale(self, pixel_scale):
+        """SDL scales the canvas on the GPU, there is no lower internal resolution to pick"""
+
+    def register_source(self, image, source):
+        """Remember the full resolution source of an image to build its texture from"""
+        self._sources[image] = source
+
+    def _texture(self, image):
+        """Get the texture for an image, uploading it the first time it is drawn"""
+        texture = self._textures.get(image)
+        if texture is None:
+            texture = sdl2_video.Texture.from_surface(self.renderer, self._sources.get(image, image))
+            self._textures[image] = texture
+        return texture
+
+    def handle_event(self, event):
+        """Events are already on the logical canvas, SDL maps them for the renderer"""
+        return event
+
+    def to_logical(self, position):
+        """Positions reported by SDL are already on the logical canvas"""
+        return position
+
+    def fill(self, color):
+        """Fill the whole screen with a color"""
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.clear()
+
+    def blit(self, image, position):
+        """Draw an image at a screen position"""
+        self._texture(image).draw(dstrect=(position[0], position[1], image.get_width(), image.get_height()))
+
+    def blits(self, images, positions):
+        """Draw many images (SDL has no batched copy, so each one is queued on the renderer)"""
+        texture = self._texture
+        for image, position in zip(images, positions):
+            texture(image).draw(dstrect=(position[0], position[1], image.get_width(), image.get_height()))
+
+    def fill_rect(self, color, rect):
+        """Fill a rectangle, blending it when the color has an alpha component"""
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.fill_rect(rect)
+
+    def draw_rect(self, color, rect, width=1):
+        """Draw a rectangle outline"""
+        self.renderer.draw_color = pygame.Color(color)
+        rect = pygame.Rect(rect)
+        for _ in range(width):
+            self.renderer.draw_rect(rect)
+            rect.inflate_ip(-2, -2)
+
+    def draw_line(self, color, start, end, width=1):
+        """Draw a line"""
+        if width <= 1:
+            self.renderer.draw_color = pygame.Color(color)
+            self.renderer.draw_line(start, end)
+            return
+
+        # A width thick rectangle along the line, centred on it like pygame.draw.line
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        self._pixel.color = color[:3]
+        self._pixel.alpha = color[3] if len(color) == 4 else 255
+        self._pixel.draw(dstrect=(start[0], start[1] - width / 2, max(1, math.hypot(dx, dy)), width),
+                         angle=math.degrees(math.atan2(dy, dx)), origin=(0, width / 2))
+
+    def draw_ui(self, manager):
+        """Draw the pygame_gui interface on top of the scene"""
+        self._ui_surface.fill((0, 0, 0, 0))
+        manager.draw_ui(self._ui_surface)
+        if self._ui_texture is None:
+            self._ui_texture = sdl2_video.Texture(self.renderer, self._ui_surface.get_size(), streaming=True)
+            self._ui_texture.blend_mode = BLENDMODE_BLEND
+        self._ui_texture.update(self._ui_surface)
+        self._ui_texture.draw()
+
+    def present(self):
+        """Show the finished frame"""
+        self.renderer.present()
+
+    def frame_surface(self):
+        """Surface holding the frame last shown, read back from the renderer"""
+        return self.renderer.to_surface()
+
+# --- BACKEND SELECTION ---
+
+def software_driver_index():
+    """Find the index of SDL's software render driver"""
+    for index, driver in enumerate(sdl2_video.get_drivers()):
+        if driver.name == "software":
+            return index
+    return -1
+
+def create_renderer(width, height, caption, backend="software", window_size=None,
+                    fullscreen=False, pixel_scale=1):
+    """Create the requested render backend, falling back to software blits if it is unavailable"""
+    if backend == "gpu":
+        if sdl2_video is None:
+            print("GPU renderer unavailable: pygame._sdl2 could not be imported")
+        else:
+            # Prefer a hardware renderer, then SDL's software renderer
+            for accelerated in (True, False):
+                try:
+                    return GPURenderer(width, height, caption, window_size, fullscreen, accelerated)
+                except Exception as e:
+                    print(f"Error creating GPU renderer (accelerated={accelerated}): {e}")
+
+    return SoftwareRenderer(width, height, caption, window_size, fullscreen, pixel_scale)
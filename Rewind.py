@@ -0,0 +1,205 @@
+"""
+Crossy Road - Greta Thunberg Edition (Rewind)
+Keeps the last few seconds of a run so it can be rewound, for the practice mode
+"Rewind 3s" button after a crash and for scrubbing back while debugging.
+
+Every tick the state of the simulation (cars, players, scrolling, score, the
+hard mode speed ramps and the AFK timer) is copied into a ring of slots in
+preallocated arrays, so recording a tick never allocates anything and the
+memory used is fixed by the number of seconds kept and the most cars recorded
+(see RewindBuffer.memory_bytes). Rewinding goes straight to the slot it needs.
+
+The random number generator is not rewound, so the cars that spawn after a
+rewind are new ones rather than a replay of the first attempt.
+"""
+
+import array
+import math
+
+from Game_Simulation import FPS, MAX_PLAYERS, OUT_COLLISION, OUT_LEFT_BEHIND
+
+# --- CONSTANTS ---
+
+# Seconds of history kept by default
+REWIND_SECONDS = 10
+
+# Most cars a slot can hold (hard mode car clusters keep adding cars)
+MAX_CARS = 128
+
+# How far the practice mode button goes back, and each debug scrub
+PRACTICE_REWIND_SECONDS = 3
+SCRUB_SECONDS = 1
+
+# Why a player is out, as stored in the slots (0 is still in the run)
+OUT_CODES = {None: 0, OUT_COLLISION: 1, OUT_LEFT_BEHIND: 2}
+OUT_REASONS = {code: reason for reason, code in OUT_CODES.items()}
+
+# --- REWIND BUFFER ---
+
+class RewindBuffer:
+    """Ring buffer of the last seconds of a simulation, one slot per tick"""
+
+    def __init__(self, sim, seconds=REWIND_SECONDS, max_cars=MAX_CARS):
+        self.sim = sim
+        self.capacity = max(2, int(seconds * FPS) + 1)
+        self.max_cars = max_cars
+        slots = self.capacity
+
+        # Cars, max_cars per slot (closest is NaN for cars without a near miss in progress)
+        self.car_count = array.array("i", bytes(4 * slots))
+        self.car_id = array.array("i", bytes(4 * slots * max_cars))
+        self.car_x = array.array("d", bytes(8 * slots * max_cars))
+        self.car_y = array.array("d", bytes(8 * slots * max_cars))
+        self.car_speed = array.array("d", bytes(8 * slots * max_cars))
+        self.car_lane = array.array("b", bytes(slots * max_cars))
+        self.car_closest = array.array("d", bytes(8 * slots * max_cars))
+
+        # Players, MAX_PLAYERS per slot (out_tick is -1 while a player is in)
+        self.player_x = array.array("i", bytes(4 * slots * MAX_PLAYERS))
+        self.player_score = array.array("i", bytes(4 * slots * MAX_PLAYERS))
+        self.player_out = array.array("b", bytes(slots * MAX_PLAYERS))
+        self.player_out_tick = array.array("i", bytes(4 * slots * MAX_PLAYERS))
+
+        # Everything else, one per slot (-1 stands for None)
+        self.tick = array.array("i", bytes(4 * slots))
+        self.last_move_tick = array.array("i", bytes(4 * slots))
+        self.background_offset = array.array("i", bytes(4 * slots))
+        self.score = array.array("i", bytes(4 * slots))
+        self.bonus = array.array("i", bytes(4 * slots))
+        self.combo = array.array("i", bytes(4 * slots))
+        self.last_near_miss_tick = array.array("i", bytes(4 * slots))
+        self.next_car_id = array.array("i", bytes(4 * slots))
+        self.car_speed_min = array.array("d", bytes(8 * slots))
+        self.car_speed_max = array.array("d", bytes(8 * slots))
+        self.win_state = array.array("b", bytes(slots))
+        self.winner = array.array("b", bytes(slots))
+
+        # Slot of the newest tick and number of ticks kept
+        self.head = -1
+        self.count = 0
+        # Ticks that had more than max_cars cars and so could not be kept
+        self.overflows = 0
+
+    def memory_bytes(self):
+        """Bytes held by the slots"""
+        return sum(len(value) * value.itemsize for value in vars(self).values()
+                   if isinstance(value, array.array))
+
+    def clear(self):
+        """Forget the history (e.g. when a new run starts)"""
+        self.head = -1
+        self.count = 0
+
+    def seconds(self):
+        """Seconds that can be rewound right now"""
+        return max(0, self.count - 1) / FPS
+
+    def record(self):
+        """Copy the state after the last tick into the next slot"""
+        sim = self.sim
+        if self.count and self.tick[self.head] == sim.tick:
+            # No tick since the last copy (e.g. the run is over)
+            return
+        cars = sim.cars
+        if len(cars) > self.max_cars:
+            # The history would have a gap, so start it over from the next tick that fits
+            self.overflows += 1
+            self.clear()
+            return
+
+        slot = (self.head + 1) % self.capacity
+        self.head = slot
+        self.count = min(self.count + 1, self.capacity)
+
+        base = slot * self.max_cars
+        self.car_count[slot] = len(cars)
+        for index, car in enumerate(cars):
+            self.car_id[base + index] = car["id"]
+            self.car_x[base + index] = car["x"]
+            self.car_y[base + index] = car["y"]
+            self.car_speed[base + index] = car["speed"]
+            self.car_lane[base + index] = car["lane"]
+            self.car_closest[base + index] = car.get("closest", math.nan)
+
+        base = slot * MAX_PLAYERS
+        for index, player in enumerate(sim.players):
+            self.player_x[base + index] = player["x"]
+            self.player_score[base + index] = player["score"]
+            self.player_out[base + index] = OUT_CODES[player["out"]]
+            out_tick = player["out_tick"]
+            self.player_out_tick[base + index] = -1 if out_tick is None else out_tick
+
+        self.tick[slot] = sim.tick
+        self.last_move_tick[slot] = sim.last_move_tick
+        self.background_offset[slot] = sim.background_offset
+        self.score[slot] = sim.score
+        self.bonus[slot] = sim.bonus
+        self.combo[slot] = sim.combo
+        self.last_near_miss_tick[slot] = -1 if sim.last_near_miss_tick is None else sim.last_near_miss_tick
+        self.next_car_id[slot] = sim.next_car_id
+        self.car_speed_min[slot] = sim.car_speed_min
+        self.car_speed_max[slot] = sim.car_speed_max
+        self.win_state[slot] = sim.win_state
+        self.winner[slot] = -1 if sim.winner is None else sim.winner
+
+    def rewind(self, ticks):
+        """Put the simulation back up to ticks ticks (as far as the history goes), returning False if it can't"""
+        ticks = min(ticks, self.count - 1)
+        if ticks < 1:
+            return False
+        slot = (self.head - ticks) % self.capacity
+        self.head = slot
+        self.count -= ticks
+        self.restore(slot)
+        return True
+
+    def restore(self, slot):
+        """Put the simulation back to the state kept in a slot"""
+        sim = self.sim
+
+        base = slot * self.max_cars
+        sim.cars.clear()
+        for index in range(base, base + self.car_count[slot]):
+            car = {"x": self.car_x[index], "y": self.car_y[index], "speed": self.car_speed[index],
+                   "lane": self.car_lane[index], "id": self.car_id[index]}
+            # Whole numbers go back as ints, like the simulation made them
+            for key in ("x", "y", "speed"):
+                if car[key].is_integer():
+                    car[key] = int(car[key])
+            if not math.isnan(self.car_closest[index]):
+                car["closest"] = self.car_closest[index]
+            sim.cars.append(car)
+
+        base = slot * MAX_PLAYERS
+        for index, player in enumerate(sim.players):
+            player["x"] = self.player_x[base + index]
+            player["score"] = self.player_score[base + index]
+            player["out"] = OUT_REASONS[self.player_out[base + index]]
+            out_tick = self.player_out_tick[base + index]
+            player["out_tick"] = None if out_tick < 0 else out_tick
+            # Which car hit a player is not kept, only that it happened
+            player["hit_by"] = None
+
+        sim.tick = self.tick[slot]
+        sim.last_move_tick = self.last_move_tick[slot]
+        sim.background_offset = self.background_offset[slot]
+        sim.score = self.score[slot]
+        sim.bonus = self.bonus[slot]
+        sim.combo = self.combo[slot]
+        last_near_miss_tick = self.last_near_miss_tick[slot]
+        sim.last_near_miss_tick = None if last_near_miss_tick < 0 else last_near_miss_tick
+        sim.next_car_id = self.next_car_id[slot]
+        sim.car_speed_min = self.car_speed_min[slot]
+        sim.car_speed_max = self.car_speed_max[slot]
+        sim.win_state = bool(self.win_state[slot])
+        winner = self.winner[slot]
+        sim.winner = None if winner < 0 else winner
+
+        # Only the newest tick can have ended the run, and rewinding never goes back to it
+        sim.near_misses.clear()
+        sim.game_over = False
+        sim.collision_state = False
+        sim.collided_car = None
+
+        for listener in sim.listeners:
+            listener.state_restored(sim)
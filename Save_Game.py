@@ -0,0 +1,177 @@
+"""
+Crossy Road - Greta Thunberg Edition (Save Game)
+Keeps a run in progress when the game is closed, so the next launch picks it
+up where it was left.
+
+The whole simulation (the random number generator, every car, the players,
+scrolling, score, the hard mode speed ramps and the AFK timer) is written as
+one versioned binary: a fixed header, a small record per player, the state of
+the generator and the cars as one array per field. Saving or loading a run
+takes a few tens of microseconds, and the file is a few kilobytes.
+A save is only read once, the game saves the run again when it closes.
+"""
+
+import array
+import math
+import os
+import struct
+
+from Rewind import OUT_CODES, OUT_REASONS
+
+# --- CONSTANTS ---
+
+# Where the saves are kept, one per game mode
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+
+# File header: magic, version, seed, tick, last move tick, background offset, score, bonus,
+# combo, last near miss tick, next car id, car speed min and max, win state, winner,
+# players, cars, generator version, generator words, next gauss
+HEADER = struct.Struct("<4sBIiiiiiiiiddBbBHBHd")
+MAGIC = b"CRSV"
+VERSION = 1
+
+# One per player: x, score, why they are out, tick they went out
+PLAYER = struct.Struct("<iiBi")
+
+# -1 stands for None in the header and player records, NaN in the car arrays
+
+# --- HELPER FUNCTIONS ---
+
+def save_path(mode, directory=DEFAULT_DIRECTORY):
+    """File the run of a mode is saved to"""
+    return os.path.join(directory, f"{mode}.sav")
+
+def none_as(value, placeholder):
+    """value, or placeholder if it is None"""
+    return placeholder if value is None else value
+
+# --- SAVING ---
+
+def dump_run(sim):
+    """The state of a simulation as bytes"""
+    rng_version, rng_words, gauss_next = sim.rng.getstate()
+    cars = sim.cars
+    parts = [HEADER.pack(MAGIC, VERSION, sim.seed, sim.tick, sim.last_move_tick, sim.background_offset,
+                         sim.score, sim.bonus, sim.combo, none_as(sim.last_near_miss_tick, -1), sim.next_car_id,
+                         sim.car_speed_min, sim.car_speed_max, sim.win_state, none_as(sim.winner, -1),
+                         sim.num_players, len(cars), rng_version, len(rng_words), none_as(gauss_next, math.nan))]
+    for player in sim.players:
+        parts.append(PLAYER.pack(player["x"], player["score"], OUT_CODES[player["out"]],
+                                 none_as(player["out_tick"], -1)))
+    parts.append(array.array("I", rng_words).tobytes())
+
+    # Cars, one array per field
+    parts.append(array.array("i", [car["id"] for car in cars]).tobytes())
+    for key in ("x", "y", "speed"):
+        parts.append(array.array("d", [car[key] for car in cars]).tobytes())
+    parts.append(array.array("b", [car["lane"] for car in cars]).tobytes())
+    parts.append(array.array("d", [car.get("closest", math.nan) for car in cars]).tobytes())
+    return b"".join(parts)
+
+def save_run(sim, mode, directory=DEFAULT_DIRECTORY):
+    """Save a run in progress for the next launch"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = save_path(mode, directory)
+        # Write next to the old save and swap it in, so a crash never leaves half a file
+        with open(path + ".tmp", "wb") as f:
+            f.write(dump_run(sim))
+        os.replace(path + ".tmp", path)
+    except Exception as e:
+        print(f"Error saving run: {e}")
+
+def delete_save(mode, directory=DEFAULT_DIRECTORY):
+    """Forget the saved run of a mode"""
+    try:
+        os.remove(save_path(mode, directory))
+    except FileNotFoundError:
+        pass
+
+# --- LOADING ---
+
+def restore_run(sim, data):
+    """Put a simulation back to the state saved in data, returning False if data doesn't fit it"""
+    (magic, version, seed, tick, last_move_tick, background_offset, score, bonus, combo, last_near_miss_tick,
+     next_car_id, car_speed_min, car_speed_max, win_state, winner, num_players, num_cars, rng_version,
+     rng_length, gauss_next) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or num_players != sim.num_players:
+        return False
+    offset = HEADER.size
+
+    players = []
+    for _ in range(num_players):
+        players.append(PLAYER.unpack_from(data, offset))
+        offset += PLAYER.size
+
+    def read(typecode, count):
+        nonlocal offset
+        values = array.array(typecode)
+        values.frombytes(data[offset:offset + count * values.itemsize])
+        offset += count * values.itemsize
+        return values
+
+    rng_words = read("I", rng_length)
+    car_ids = read("i", num_cars)
+    car_x = read("d", num_cars)
+    car_y = read("d", num_cars)
+    car_speed = read("d", num_cars)
+    car_lane = read("b", num_cars)
+    car_closest = read("d", num_cars)
+    if offset != len(data):
+        return False
+
+    sim.reset(seed)
+    sim.rng.setstate((rng_version, tuple(rng_words), None if math.isnan(gauss_next) else gauss_next))
+
+    sim.cars.clear()
+    for index in range(num_cars):
+        car = {"x": car_x[index], "y": car_y[index], "speed": car_speed[index], "lane": car_lane[index],
+               "id": car_ids[index]}
+        # Whole numbers go back as ints, like the simulation made them
+        for key in ("x", "y", "speed"):
+            if car[key].is_integer():
+                car[key] = int(car[key])
+        if not math.isnan(car_closest[index]):
+            car["closest"] = car_closest[index]
+        sim.cars.append(car)
+
+    for player, (x, player_score, out, out_tick) in zip(sim.players, players):
+        player["x"] = x
+        player["score"] = player_score
+        player["out"] = OUT_REASONS[out]
+        player["out_tick"] = None if out_tick < 0 else out_tick
+
+    sim.tick = tick
+    sim.last_move_tick = last_move_tick
+    sim.background_offset = background_offset
+    sim.score = score
+    sim.bonus = bonus
+    sim.combo = combo
+    sim.last_near_miss_tick = None if last_near_miss_tick < 0 else last_near_miss_tick
+    sim.next_car_id = next_car_id
+    sim.car_speed_min = car_speed_min
+    sim.car_speed_max = car_speed_max
+    sim.win_state = bool(win_state)
+    sim.winner = None if winner < 0 else winner
+
+    for listener in sim.listeners:
+        listener.state_restored(sim)
+    return True
+
+def load_run(sim, mode, directory=DEFAULT_DIRECTORY):
+    """Resume the saved run of a mode in sim (the save is used up), returning whether there was one"""
+    path = save_path(mode, directory)
+    if not os.path.exists(path):
+        return False
+    seed = sim.seed
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.remove(path)
+        if restore_run(sim, data):
+            return True
+        print("Saved run is from another version or player count, starting a new one")
+    except Exception as e:
+        print(f"Error loading saved run: {e}")
+    sim.reset(seed)
+    return False
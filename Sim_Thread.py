@@ -0,0 +1,228 @@
+"""
+Crossy Road - Greta Thunberg Edition (Simulation Thread)
+Optional split of a game mode into a simulation thread and the render loop (--sim-thread).
+
+The simulation thread steps the game at a fixed FPS on its own, so a slow frame
+on the render side never holds up the cars or the player. After every tick it
+publishes a Snapshot: the car positions in arrays, copies of the players and
+the handful of numbers the HUD shows. Snapshots are never changed once
+published, and the newest two are swapped in as a single tuple, so the render
+loop always reads a consistent pair without taking a lock. It draws a blend of
+the two (see Snapshot.view), which keeps motion smooth even when its frames
+and the simulation ticks are out of step.
+
+Everything that touches the GameSimulation itself happens on the simulation
+thread, or with SimThread.lock held. With the GIL the two threads take turns
+running Python code, so this mostly protects the render loop from slow frames;
+on a free-threaded CPython build they run in parallel as well.
+"""
+
+import array
+import queue
+import threading
+import time
+
+from Game_Simulation import FPS
+
+# --- SNAPSHOTS ---
+
+class Snapshot:
+    """The state of the simulation after one tick, never changed once published"""
+
+    def __init__(self, sim, result, timestamp):
+        self.timestamp = timestamp
+        self.result = result
+        self.tick = sim.tick
+        self.seed = sim.seed
+
+        # Cars as parallel arrays, in the order of sim.cars
+        cars = sim.cars
+        self.car_ids = array.array("i", [car["id"] for car in cars])
+        self.car_x = array.array("f", [car["x"] for car in cars])
+        self.car_y = array.array("f", [car["y"] for car in cars])
+        self.car_speed = array.array("f", [car["speed"] for car in cars])
+
+        # Copies of the players and of the cars that hit them
+        self.players = tuple(dict(player, hit_by=None if player["hit_by"] is None else dict(player["hit_by"]))
+                             for player in sim.players)
+        collided = sim.collided_car
+        self.collided_car = None if collided is None else dict(collided)
+
+        self.num_players = sim.num_players
+        self.background_offset = sim.background_offset
+        self.score = sim.score
+        self.win_score = sim.win_score
+        self.winner = sim.winner
+        self.win_state = sim.win_state
+        self.game_over = sim.game_over
+        self.bonus = sim.bonus
+        self.combo = sim.combo
+        self.last_near_miss_tick = sim.last_near_miss_tick
+        self.move_speed = sim.move_speed
+        self.afk_limit = sim.afk_limit
+        self.last_move_tick = sim.last_move_tick
+
+    def view(self, previous=None, alpha=1.0):
+        """What to draw: this snapshot blended with the one before it (alpha 0 is previous, 1 is this)"""
+        if previous is None or alpha >= 1.0 or previous.tick == self.tick:
+            previous, alpha = self, 1.0
+        offset = previous.background_offset + (self.background_offset - previous.background_offset) * alpha
+
+        # Cars that were already on the road a tick ago glide between the two positions
+        previous_index = {car_id: index for index, car_id in enumerate(previous.car_ids)}
+        cars = []
+        for index, car_id in enumerate(self.car_ids):
+            x = self.car_x[index]
+            y = self.car_y[index]
+            before = previous_index.get(car_id)
+            if before is not None:
+                x = previous.car_x[before] + (x - previous.car_x[before]) * alpha
+                y = previous.car_y[before] + (y - previous.car_y[before]) * alpha
+            cars.append({"id": car_id, "x": round(x), "y": round(y), "speed": self.car_speed[index]})
+
+        players = []
+        for player, before in zip(self.players, previous.players):
+            players.append(dict(player, x=round(before["x"] + (player["x"] - before["x"]) * alpha)))
+
+        return SnapshotView(self, cars, players, round(offset))
+
+    @property
+    def player_x(self):
+        """x of the first player"""
+        return self.players[0]["x"]
+
+    @property
+    def player_y(self):
+        """y of the first player"""
+        return self.players[0]["y"]
+
+    def idle_seconds(self):
+        """Seconds since any player last moved"""
+        return (self.tick - self.last_move_tick) / FPS
+
+class SnapshotView:
+    """A snapshot with the cars, players and scrolling blended for one frame"""
+
+    def __init__(self, snapshot, cars, players, background_offset):
+        self.snapshot = snapshot
+        self.cars = cars
+        self.players = players
+        self.background_offset = background_offset
+
+    def __getattr__(self, name):
+        return getattr(self.snapshot, name)
+
+    @property
+    def player_x(self):
+        """x of the first player"""
+        return self.players[0]["x"]
+
+    @property
+    def player_y(self):
+        """y of the first player"""
+        return self.players[0]["y"]
+
+    def idle_seconds(self):
+        """Seconds since any player last moved"""
+        return self.snapshot.idle_seconds()
+
+# --- SIMULATION THREAD ---
+
+class SimThread:
+    """Step a simulation at a fixed rate on its own thread and publish a snapshot after every tick"""
+
+    def __init__(self, sim, fps, lock=None, before_step=None, after_step=None):
+        self.sim = sim
+        self.tick_seconds = 1 / fps
+        # Held while the simulation steps, hold it to read or change sim from another thread
+        self.lock = lock or threading.Lock()
+        # Called on this thread with the moves before each tick (e.g. a bot) and with the result after it
+        self.before_step = before_step
+        self.after_step = after_step
+
+        # Moves asked for by the render loop: held keys, and taps that last until a tick sees them
+        self._input_lock = threading.Lock()
+        self._held = [False] * sim.num_players
+        self._pressed = [False] * sim.num_players
+
+        # The newest two snapshots, always replaced together
+        self._snapshots = (None, None)
+        self.results = queue.SimpleQueue()
+
+        # Paused by the render loop while a menu is open, and held after a tick that ended the run until restart()
+        self.paused = True
+        self._run_over = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="Simulation", daemon=True)
+
+    def start(self):
+        """Publish the current state and start ticking"""
+        self.publish()
+        self.paused = False
+        self._thread.start()
+
+    def publish(self, result=None):
+        """Publish the state of the simulation (also after changing it from another thread, e.g. a reset)"""
+        snapshot = Snapshot(self.sim, result, time.perf_counter())
+        previous = self._snapshots[1]
+        if previous is None or previous.tick > snapshot.tick:
+            previous = snapshot
+        self._snapshots = (previous, snapshot)
+
+    def restart(self):
+        """Start ticking a new run after sim was reset (call with the lock held)"""
+        while not self.results.empty():
+            self.results.get()
+        self.publish()
+        self._run_over = False
+
+    def set_moves(self, held, pressed):
+        """Moves of every player for the coming ticks (taps are kept until a tick uses them)"""
+        with self._input_lock:
+            self._held = held
+            for index, tapped in enumerate(pressed):
+                if tapped:
+                    self._pressed[index] = True
+
+    def view(self):
+        """What to draw right now, between the last two ticks"""
+        previous, current = self._snapshots
+        alpha = (time.perf_counter() - current.timestamp) / self.tick_seconds
+        return current.view(previous, min(1.0, alpha))
+
+    def _take_moves(self):
+        """Moves for this tick, using up the taps"""
+        with self._input_lock:
+            moves = [held or pressed for held, pressed in zip(self._held, self._pressed)]
+            self._pressed = [False] * len(moves)
+        return moves
+
+    def _run(self):
+        """Tick at a fixed rate until stop() is called"""
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            next_tick = max(next_tick + self.tick_seconds, time.perf_counter() - self.tick_seconds)
+            if self.paused or self._run_over:
+                continue
+
+            with self.lock:
+                moves = self._take_moves()
+                if self.before_step is not None:
+                    moves = self.before_step(moves)
+                result = self.sim.step(moves)
+                if self.after_step is not None:
+                    self.after_step(result)
+                self.publish(result)
+                if result is not None:
+                    # Wait for the render loop to show the end of the run
+                    self._run_over = True
+                    self.results.put(result)
+
+    def stop(self):
+        """Stop ticking and wait for the thread to finish"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,364 @@
+"""
+Crossy Road - Greta Thunberg Edition (Spectator)
+Watch a batch of bot games at once, e.g. while balancing a mode:
+    python Spectator.py --games 36 --mode hard --policy lane_gap
+
+The games run headless at full speed (or --tps ticks a second) in worker
+processes, each playing its share one run after another like Autoplay.py.
+Workers write the state of their games (player, scrolling, score and every car)
+straight into arrays in one block of shared memory, so nothing is pickled or
+sent per frame. Each game has a sequence number that is odd while its worker is
+writing it; the spectator copies all the arrays at once and keeps the last
+complete state of any game that was caught half written.
+
+The window is a grid of thumbnails drawn from those arrays with sprites scaled
+to the tile size once and shared by every tile, one batched blits() per tile.
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from multiprocessing import shared_memory
+
+import pygame
+
+from Bot import POLICIES, create_policy, observe, MOVE
+from Game_Simulation import (GameSimulation, MODES, SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT,
+                             CAR_WIDTH, CAR_HEIGHT, FPS, RESULT_WIN)
+from Lane_Safety import LaneSafetyIndex, SpawnValidator
+from Sprites import bake_walk_cycle, bake_car_variants, walk_frame, CAR_COLORS, TextCache
+
+# NumPy is needed for the shared arrays
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- CONSTANTS ---
+
+# Game files live next to this one
+BASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Games shown at once
+MIN_GAMES = 1
+MAX_GAMES = 64
+
+# Size of one thumbnail (a fifth of the canvas)
+TILE_SIZE = (SCREEN_WIDTH // 5, SCREEN_HEIGHT // 5)
+
+# Cars shown per game (hard mode clusters rarely get past a few dozen)
+MAX_CARS = 128
+
+# Times a second the workers write their games out and the window is redrawn
+PUBLISH_RATE = 60
+FRAME_RATE = 60
+
+# A run is cut off after this many ticks, like Autoplay.py
+MAX_TICKS = FPS * 60 * 10
+
+# Fields of a game's row in the state array
+SEQUENCE = 0     # odd while the worker is writing the game
+TICK = 1
+SCORE = 2
+PLAYER_X = 3
+PLAYER_Y = 4
+BACKGROUND = 5
+CARS = 6         # cars in the car array (at most MAX_CARS)
+RUNS = 7         # runs finished
+WINS = 8
+TOTAL_TICKS = 9  # ticks played over all runs
+STATE_FIELDS = 10
+
+# Fields of a car's row in the car array
+CAR_X = 0
+CAR_Y = 1
+CAR_SPEED = 2
+CAR_ID = 3
+CAR_FIELDS = 4
+
+TEXT_COLOR = (0, 0, 0)
+TILE_BORDER_COLOR = (30, 30, 30)
+
+# --- SHARED STATE ---
+
+class SharedGames:
+    """State and car arrays of a batch of games in one block of shared memory"""
+
+    def __init__(self, games, name=None):
+        self.games = games
+        state_bytes = games * STATE_FIELDS * 8
+        car_bytes = games * MAX_CARS * CAR_FIELDS * 4
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=state_bytes + car_bytes)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.state = np.ndarray((games, STATE_FIELDS), dtype=np.int64, buffer=self.memory.buf)
+        self.cars = np.ndarray((games, MAX_CARS, CAR_FIELDS), dtype=np.float32, buffer=self.memory.buf,
+                               offset=state_bytes)
+        if name is None:
+            self.state.fill(0)
+
+    def write(self, game, sim):
+        """Write out the state of one game (worker side)"""
+        state = self.state[game]
+        state[SEQUENCE] += 1
+        cars = sim.cars
+        count = min(len(cars), MAX_CARS)
+        rows = self.cars[game]
+        for index in range(count):
+            car = cars[index]
+            row = rows[index]
+            row[CAR_X] = car["x"]
+            row[CAR_Y] = car["y"]
+            row[CAR_SPEED] = car["speed"]
+            row[CAR_ID] = car["id"]
+        state[TICK] = sim.tick
+        state[SCORE] = sim.score
+        state[PLAYER_X] = sim.player_x
+        state[PLAYER_Y] = sim.player_y
+        state[BACKGROUND] = sim.background_offset
+        state[CARS] = count
+        state[SEQUENCE] += 1
+
+    def close(self):
+        """Let go of the arrays and the memory"""
+        self.state = None
+        self.cars = None
+        self.memory.close()
+
+class Snapshot:
+    """The spectator's copy of the shared state, holding the last complete state of every game"""
+
+    def __init__(self, games):
+        self.state = np.zeros((games, STATE_FIELDS), dtype=np.int64)
+        self.cars = np.zeros((games, MAX_CARS, CAR_FIELDS), dtype=np.float32)
+        self._state = np.empty_like(self.state)
+        self._cars = np.empty_like(self.cars)
+
+    def update(self, shared):
+        """Copy every game that wasn't being written while copying, returning how many were"""
+        before = shared.state[:, SEQUENCE].copy()
+        np.copyto(self._state, shared.state)
+        np.copyto(self._cars, shared.cars)
+        complete = (before == shared.state[:, SEQUENCE]) & (before % 2 == 0)
+        np.copyto(self.state, self._state, where=complete[:, None])
+        np.copyto(self.cars, self._cars, where=complete[:, None, None])
+        return int(np.count_nonzero(complete))
+
+# --- WORKERS ---
+
+def run_games(memory_name, total_games, games, mode, policy_name, first_seed, stop, ticks_per_second):
+    """Worker loop: play the given games one tick at a time until stop is set"""
+    # Ctrl+C reaches the whole process group, the spectator stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shared = SharedGames(total_games, memory_name)
+
+    players = []
+    for game in games:
+        sim = GameSimulation(mode, seed=first_seed + game)
+        policy = create_policy(policy_name)
+        lane_safety = LaneSafetyIndex(sim) if getattr(policy, "needs_lane_safety", False) else None
+        # Hard mode plays with the same spawn validation as the game window
+        if sim.hard_mode:
+            SpawnValidator(sim, lane_safety)
+        players.append((game, sim, policy, lane_safety))
+        shared.write(game, sim)
+
+    publish_interval = 1 / PUBLISH_RATE
+    next_publish = time.perf_counter()
+    tick_interval = 1 / ticks_per_second if ticks_per_second else 0
+    next_tick = next_publish
+    try:
+        while True:
+            for game, sim, policy, lane_safety in players:
+                result = sim.step(policy(observe(sim, lane_safety)) == MOVE)
+                if result is not None or sim.tick >= MAX_TICKS:
+                    state = shared.state[game]
+                    state[RUNS] += 1
+                    state[WINS] += result == RESULT_WIN
+                    state[TOTAL_TICKS] += sim.tick
+                    # Every game keeps its own seed sequence, so a batch can be watched again
+                    sim.reset(sim.seed + total_games)
+
+            now = time.perf_counter()
+            if now >= next_publish:
+                if stop.is_set():
+                    break
+                for game, sim, _, _ in players:
+                    shared.write(game, sim)
+                next_publish = now + publish_interval
+            if tick_interval:
+                next_tick += tick_interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.perf_counter()
+    finally:
+        shared.close()
+
+def start_workers(shared, workers, mode, policy_name, seed, ticks_per_second):
+    """Start the worker processes, each playing every workers-th game"""
+    stop = multiprocessing.Event()
+    processes = []
+    for worker in range(workers):
+        games = list(range(worker, shared.games, workers))
+        process = multiprocessing.Process(target=run_games, name=f"spectator-worker-{worker}", daemon=True,
+                                          args=(shared.memory.name, shared.games, games, mode, policy_name,
+                                                seed, stop, ticks_per_second))
+        process.start()
+        processes.append(process)
+    return stop, processes
+
+# --- DRAWING ---
+
+def load_tile_sprites(tile_size):
+    """Background, player walk cycle and car variants scaled to a tile once, shared by every tile"""
+    width, height = tile_size
+    scale_x = width / SCREEN_WIDTH
+    scale_y = height / SCREEN_HEIGHT
+
+    def load(filename, size):
+        image = pygame.image.load(os.path.join(BASE_DIRECTORY, filename)).convert_alpha()
+        return pygame.transform.smoothscale(image, size)
+
+    background = load("background.png", tile_size).convert()
+    player = load("Greta_Thunberg.png", (max(1, round(PLAYER_WIDTH * scale_x)), max(1, round(PLAYER_HEIGHT * scale_y))))
+    car = load("car.png", (max(1, round(CAR_WIDTH * scale_x)), max(1, round(CAR_HEIGHT * scale_y))))
+    return background, bake_walk_cycle(player), bake_car_variants(car)
+
+def tile_position(game, columns, tile_size):
+    """Top left corner of a game's tile in the window"""
+    row, column = divmod(game, columns)
+    return column * tile_size[0], row * tile_size[1]
+
+def draw_tile(window, origin, tile_size, state, cars, sprites, font, texts):
+    """Draw one game into its tile with a single blits() call"""
+    background, walk_frames, car_variants = sprites
+    left, top = origin
+    width, height = tile_size
+    scale_x = width / SCREEN_WIDTH
+    scale_y = height / SCREEN_HEIGHT
+
+    offset = round((state[BACKGROUND] % SCREEN_WIDTH) * scale_x)
+    sequence = [(background, (left + offset, top)), (background, (left + offset - width, top))]
+
+    count = int(state[CARS])
+    if count:
+        cars = cars[:count]
+        xs = (cars[:, CAR_X] * scale_x + left).round().astype(int).tolist()
+        ys = (cars[:, CAR_Y] * scale_y + top).round().astype(int).tolist()
+        colors = (cars[:, CAR_ID].astype(int) % len(CAR_COLORS)).tolist()
+        directions = np.where(cars[:, CAR_SPEED] >= 0, 1, -1).tolist()
+        sequence.extend((car_variants[(color, direction)], (x, y))
+                        for x, y, color, direction in zip(xs, ys, colors, directions))
+
+    player_x = int(state[PLAYER_X])
+    sequence.append((walk_frame(walk_frames, player_x - int(state[BACKGROUND])),
+                     (left + round(player_x * scale_x), top + round(int(state[PLAYER_Y]) * scale_y))))
+    label = texts.render(font, f"{state[SCORE]}  {state[WINS]}/{state[RUNS]}", TEXT_COLOR)
+    sequence.append((label, (left + 3, top + 2)))
+
+    # Keep the scrolled background and cars driving off the edge out of the neighbouring tiles
+    window.set_clip((left, top, width - 1, height - 1))
+    window.blits(sequence, doreturn=False)
+
+# --- MAIN ---
+
+def parse_tile_size(text):
+    """Parse a WIDTHxHEIGHT tile size"""
+    try:
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r}, expected WIDTHxHEIGHT")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Watch a grid of bot games running in worker processes")
+    parser.add_argument("--games", type=int, default=16, help=f"Games shown ({MIN_GAMES} to {MAX_GAMES})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--mode", choices=sorted(MODES), default="regular")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="lane_gap")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--tile-size", type=parse_tile_size, default=TILE_SIZE, metavar="WIDTHxHEIGHT")
+    parser.add_argument("--tps", type=int, default=0, help="Ticks a second per game (default: as fast as possible)")
+    parser.add_argument("--frames", type=int, default=0, help="Quit after this many frames (default: when closed)")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("The spectator needs NumPy (pip install numpy)")
+        return 1
+    games = max(MIN_GAMES, min(MAX_GAMES, args.games))
+    workers = max(1, min(games, args.workers or os.cpu_count() or 1))
+    tile_size = args.tile_size
+    columns = math.ceil(math.sqrt(games))
+    rows = math.ceil(games / columns)
+
+    # The workers are started before pygame opens a window, so they don't inherit it
+    shared = SharedGames(games)
+    stop, processes = start_workers(shared, workers, args.mode, args.policy, args.seed, args.tps)
+    start_time = time.perf_counter()
+
+    try:
+        pygame.init()
+        window = pygame.display.set_mode((columns * tile_size[0], rows * tile_size[1]))
+        sprites = load_tile_sprites(tile_size)
+        font = pygame.font.Font(None, max(12, tile_size[1] // 6))
+        texts = TextCache()
+        snapshot = Snapshot(games)
+        clock = pygame.time.Clock()
+
+        frames = 0
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    running = False
+
+            snapshot.update(shared)
+            window.set_clip(None)
+            window.fill(TILE_BORDER_COLOR)
+            for game in range(games):
+                draw_tile(window, tile_position(game, columns, tile_size), tile_size,
+                          snapshot.state[game], snapshot.cars[game], sprites, font, texts)
+            window.set_clip(None)
+            pygame.display.flip()
+            clock.tick(FRAME_RATE)
+
+            frames += 1
+            if frames % FRAME_RATE == 0:
+                ticks = snapshot.state[:, TOTAL_TICKS].sum() + snapshot.state[:, TICK].sum()
+                pygame.display.set_caption(f"Spectator - {games} {args.mode} games, "
+                                           f"{ticks / (time.perf_counter() - start_time):.0f} ticks/s, "
+                                           f"{clock.get_fps():.0f} FPS")
+            if args.frames and frames >= args.frames:
+                running = False
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        elapsed = time.perf_counter() - start_time
+        final_state = shared.state.copy()
+        shared.close()
+        shared.memory.unlink()
+        pygame.quit()
+
+    runs = int(final_state[:, RUNS].sum())
+    wins = int(final_state[:, WINS].sum())
+    ticks = int(final_state[:, TOTAL_TICKS].sum() + final_state[:, TICK].sum())
+    print(f"{games} {args.mode} games with {args.policy} on {workers} workers: {runs} runs, "
+          f"win rate {wins / max(1, runs):.1%}, {ticks / elapsed:.0f} ticks/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Crossy Road - Greta Thunberg Edition (Sprites)
+Animation frames and sprite variants for both game modes.
+Everything is baked into surfaces once when the images are loaded (walk cycle,
+car colors and directions, the fade into the collision pose), so drawing an
+animated sprite is a lookup and never calls pygame.transform during play.
+HUD text is rendered once per distinct string and reused (see TextCache).
+"""
+
+import pygame
+
+from Game_Simulation import LANE_WIDTH
+
+# --- CONSTANTS ---
+
+# Walk cycle as (tilt in degrees, bob in pixels) per frame
+WALK_CYCLE = ((0, 0), (-6, -3), (0, 0), (6, -3))
+# Pixels walked per walk frame (four frames per lane)
+WALK_STRIDE = LANE_WIDTH // len(WALK_CYCLE)
+
+# Body colors of the car sprite and the colors cars are repainted in (None keeps the original)
+CAR_BODY_COLOR = (39, 97, 226)
+CAR_SHADE_COLOR = (26, 65, 152)
+CAR_COLORS = (None, (210, 50, 50), (50, 170, 70), (235, 190, 40))
+# How far a pixel's color may be from the body color and still be repainted (0 to 1)
+CAR_COLOR_DISTANCE = 0.12
+
+# Frames of the fade from walking into the collision pose
+COLLISION_FADE_FRAMES = 8
+
+# Most text surfaces kept at once (the score, timers and combos only take a few at a time)
+MAX_CACHED_TEXTS = 128
+
+# --- BAKING ---
+
+def bake_walk_cycle(image):
+    """Frames of the walk cycle, all the size of the original image"""
+    width, height = image.get_size()
+    frames = []
+    for tilt, bob in WALK_CYCLE:
+        frame = pygame.Surface((width, height), pygame.SRCALPHA)
+        tilted = pygame.transform.rotate(image, tilt) if tilt else image
+        frame.blit(tilted, tilted.get_rect(center=(width // 2, height // 2 + bob)))
+        frames.append(frame)
+    return frames
+
+def recolor(image, color):
+    """Copy of a car image with its body repainted"""
+    recolored = image.copy()
+    shade = tuple(channel * 2 // 3 for channel in color)
+    pixels = pygame.PixelArray(recolored)
+    pixels.replace(CAR_BODY_COLOR, color, CAR_COLOR_DISTANCE)
+    pixels.replace(CAR_SHADE_COLOR, shade, CAR_COLOR_DISTANCE)
+    pixels.close()
+    return recolored
+
+def bake_car_variants(image):
+    """Every color of the car facing both ways, keyed by (color index, direction)"""
+    variants = {}
+    for index, color in enumerate(CAR_COLORS):
+        painted = image if color is None else recolor(image, color)
+        # The sprite faces right for cars driving down, mirrored for cars driving up
+        variants[(index, 1)] = painted
+        variants[(index, -1)] = pygame.transform.flip(painted, True, False)
+    return variants
+
+def bake_crossfade(start, end, steps):
+    """Frames fading from one image into another, ending on the second image"""
+    width, height = start.get_size()
+    end = pygame.transform.smoothscale(end, (width, height)) if end.get_size() != (width, height) else end
+    frames = []
+    for step in range(1, steps + 1):
+        weight = step / steps
+        frame = pygame.Surface((width, height), pygame.SRCALPHA)
+        fading_out = start.copy()
+        fading_out.set_alpha(round(255 * (1 - weight)))
+        fading_in = end.copy()
+        fading_in.set_alpha(round(255 * weight))
+        frame.blit(fading_out, (0, 0))
+        frame.blit(fading_in, (0, 0))
+        frames.append(frame)
+    return frames
+
+# --- LOOKUP ---
+
+def walk_frame(frames, world_x):
+    """Walk frame of a player who has walked to world_x (it holds still while the player waits)"""
+    return frames[int(world_x // WALK_STRIDE) % len(frames)]
+
+def car_sprite(variants, car):
+    """Sprite of a car, its color picked by id and facing the way it drives"""
+    return variants[(car["id"] % len(CAR_COLORS), 1 if car["speed"] >= 0 else -1)]
+
+def fade_frame(frames, ticks):
+    """Frame of a fade that started the given number of ticks ago"""
+    return frames[min(ticks, len(frames) - 1)]
+
+# --- TEXT ---
+
+class TextCache:
+    """Rendered text surfaces, reused for as long as the same text keeps being drawn"""
+
+    def __init__(self, limit=MAX_CACHED_TEXTS):
+        self.limit = limit
+        self._surfaces = {}
+
+    def render(self, font, text, color):
+        """Surface of text in font and color, rendered only the first time it is asked for"""
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            # Old scores and timers are never shown again, so start over rather than track what is stale
+            if len(self._surfaces) >= self.limit:
+                self._surfaces.clear()
+            surface = font.render(text, True, color)
+            self._surfaces[key] = surface
+        return surface
@@ -0,0 +1,162 @@
+"""
+Crossy Road - Greta Thunberg Edition (Stats Store)
+Keeps every finished run in a local SQLite database (stats.db next to the game),
+so high scores survive between sessions and show up on the launcher.
+
+Runs are queued by the game loop and written in batches by a background thread,
+so saving never stalls a frame. The database uses WAL mode, which lets the
+launcher read the leaderboard while a game is still writing.
+"""
+
+import array
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# --- CONSTANTS ---
+
+# Where the stats are kept
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.db")
+
+# Ways a run can end (the first three match Game_Simulation.RESULT_*)
+CAUSE_WIN = "win"
+CAUSE_COLLISION = "collision"
+CAUSE_AFK = "afk"
+CAUSE_QUIT = "quit"
+
+# Most runs written in one transaction
+BATCH_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    cause TEXT NOT NULL,
+    frame_ms_p50 REAL,
+    frame_ms_p95 REAL,
+    frame_ms_max REAL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_leaderboard ON runs (mode, score DESC, duration);
+"""
+
+INSERT_RUN = """
+INSERT INTO runs (mode, seed, score, duration, cause, frame_ms_p50, frame_ms_p95, frame_ms_max, played_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Best score first, the faster run wins a tie (answered straight from the runs_leaderboard index)
+SELECT_LEADERBOARD = """
+SELECT score, duration, seed, played_at FROM runs
+WHERE mode = ? ORDER BY score DESC, duration LIMIT ?
+"""
+
+# --- FRAME TIMES ---
+
+class FrameTimes:
+    """Frame times of the current run in milliseconds, summarized when the run ends"""
+
+    def __init__(self):
+        # A compact array of floats rather than a list of Python objects
+        self.times = array.array("f")
+
+    def add(self, milliseconds):
+        """Record the time one frame took"""
+        self.times.append(milliseconds)
+
+    def clear(self):
+        """Start collecting a new run"""
+        del self.times[:]
+
+    def summary(self):
+        """Median, 95th percentile and slowest frame (all None if nothing was recorded)"""
+        if not self.times:
+            return None, None, None
+        ordered = sorted(self.times)
+        last = len(ordered) - 1
+        return ordered[last // 2], ordered[last * 95 // 100], ordered[last]
+
+# --- STATS STORE ---
+
+def connect(path):
+    """Open the stats database, creating it if needed"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent without syncing on every commit
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+class StatsStore:
+    """Queue finished runs for the background writer and read the leaderboard"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._queue = queue.Queue()
+        self._writer = None
+        self._reader = None
+
+    def record_run(self, mode, seed, score, duration, cause, frame_times=None):
+        """Queue a finished run, returning straight away"""
+        p50, p95, slowest = frame_times.summary() if frame_times is not None else (None, None, None)
+        self._queue.put((mode, seed, score, duration, cause, p50, p95, slowest, time.time()))
+
+        # The writer only starts once there is something to write
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="StatsWriter", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        """Write queued runs in batches until close() is called"""
+        try:
+            connection = connect(self.path)
+        except Exception as e:
+            print(f"Error opening stats database: {e}")
+            return
+
+        running = True
+        while running:
+            # Wait for one run, then take whatever else has piled up
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [run for run in batch if run is not None]
+
+            try:
+                with connection:
+                    connection.executemany(INSERT_RUN, batch)
+            except Exception as e:
+                print(f"Error saving stats: {e}")
+
+        connection.close()
+
+    def leaderboard(self, mode, limit=5):
+        """Best runs of a mode as (score, duration, seed, played_at) tuples"""
+        try:
+            if self._reader is None:
+                self._reader = connect(self.path)
+            return self._reader.execute(SELECT_LEADERBOARD, (mode, limit)).fetchall()
+        except Exception as e:
+            print(f"Error reading leaderboard: {e}")
+            return []
+
+    def close(self):
+        """Write everything still queued and close the database"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
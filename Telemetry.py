@@ -0,0 +1,210 @@
+"""
+Crossy Road - Greta Thunberg Edition (Telemetry)
+Gameplay analytics (lanes crossed, near misses, collisions, AFK timeouts, hard
+mode speed changes and rewinds) logged without slowing down the game loop.
+
+emit() packs a fixed size binary record into a preallocated ring buffer, which a
+background thread drains to gzip files in the telemetry folder, starting a new
+file every MAX_FILE_RECORDS records and keeping the newest MAX_FILES files.
+The game loop is the only writer and the drain thread the only reader, so the
+ring needs no lock. When the ring is full new events are dropped and counted
+instead of blocking the game; close() prints how many were dropped.
+
+Records can be read back with read_records(path).
+"""
+
+import gzip
+import os
+import struct
+import threading
+import time
+
+from Game_Simulation import RESULT_COLLISION, RESULT_AFK
+
+# --- CONSTANTS ---
+
+# Where the telemetry files go
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry")
+
+# Event types
+EVENT_RUN_START = 0     # value is the seed of the run
+EVENT_LANE_CROSSED = 1  # lane is the score after crossing
+EVENT_NEAR_MISS = 2     # lane is the car's lane, value the gap in pixels
+EVENT_COLLISION = 3     # lane is the car's lane, value the score
+EVENT_AFK = 4           # value is the score
+EVENT_SPEED_CHANGE = 5  # lane is the car's lane, value its new speed
+EVENT_RESTORED = 6      # the run was rewound or resumed, value is the score it went back to
+
+EVENT_NAMES = {
+    EVENT_RUN_START: "run_start",
+    EVENT_LANE_CROSSED: "lane_crossed",
+    EVENT_NEAR_MISS: "near_miss",
+    EVENT_COLLISION: "collision",
+    EVENT_AFK: "afk",
+    EVENT_SPEED_CHANGE: "speed_change",
+    EVENT_RESTORED: "restored",
+}
+
+# One record: tick, event type, lane and a value (16 bytes, little endian)
+RECORD = struct.Struct("<IBxhd")
+
+# Records the ring holds before new events are dropped
+RING_CAPACITY = 4096
+
+# Seconds between two drains
+DRAIN_INTERVAL = 0.25
+
+# File rotation
+MAX_FILE_RECORDS = 65536
+MAX_FILES = 10
+
+# --- TELEMETRY ---
+
+class Telemetry:
+    """Event bus writing compact binary records through a ring buffer to rotating gzip files"""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, capacity=RING_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self._ring = bytearray(capacity * RECORD.size)
+        self._pack_into = RECORD.pack_into
+
+        # Records ever written and read; only the game loop moves _head and only the drain thread moves _tail
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+        # Score at the last tick, to spot lanes being crossed
+        self._score = 0
+
+        self._file = None
+        self._file_records = 0
+        self._files_opened = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain_loop, name="TelemetryDrain", daemon=True)
+        self._thread.start()
+
+    def emit(self, event, tick, lane=0, value=0.0):
+        """Log an event (never blocks, drops the event if the ring is full)"""
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return
+        self._pack_into(self._ring, (head % self.capacity) * RECORD.size, tick, event, lane, value)
+        self._head = head + 1
+
+    def after_step(self, sim, result):
+        """Log what happened in the tick the simulation just played"""
+        if sim.score > self._score:
+            self.emit(EVENT_LANE_CROSSED, sim.tick, sim.score)
+        # A practice rewind (see Rewind.py) lowers the score without any lane being crossed
+        self._score = sim.score
+        for car, gap in sim.near_misses:
+            self.emit(EVENT_NEAR_MISS, sim.tick, car["lane"], gap)
+        if result == RESULT_COLLISION:
+            self.emit(EVENT_COLLISION, sim.tick, sim.collided_car["lane"], sim.score)
+        elif result == RESULT_AFK:
+            self.emit(EVENT_AFK, sim.tick, 0, sim.score)
+
+    # --- Simulation listener ---
+
+    def cars_reset(self, sim):
+        """A new run started"""
+        self._score = sim.score
+        self.emit(EVENT_RUN_START, sim.tick, 0, sim.seed)
+
+    def state_restored(self, sim):
+        """The run went back to an earlier state, which is part of the same run"""
+        self._score = sim.score
+        self.emit(EVENT_RESTORED, sim.tick, 0, sim.score)
+
+    def car_spawned(self, sim, car):
+        """Spawns are not logged"""
+
+    def car_despawned(self, sim, car):
+        """Despawns are not logged"""
+
+    def car_speed_changed(self, sim, car, tick):
+        """Hard mode sped up or slowed down a car"""
+        self.emit(EVENT_SPEED_CHANGE, sim.tick, car["lane"], car["speed"])
+
+    # --- Drain thread ---
+
+    def _drain_loop(self):
+        """Move records from the ring to disk until close() is called"""
+        while not self._stop.wait(DRAIN_INTERVAL):
+            self._drain()
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _drain(self):
+        """Write every record in the ring to the current file"""
+        head = self._head
+        tail = self._tail
+        if head == tail:
+            return
+
+        size = RECORD.size
+        start = (tail % self.capacity) * size
+        end = (head % self.capacity) * size
+        if start < end:
+            data = bytes(self._ring[start:end])
+        else:
+            # The records wrap around the end of the ring
+            data = bytes(self._ring[start:]) + bytes(self._ring[:end])
+        # Only now can the game loop reuse the space
+        self._tail = head
+
+        try:
+            self._write(data)
+        except Exception as e:
+            print(f"Error writing telemetry: {e}")
+
+    def _write(self, data):
+        """Append records to the current file, rotating when it is full"""
+        size = RECORD.size
+        while data:
+            if self._file is None:
+                self._open_file()
+            count = min(len(data) // size, MAX_FILE_RECORDS - self._file_records)
+            self._file.write(data[:count * size])
+            self._file_records += count
+            data = data[count * size:]
+            if self._file_records >= MAX_FILE_RECORDS:
+                self._file.close()
+                self._file = None
+
+    def _open_file(self):
+        """Start a new telemetry file and delete the oldest ones"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime("telemetry-%Y%m%d-%H%M%S") + f"-{self._files_opened:03d}.bin.gz"
+        self._file = gzip.open(os.path.join(self.directory, name), "wb")
+        self._file_records = 0
+        self._files_opened += 1
+
+        files = sorted(f for f in os.listdir(self.directory) if f.startswith("telemetry-"))
+        for old in files[:-MAX_FILES]:
+            os.remove(os.path.join(self.directory, old))
+
+    def report(self):
+        """One line summing up what was logged"""
+        return (f"Logged {self._head} telemetry events to {self.directory} "
+                f"({self.dropped} dropped because the ring was full)")
+
+    def close(self):
+        """Write everything left in the ring, stop the drain thread and report the events dropped"""
+        self._stop.set()
+        self._thread.join()
+        print(self.report())
+
+# --- READING ---
+
+def read_records(path):
+    """Yield (tick, event name, lane, value) for every record in a telemetry file"""
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    for tick, event, lane, value in RECORD.iter_unpack(data[:usable]):
+        yield tick, EVENT_NAMES.get(event, event), lane, value
@@ -0,0 +1,257 @@
+"""
+Crossy Road - Greta Thunberg Edition (Video Capture)
+Records what the game shows for QA and highlight reels (--capture [PATH]).
+
+Saving every frame as an image in the game loop would take longer than the
+frame itself, so the loop only copies the raw pixels of the finished frame,
+through a buffer view of the window, into a free slot of a ring in shared memory
+and passes the slot number on (a straight copy of the 32 bit pixels, more than
+ten times quicker than going through a pixels3d view). A worker process
+compresses the frames (each one as the difference to the one before, zlib
+packed) into a single .crcap file and hands the slot back; turning the pixels
+into RGB waits until the capture is read.
+When every slot is still waiting to be encoded the frame is dropped and counted,
+the game never waits for the encoder. The time each copy takes shows as
+"capture" in the F3 overlay and the totals are printed when the game closes.
+
+A capture can be turned into PNG frames (for ffmpeg or an editor) with:
+    python Video_Capture.py captures/regular-20260101-120000.crcap --png frames
+    ffmpeg -framerate 30 -i frames/frame_%05d.png highlight.mp4
+
+With the GPU renderer the frame has to be read back from the graphics card
+first, which costs a lot more than the copy itself.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import signal
+import struct
+import threading
+import time
+import zlib
+
+from multiprocessing import shared_memory
+
+import pygame
+
+# NumPy is needed to copy the frames
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- CONSTANTS ---
+
+# Where the captures go when no path is given
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")
+
+# Frames that can wait for the encoder before new ones are dropped
+DEFAULT_SLOTS = 8
+
+# zlib level, the fastest keeps up with the game on one core
+COMPRESSION_LEVEL = 1
+
+# File header: magic, version, width, height, frames per second, red, green and blue shifts of the pixels
+HEADER = struct.Struct("<4sBHHHBBB")
+MAGIC = b"CRCP"
+VERSION = 1
+
+# Before each frame: frame number (gaps are dropped frames), seconds since the capture started, packed size
+FRAME = struct.Struct("<IdI")
+
+# --- HELPER FUNCTIONS ---
+
+def default_path(mode):
+    """New capture file for a mode, named after the time it started"""
+    return os.path.join(DEFAULT_DIRECTORY, f"{mode}-{time.strftime('%Y%m%d-%H%M%S')}.crcap")
+
+def start_method():
+    """How to start the encoder, or None to run it on a thread
+
+    The game scripts run as soon as they are imported, so a spawned process
+    (which imports the main script again) would start a second game. Where
+    processes can only be spawned the encoder runs on a thread instead; zlib
+    and NumPy let go of the GIL while they work, so it still runs alongside.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return "fork"
+    return None
+
+# --- ENCODER ---
+
+def encode_frames(memory_name, shape, filled, free, path, fps, shifts):
+    """Worker loop: pack the frames of the filled slots into path until None arrives"""
+    if threading.current_thread() is threading.main_thread():
+        # Closing the game stops the encoder, so Ctrl+C in the terminal is left to the game
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # SDL's handler came along with the fork and would keep the process from being terminated
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    frames = np.ndarray(shape, dtype=np.uint32, buffer=memory.buf)
+    previous = np.zeros(shape[1:], dtype=np.uint32)
+    delta = np.empty_like(previous)
+    try:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, shape[2], shape[1], fps, *shifts))
+            while True:
+                item = filled.get()
+                if item is None:
+                    break
+                slot, number, seconds = item
+                # Most of the screen is the same as the frame before, which packs to almost nothing
+                np.bitwise_xor(frames[slot], previous, out=delta)
+                previous[...] = frames[slot]
+                free.put(slot)
+                data = zlib.compress(delta, COMPRESSION_LEVEL)
+                f.write(FRAME.pack(number, seconds, len(data)))
+                f.write(data)
+    finally:
+        del frames
+        memory.close()
+
+# --- VIDEO CAPTURE ---
+
+class VideoCapture:
+    """Copy finished frames to a background encoder, dropping them rather than waiting"""
+
+    def __init__(self, path, surface, fps, scale=1, slots=DEFAULT_SLOTS):
+        if np is None:
+            raise ImportError("Video capture needs NumPy (pip install numpy)")
+        if surface.get_bytesize() != 4:
+            raise ValueError("Only 32 bit surfaces can be captured")
+        self.path = path
+        self.size = surface.get_size()
+        self.shifts = surface.get_shifts()[:3]
+        self.scale = max(1, int(scale))
+        width = -(-self.size[0] // self.scale)
+        height = -(-self.size[1] // self.scale)
+        shape = (slots, height, width)
+
+        # Frames are kept as the surface's own 32 bit pixels, row by row
+        self._memory = shared_memory.SharedMemory(create=True, size=slots * width * height * 4)
+        self._frames = np.ndarray(shape, dtype=np.uint32, buffer=self._memory.buf)
+
+        method = start_method()
+        if method is not None:
+            context = multiprocessing.get_context(method)
+            self._filled = context.Queue()
+            self._free = context.Queue()
+            worker = context.Process
+        else:
+            self._filled = queue.Queue()
+            self._free = queue.Queue()
+            worker = threading.Thread
+        for slot in range(slots):
+            self._free.put(slot)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._worker = worker(target=encode_frames, name="video-encoder", daemon=True,
+                              args=(self._memory.name, shape, self._filled, self._free, path, fps, self.shifts))
+        self._worker.start()
+
+        self.started = time.perf_counter()
+        # Frames offered, and those dropped because no slot was free or the window had another size or format
+        self.frames = 0
+        self.dropped = 0
+        self.resized = 0
+        # Seconds the game loop spent on the last frame and on all of them
+        self.last_seconds = 0.0
+        self.total_seconds = 0.0
+        self.worst_seconds = 0.0
+
+    def grab(self, surface):
+        """Hand the finished frame on surface to the encoder, or drop it if it is busy"""
+        start = time.perf_counter()
+        number = self.frames
+        self.frames += 1
+        if surface.get_size() != self.size or surface.get_shifts()[:3] != self.shifts:
+            self.resized += 1
+        else:
+            try:
+                slot = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+            else:
+                # The view reads the surface in place, the copy into the slot is the only one made
+                view = surface.get_view("1")
+                width, height = self.size
+                rows = np.frombuffer(view, dtype=np.uint32).reshape(height, surface.get_pitch() // 4)
+                scale = self.scale
+                np.copyto(self._frames[slot], rows[::scale, :width:scale])
+                # Letting go of the view unlocks the surface again
+                del rows, view
+                self._filled.put((slot, number, start - self.started))
+        self.last_seconds = time.perf_counter() - start
+        self.total_seconds += self.last_seconds
+        self.worst_seconds = max(self.worst_seconds, self.last_seconds)
+
+    def report(self):
+        """One line summing up the capture"""
+        frames = max(1, self.frames)
+        kept = self.frames - self.dropped - self.resized
+        return (f"Captured {kept} of {self.frames} frames to {self.path} ({self.dropped} dropped"
+                f"{f', {self.resized} at another window size' if self.resized else ''}), "
+                f"{self.total_seconds / frames * 1000:.2f} ms a frame on average, "
+                f"{self.worst_seconds * 1000:.2f} ms at worst")
+
+    def close(self):
+        """Let the encoder finish the frames it has and free the slots"""
+        try:
+            self._filled.put(None)
+            self._worker.join(timeout=30)
+            print(self.report())
+        except Exception as e:
+            print(f"Error finishing capture: {e}")
+        finally:
+            self._frames = None
+            self._memory.close()
+            self._memory.unlink()
+
+# --- READING CAPTURES ---
+
+def read_frames(path):
+    """Yield (frame number, seconds, pixels as width x height x 3 like pygame.surfarray) for every frame of a capture"""
+    with open(path, "rb") as f:
+        magic, version, width, height, fps, *shifts = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a capture this version can read")
+        frame = np.zeros((height, width), dtype=np.uint32)
+        rgb = np.empty((width, height, 3), dtype=np.uint8)
+        while True:
+            head = f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                break
+            number, seconds, size = FRAME.unpack(head)
+            delta = np.frombuffer(zlib.decompress(f.read(size)), dtype=np.uint32).reshape(frame.shape)
+            np.bitwise_xor(frame, delta, out=frame)
+            for channel, shift in enumerate(shifts):
+                rgb[:, :, channel] = (frame.T >> shift) & 0xFF
+            yield number, seconds, rgb
+
+def main(argv=None):
+    """Command line entry point: describe a capture, or write its frames out as PNG files"""
+    parser = argparse.ArgumentParser(description="Read a gameplay capture")
+    parser.add_argument("path", help="Capture file (.crcap)")
+    parser.add_argument("--png", metavar="DIRECTORY", help="Write every frame as frame_NNNNN.png into DIRECTORY")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "rb") as f:
+        _, _, width, height, fps, *_ = HEADER.unpack(f.read(HEADER.size))
+    if args.png:
+        os.makedirs(args.png, exist_ok=True)
+
+    count = 0
+    last = -1
+    seconds = 0.0
+    for last, seconds, pixels in read_frames(args.path):
+        if args.png:
+            pygame.image.save(pygame.surfarray.make_surface(pixels), os.path.join(args.png, f"frame_{count:05d}.png"))
+        count += 1
+    print(f"{args.path}: {width}x{height} at {fps} FPS, {count} frames over {seconds:.1f} s, "
+          f"{last + 1 - count} dropped")
+
+if __name__ == "__main__":
+    main()